@@ -0,0 +1,96 @@
+"""장바구니 목록 행 재사용
+
+수량 하나가 바뀔 때마다 장바구니 목록을 비우고 모든 행을 다시 만들면 Flet 은 행 전체를 다시 보낸다.
+KeyedCartList 는 품목 이름(key)별로 만든 행을 보관해 두고, sync() 때 바뀐 수량/소계 Text 값만 고친다.
+새 품목은 행을 만들어 넣고, 빠진 품목은 행을 뺀다. 순서가 바뀐 경우에만 controls 를 다시 배치한다.
+
+30줄 단체 주문에서 한 줄의 "+" 를 누르면 바뀌는 컨트롤은 그 줄의 수량/소계와 합계 Text 3개뿐이다.
+"""
+
+
+class CartRow:
+    """
+    장바구니 한 줄
+
+    Args:
+        control: 목록에 넣을 행 컨트롤
+        item (dict): 행을 만든 장바구니 품목 (버튼 핸들러가 참조하는 dict)
+        quantity_text: 수량 Text
+        subtotal_text: 소계 Text
+    """
+    __slots__ = ("control", "item", "quantity_text", "subtotal_text")
+
+    def __init__(self, control, item, quantity_text, subtotal_text):
+        self.control = control
+        self.item = item
+        self.quantity_text = quantity_text
+        self.subtotal_text = subtotal_text
+
+    def update(self):
+        """품목의 현재 수량/소계를 Text 에 반영, 바뀐 컨트롤 수 반환"""
+        changed = 0
+        quantity = str(self.item["quantity"])
+        if self.quantity_text.value != quantity:
+            self.quantity_text.value = quantity
+            changed += 1
+        subtotal = f"{self.item['price'] * self.item['quantity']:,}원"
+        if self.subtotal_text.value != subtotal:
+            self.subtotal_text.value = subtotal
+            changed += 1
+        return changed
+
+
+class KeyedCartList:
+    """
+    품목 이름으로 행을 재사용하는 장바구니 목록
+
+    Args:
+        container: 행을 담을 컨트롤 (controls 리스트를 가진 ft.Column 등)
+        build_row: item -> CartRow, 새 품목의 행을 만드는 함수
+        empty_control: 장바구니가 비었을 때 보여줄 컨트롤 (None 이면 빈 목록)
+        key (str): 행을 구분할 품목 키
+    """
+    def __init__(self, container, build_row, empty_control=None, key="name"):
+        self.container = container
+        self.build_row = build_row
+        self.empty_control = empty_control
+        self.key = key
+
+        # 품목 key -> CartRow
+        self.rows = {}
+
+        # 마지막 sync 에서 바뀐 컨트롤 수 (고친 Text + 만들거나 뺀 행)
+        self.last_changes = 0
+
+    def sync(self, items):
+        """
+        장바구니 품목 목록을 화면에 반영하고 합계 반환
+
+        같은 key 라도 품목 dict 가 바뀌었으면(장바구니를 비우고 다시 담은 경우 등) 행을 새로 만든다.
+        호출한 쪽에서 page.update() 로 반영한다.
+        """
+        changes = 0
+        total = 0
+        rows = {}
+        for item in items:
+            key = item[self.key]
+            row = self.rows.get(key)
+            if row is None or row.item is not item:
+                row = self.build_row(item)
+                changes += 1
+            else:
+                changes += row.update()
+            rows[key] = row
+            total += item["price"] * item["quantity"]
+        changes += sum(1 for key in self.rows if key not in rows)
+        self.rows = rows
+
+        controls = [row.control for row in rows.values()]
+        if not controls and self.empty_control is not None:
+            controls = [self.empty_control]
+        current = self.container.controls
+        if len(current) != len(controls) or any(a is not b for a, b in zip(current, controls)):
+            self.container.controls = controls
+
+        self.last_changes = changes
+        return total
@@ -0,0 +1,155 @@
+"""다이얼로그 재사용 풀
+
+다이얼로그를 띄울 때마다 새 AlertDialog 를 page.overlay 에 추가하고 닫을 때 open=False 만 하면,
+하루 종일 켜 둔 키오스크의 overlay 에 닫힌 다이얼로그가 수천 개 쌓여 메모리에 남고 갱신 때마다 함께 다뤄진다.
+
+DialogPool 은
+- open(**props) : 쉬고 있는 AlertDialog 를 꺼내(없으면 새로 만들어) title/content/actions 등을 채우고 overlay 에 넣어 띄운다.
+- close(dialog) : open=False 로 닫고, 닫힌 상태가 클라이언트로 전송된 뒤(핸들러가 끝나 화면이 갱신된 뒤) overlay 에서 뺀다.
+  뺀 다이얼로그는 max_idle 개까지 보관했다가 다음 open 에 다시 쓴다.
+바깥을 눌러 닫힌 다이얼로그(on_dismiss)도 같은 방식으로 정리한다. overlay 에는 열려 있거나 방금 닫힌 다이얼로그만 남는다.
+
+사용법: python dialog_pool.py [반복 횟수]  → 다이얼로그를 반복해서 열고 닫아도 overlay 크기가 일정한지 확인
+"""
+import sys
+
+import flet as ft
+
+# open() 에서 지정하지 않으면 이 값으로 되돌리는 속성 (이전에 쓴 값이 남지 않도록)
+DIALOG_DEFAULTS = {
+    "modal": False,
+    "title": None,
+    "content": None,
+    "actions": None,
+    "actions_alignment": None,
+}
+
+
+class DialogPool:
+    """
+    AlertDialog 재사용 풀
+
+    Args:
+        page: 다이얼로그를 띄울 ft.Page
+        updater: 화면 갱신 스케줄러 (UpdateScheduler), flushes 로 닫힘이 전송되었는지 판단
+        max_idle (int): 보관해 둘 쉬는 다이얼로그 수
+        factory: 새 다이얼로그를 만드는 함수 (기본 ft.AlertDialog)
+    """
+    def __init__(self, page, updater, max_idle=2, factory=None):
+        self.page = page
+        self.updater = updater
+        self.max_idle = max_idle
+        self.factory = factory or ft.AlertDialog
+
+        self._idle = []
+        self._open = []
+        # 닫았지만 아직 overlay 에 있는 다이얼로그: (dialog, 닫을 때의 updater.flushes)
+        self._closing = []
+
+        # 통계
+        self.created = 0
+        self.reused = 0
+
+    def open(self, **props):
+        """
+        다이얼로그를 채워서 띄우고 반환 (props 는 ft.AlertDialog 인자와 같음: title, content, actions ...)
+        """
+        self._prune()
+        if self._idle:
+            dialog = self._idle.pop()
+            self.reused += 1
+        else:
+            dialog = self.factory()
+            self.created += 1
+        for name, value in dict(DIALOG_DEFAULTS, **props).items():
+            setattr(dialog, name, value)
+        dialog.on_dismiss = lambda e, d=dialog: self._dismissed(d)
+
+        self.page.overlay.append(dialog)
+        self._open.append(dialog)
+        dialog.open = True
+        self.updater.request()
+        return dialog
+
+    def close(self, dialog):
+        """다이얼로그 닫기 (overlay 에서는 닫힘이 전송된 뒤에 뺌)"""
+        if dialog not in self._open:
+            return
+        self._open.remove(dialog)
+        dialog.open = False
+        self._closing.append((dialog, self.updater.flushes))
+        self.updater.request()
+        self._prune()
+
+    def overlay_size(self):
+        return len(self.page.overlay)
+
+    def _dismissed(self, dialog):
+        """바깥을 눌러 클라이언트에서 이미 닫힌 경우 (바로 정리해도 됨)"""
+        if dialog not in self._open:
+            return
+        self._open.remove(dialog)
+        dialog.open = False
+        self._closing.append((dialog, -1))
+        self._prune()
+
+    def _prune(self):
+        """닫힘이 전송된 다이얼로그를 overlay 에서 빼고 풀에 보관"""
+        flushes = self.updater.flushes
+        still_closing = []
+        for dialog, closed_at in self._closing:
+            if closed_at >= flushes:
+                still_closing.append((dialog, closed_at))
+                continue
+            if dialog in self.page.overlay:
+                self.page.overlay.remove(dialog)
+            if len(self._idle) < self.max_idle:
+                # 이전 내용(컨트롤/핸들러)을 붙잡고 있지 않도록 비워서 보관
+                for name, value in DIALOG_DEFAULTS.items():
+                    setattr(dialog, name, value)
+                self._idle.append(dialog)
+        self._closing = still_closing
+
+
+def soak(rounds=10000):
+    """다이얼로그를 rounds 번 열고 닫으며 overlay 크기 확인 (하루 종일 켜 둔 키오스크 흉내)"""
+    from update_scheduler import UpdateScheduler
+
+    class FakePage:
+        def __init__(self):
+            self.overlay = []
+            self.updates = 0
+
+        def update(self):
+            self.updates += 1
+
+    page = FakePage()
+    updater = UpdateScheduler(page)
+    dialogs = DialogPool(page, updater)
+    max_overlay = 0
+
+    def handler(step):
+        # 클릭 핸들러 1번 = 갱신 1번
+        nonlocal max_overlay
+        with updater.batch():
+            step()
+            max_overlay = max(max_overlay, dialogs.overlay_size())
+
+    for i in range(rounds):
+        # 장바구니 → 결제 확인 → 주문 완료 → 확인 (닫자마자 다음 다이얼로그를 여는 흐름)
+        state = {}
+        handler(lambda: state.update(cart=dialogs.open(title=f"장바구니 {i}")))
+        handler(lambda: (dialogs.close(state["cart"]), state.update(payment=dialogs.open(title=f"결제 {i}"))))
+        handler(lambda: (dialogs.close(state["payment"]), state.update(done=dialogs.open(title=f"완료 {i}", modal=True))))
+        if i % 10 == 0:
+            handler(lambda: dialogs._dismissed(state["done"]))  # 바깥을 눌러 닫은 경우
+        else:
+            handler(lambda: dialogs.close(state["done"]))
+
+    print(f"다이얼로그 {rounds * 3:,}번 열고 닫음: overlay 최대 {max_overlay}개, 마지막 {dialogs.overlay_size()}개")
+    print(f"  새로 만든 다이얼로그 {dialogs.created}개, 재사용 {dialogs.reused:,}번, page.update {page.updates:,}번")
+    assert max_overlay <= 2
+
+
+if __name__ == "__main__":
+    soak(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,77 @@
+"""프로세스 간 파일 잠금
+
+같은 데이터 디렉터리를 쓰는 여러 키오스크 프로세스가 한 번에 하나씩만 파일을 고치도록 한다.
+POSIX 는 fcntl.flock, Windows 는 msvcrt.locking 을 사용한다.
+"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    잠금 파일을 이용한 배타 잠금 (with 문으로 사용)
+
+    Args:
+        lock_file (str): 잠금 파일 경로 (없으면 생성)
+        timeout (float): 잠금 대기 최대 시간(초), None 이면 무한 대기
+    """
+    def __init__(self, lock_file, timeout=None):
+        self.lock_file = lock_file
+        self.timeout = timeout
+        self._fd = None
+
+    def acquire(self):
+        """잠금 획득"""
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None and self.timeout is None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                deadline = None if self.timeout is None else time.monotonic() + self.timeout
+                while not self._try_lock(fd):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"잠금을 얻지 못했습니다: {self.lock_file}")
+                    time.sleep(0.005)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self):
+        """잠금 해제"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    @staticmethod
+    def _try_lock(fd):
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
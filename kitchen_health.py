@@ -0,0 +1,145 @@
+"""주방 연결 상태 감시 (heartbeat + circuit breaker)
+
+주방 시스템이 꺼져 있으면 send_order 가 매번 timeout(10초)을 다 기다린 뒤 실패한다.
+HealthMonitor 는 백그라운드에서 짧은 timeout 으로 주기적으로 ping 을 보내 연결 상태와 왕복 시간(RTT)을 기록하고,
+circuit breaker 상태를 관리한다.
+
+- closed    : 정상. 전송 허용
+- open      : 연속 failure_threshold 회 실패. 전송은 기다리지 않고 바로 실패 (outbox 에 남아 나중에 재전송)
+- half_open : open 후 reset_timeout 이 지나면 시험 전송 1건만 허용, 성공하면 closed / 실패하면 다시 open
+
+heartbeat 가 성공하면 바로 closed 로 돌아온다. 관리자 화면은 snapshot() 으로 기록된 값만 읽으므로
+UI 스레드에서 네트워크를 기다리지 않는다.
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_LABELS = {CLOSED: "연결됨", OPEN: "끊김", HALF_OPEN: "재연결 확인 중"}
+
+
+class HealthMonitor:
+    """
+    주방 엔드포인트 1곳의 상태 감시 + circuit breaker
+
+    Args:
+        sender: ping(timeout) -> RTT(초) 를 가진 전송기 (TCPOrderSender). sender.health 로 연결된다.
+        name (str): 표시 이름 (스테이션 이름 등)
+        interval (float): heartbeat 간격(초)
+        probe_timeout (float): heartbeat 1회의 timeout(초), 전송 timeout 보다 짧게
+        failure_threshold (int): 연속 실패가 이 횟수가 되면 open
+        reset_timeout (float): open 후 시험 전송을 허용하기까지의 시간(초)
+        on_change: 상태가 바뀌면 호출 (name, old_state, new_state), 잠금 밖에서 호출된다
+    """
+    def __init__(self, sender, name="kitchen", interval=2.0, probe_timeout=1.0,
+                 failure_threshold=2, reset_timeout=5.0, on_change=None):
+        self.sender = sender
+        self.name = name
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+
+        self.state = CLOSED
+        self.rtt = None           # 마지막 heartbeat 왕복 시간(초)
+        self.rtt_avg = None       # 왕복 시간 이동 평균(초)
+        self.last_ok = None       # 마지막 성공 시각 (time.time)
+        self.last_error = None
+        self.consecutive_failures = 0
+        self.fast_failed = 0      # open 상태라 바로 실패시킨 전송 수
+
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        sender.health = self
+
+    def allow(self):
+        """전송해도 되는지 (open 이면 False, half_open 이면 시험 전송 1건만 True)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial = False
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            self.fast_failed += 1
+            return False
+
+    def record_success(self, rtt=None):
+        with self._lock:
+            old_state, self.state = self.state, CLOSED
+            self.consecutive_failures = 0
+            self.last_ok = time.time()
+            self._trial = False
+            if rtt is not None:
+                self.rtt = rtt
+                self.rtt_avg = rtt if self.rtt_avg is None else self.rtt_avg * 0.8 + rtt * 0.2
+        self._changed(old_state, CLOSED)
+
+    def record_failure(self, error):
+        with self._lock:
+            old_state = self.state
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            self._trial = False
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self._opened_at = time.monotonic()
+                self.state = OPEN
+            new_state = self.state
+        self._changed(old_state, new_state)
+
+    def check(self):
+        """heartbeat 1회 (ping 후 결과 기록). 성공하면 RTT(초), 실패하면 None"""
+        try:
+            rtt = self.sender.ping(self.probe_timeout)
+        except Exception as e:
+            self.record_failure(e)
+            return None
+        self.record_success(rtt)
+        return rtt
+
+    def snapshot(self):
+        """관리자 화면용 상태 (기록된 값만 읽음)"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "label": STATE_LABELS[self.state],
+                "rtt_ms": None if self.rtt is None else self.rtt * 1000,
+                "rtt_avg_ms": None if self.rtt_avg is None else self.rtt_avg * 1000,
+                "last_ok": self.last_ok,
+                "last_error": self.last_error,
+                "fast_failed": self.fast_failed,
+            }
+
+    def start(self):
+        """백그라운드 heartbeat 시작"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"kitchen-health-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _changed(self, old_state, new_state):
+        # half_open 은 시험 전송 중인 잠깐의 상태라 open 과 같이 취급
+        if self.on_change and (old_state == CLOSED) != (new_state == CLOSED):
+            self.on_change(self.name, old_state, new_state)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
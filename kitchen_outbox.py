@@ -0,0 +1,480 @@
+"""주방 전송 outbox
+
+주문을 바로 주방으로 보내지 않고 먼저 outbox 파일(kitchen_outbox.jsonl)에 기록한 뒤,
+백그라운드 디스패처가 전송한다.
+
+- 전송에 실패하면 지수 백오프(0.5초, 1초, 2초 ... 최대 30초)로 다시 시도한다.
+  주방 네트워크가 잠시 끊겨도 결제는 막히지 않고 주문도 사라지지 않는다.
+- 기록은 append-only 저널: 추가({"op": "add"}) / 전달 완료({"op": "done"}) 한 줄씩.
+  스테이션별로 나눠 보내는 전송기(StationRouter.send_remaining)는 일부 스테이션만 받은 경우
+  받은 스테이션({"op": "ack"})을 기록해, 재전송 때 실패한 스테이션 티켓만 다시 보낸다.
+  보낼 티켓이 없는 주문(품목 없음, 모든 스테이션이 이미 받음)은 전송기가 success=None 으로 알려 오며,
+  전달로 세지 않고 skipped 로 세어 outbox 에서 뺀다 (재시도하지 않음).
+  키오스크를 다시 시작하면 전달되지 않은 주문부터 이어서 보낸다.
+- 주문마다 idempotency_key(날짜#주문번호)를 붙여 보낸다. 응답을 받기 전에 끊겨 다시 보내도
+  주방 서버가 같은 키의 주문을 한 번만 접수한다 (주문번호는 매일 1번부터 다시 시작하므로 날짜를 붙임).
+- 네트워크가 끊긴 동안 밀린 주문은 복구되면 max_batch 건씩 한 연결로 파이프라이닝해 보낸다.
+- kitchen_info.priority(urgent/high/normal) 별 대기열에서 급한 주문부터 꺼낸다. 밀린 normal 주문이
+  많아도 urgent 주문이 먼저 나간다. 목표 지연 시간(latency_targets)을 넘긴 주문은 한 단계 위 우선순위로
+  올려(normal → high) 오래 밀리지 않게 하되, urgent 보다 앞서지 않고 아직 목표 지연 안에 있는 high 주문보다도
+  앞서지 않는다 (목표 지연을 넘긴 high 주문과만 마감 시각 순으로 섞임).
+  동시에 전송하는 디스패처 수는 workers 로 제한한다.
+- 연결 복구를 알게 되면(kitchen_health.py) retry_now() 로 백오프를 기다리지 않고 바로 다시 보낸다.
+- 같은 디렉터리를 쓰는 키오스크 프로세스마다 outbox 파일을 따로 쓴다. 시작할 때 잠기지 않은 파일
+  (kitchen_outbox.jsonl, kitchen_outbox-1.jsonl ...)을 잠가 종료할 때까지 가지고 있으므로, 다른 프로세스가
+  정리(compact)하면서 이 프로세스의 주문을 지우거나 이 프로세스의 주문을 가져가 보내지 않는다.
+  종료된 프로세스가 남긴 outbox 는 다음에 시작한 프로세스가 가져와 이어서 보낸다.
+- depth() / lag() / get_stats() 로 대기 중인 주문 수와 전달 지연을 확인할 수 있다.
+"""
+import atexit
+import glob
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+from file_lock import FileLock
+from order_store import append_journal, read_journal
+
+OUTBOX_FILE = "kitchen_outbox.jsonl"
+
+# 우선순위 (앞이 급함)와 우선순위별 목표 전달 지연(초)
+PRIORITIES = ("urgent", "high", "normal")
+LATENCY_TARGETS = {"urgent": 5, "high": 15, "normal": 60}
+
+
+def order_key(order_data):
+    """주문의 idempotency key (날짜#주문번호)"""
+    return f"{str(order_data.get('timestamp', ''))[:10]}#{order_data.get('order_number')}"
+
+
+def order_priority(order_data):
+    """주문의 kitchen_info.priority (모르는 값이면 normal)"""
+    priority = (order_data.get("kitchen_info") or {}).get("priority", "normal")
+    return priority if priority in PRIORITIES else "normal"
+
+
+class KitchenOutbox:
+    """
+    주방 전송 대기열 + 우선순위 재시도 디스패처
+
+    Args:
+        sender: send_order(order_data) -> (success, message) 를 가진 전송기 (TCPOrderSender)
+        outbox_file (str): outbox 저널 경로 (다른 프로세스가 쓰고 있으면 kitchen_outbox-1.jsonl 처럼 번호를 붙인 파일)
+        base_delay (float): 첫 재시도 대기 시간(초)
+        max_delay (float): 최대 재시도 대기 시간(초)
+        max_batch (int): 밀린 주문을 한 번에 보낼 최대 건수 (sender.send_orders 로 파이프라이닝)
+        workers (int): 동시에 전송하는 디스패처 스레드 수
+        latency_targets (dict): 우선순위별 목표 전달 지연(초)
+        on_delivered: 전달 성공 시 호출 (order_data, message)
+        on_retry: 전달 실패 시 호출 (order_data, message, delay)
+    """
+    def __init__(self, sender, outbox_file=OUTBOX_FILE, base_delay=0.5, max_delay=30, max_batch=100,
+                 workers=1, latency_targets=None, on_delivered=None, on_retry=None):
+        self.sender = sender
+        self.outbox_file, self._owner = self._claim(outbox_file)
+        self._base_file = outbox_file
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.latency_targets = dict(LATENCY_TARGETS, **(latency_targets or {}))
+        self.on_delivered = on_delivered
+        self.on_retry = on_retry
+
+        # 전달 대기 주문: key -> {"order": ..., "enqueued_at": ..., "acked": 이미 받은 스테이션 (있으면)}
+        # 우선순위별 대기열(추가된 순서)에 있거나, 디스패처가 전송 중(_in_flight)
+        self.pending = {}
+        self._queues = {priority: OrderedDict() for priority in PRIORITIES}
+        self._in_flight = set()
+
+        # 통계
+        self.delivered = 0
+        self.skipped = 0
+        self.attempts = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_delivery_lag = 0.0
+        self.late = {priority: 0 for priority in PRIORITIES}
+
+        self._cond = threading.Condition()
+        self._closed = False
+        self._retry_at = 0.0
+        self._consecutive_failures = 0
+        self._recover()
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"kitchen-outbox-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        atexit.register(self.close)
+
+    def put(self, order_data):
+        """주문을 outbox 에 기록하고 바로 반환 (같은 키의 주문이 이미 대기 중이면 무시)"""
+        key = order_key(order_data)
+        entry = {"op": "add", "key": key, "order": order_data, "enqueued_at": time.time()}
+        with self._cond:
+            if key in self.pending:
+                return
+            append_journal(self.outbox_file, [entry])
+            self._enqueue(key, entry)
+            self._cond.notify()
+
+    def retry_now(self):
+        """재시도 대기를 끝내고 바로 다시 전송 (주방 연결이 복구되었을 때)"""
+        with self._cond:
+            self._retry_at = 0.0
+            self._consecutive_failures = 0
+            self._cond.notify_all()
+
+    def depth(self, priority=None):
+        """전달 대기 중인 주문 수 (priority 를 주면 그 우선순위만)"""
+        with self._cond:
+            if priority is None:
+                return len(self.pending)
+            return sum(1 for entry in self.pending.values() if order_priority(entry["order"]) == priority)
+
+    def lag(self, priority=None):
+        """가장 오래 기다린 주문의 대기 시간(초), 대기 주문이 없으면 0"""
+        with self._cond:
+            oldest = [
+                entry["enqueued_at"] for entry in self.pending.values()
+                if priority is None or order_priority(entry["order"]) == priority
+            ]
+        return time.time() - min(oldest) if oldest else 0.0
+
+    def get_stats(self):
+        """대기 주문 수 / 지연 / 전달·실패 횟수, 우선순위별 대기 수·지연·목표 초과 전달 수"""
+        return {
+            "pending": self.depth(),
+            "lag": self.lag(),
+            "delivered": self.delivered,
+            "skipped": self.skipped,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_delivery_lag": self.last_delivery_lag,
+            "priorities": {
+                priority: {
+                    "pending": self.depth(priority),
+                    "lag": self.lag(priority),
+                    "target": self.latency_targets[priority],
+                    "late": self.late[priority],
+                }
+                for priority in PRIORITIES
+            },
+        }
+
+    def wait_empty(self, timeout=None):
+        """
+        대기 주문이 모두 전달될 때까지 대기
+
+        Returns:
+            bool: timeout 안에 모두 전달되었으면 True
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self.pending, timeout)
+
+    def close(self):
+        """디스패처 종료 (전달되지 않은 주문은 outbox 에 남아 다음 실행 때 전송)"""
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._owner.release()
+        atexit.unregister(self.close)
+
+    def _enqueue(self, key, entry, front=False):
+        self.pending[key] = entry
+        queue = self._queues[order_priority(entry["order"])]
+        queue[key] = entry
+        if front:
+            queue.move_to_end(key, last=False)
+
+    @staticmethod
+    def _claim(outbox_file):
+        """다른 프로세스가 쓰고 있지 않은 outbox 파일을 골라 잠금 (close 때까지 유지)"""
+        base, ext = os.path.splitext(outbox_file)
+        for slot in itertools.count():
+            path = outbox_file if slot == 0 else f"{base}-{slot}{ext}"
+            lock = FileLock(path + ".lock", timeout=0)
+            try:
+                lock.acquire()
+            except TimeoutError:
+                continue
+            return path, lock
+
+    def _recover(self):
+        """
+        outbox 저널을 다시 읽어 전달되지 않은 주문만 남기고 파일을 정리
+
+        종료된 프로세스가 남긴 다른 outbox 파일(잠겨 있지 않은 파일)의 주문도 가져온다.
+        """
+        pending = self._read_pending(self.outbox_file)
+        base, ext = os.path.splitext(self._base_file)
+        for path in sorted({self._base_file, *glob.glob(f"{glob.escape(base)}-*{ext}")}):
+            if path == self.outbox_file or not os.path.exists(path):
+                continue
+            lock = FileLock(path + ".lock", timeout=0)
+            try:
+                lock.acquire()
+            except TimeoutError:
+                continue
+            try:
+                adopted = {key: entry for key, entry in self._read_pending(path).items() if key not in pending}
+                # 가져온 주문을 이 프로세스의 outbox 에 먼저 기록한 뒤 원래 파일 삭제
+                if adopted:
+                    append_journal(self.outbox_file, list(adopted.values()))
+                    pending.update(adopted)
+                os.remove(path)
+            finally:
+                lock.release()
+        for key, entry in pending.items():
+            self._enqueue(key, entry)
+        self._compact()
+
+    @staticmethod
+    def _read_pending(outbox_file):
+        """outbox 저널에서 전달되지 않은 주문: key -> add 기록"""
+        pending = {}
+        for record in read_journal(outbox_file):
+            if record.get("op") == "add":
+                pending.setdefault(record["key"], record)
+            elif record.get("op") == "done":
+                pending.pop(record["key"], None)
+            elif record.get("op") == "ack" and record["key"] in pending:
+                pending[record["key"]]["acked"] = record["stations"]
+        return pending
+
+    def _compact(self):
+        """대기 주문만 남기도록 저널을 다시 쓰기 (임시 파일에 쓴 뒤 교체)"""
+        if not self.pending:
+            if os.path.exists(self.outbox_file):
+                os.truncate(self.outbox_file, 0)
+            return
+        tmp_file = self.outbox_file + ".tmp"
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        append_journal(tmp_file, list(self.pending.values()))
+        os.replace(tmp_file, self.outbox_file)
+
+    def _take_batch(self):
+        """
+        다음에 보낼 주문들을 대기열에서 꺼냄 (잠금 안에서 호출)
+
+        항상 급한 우선순위부터(urgent → high → normal), 같은 우선순위 안에서는 먼저 들어온 순서.
+        목표 지연을 넘긴 주문은 한 단계 위 우선순위로 올려(aging) 그 우선순위 주문과 마감 시각 순으로 섞는다.
+        다만 올라간 주문은 그 우선순위에서 역시 목표 지연을 넘긴 주문하고만 섞이고, 아직 목표 지연 안에 있는
+        (더 최근에 들어온) 주문은 앞지르지 못한다. 가장 급한 우선순위로는 올리지 않으므로, 밀린 주문이 모두
+        목표 지연을 넘겨도 urgent 주문을 앞지르지 못한다.
+        """
+        limit = self.max_batch if hasattr(self.sender, "send_orders") else 1
+        now = time.time()
+        batch = []
+        for level, priority in enumerate(PRIORITIES):
+            queue = self._queues[priority]
+            lower = PRIORITIES[level + 1] if 0 < level < len(PRIORITIES) - 1 else None
+            while len(batch) < limit:
+                # (마감 시각, 대기열): 이 우선순위의 가장 오래된 주문, 목표 지연을 넘긴 한 단계 아래 주문
+                heads = []
+                if queue:
+                    entry = next(iter(queue.values()))
+                    heads.append((entry["enqueued_at"] + self.latency_targets[priority], queue))
+                # 이 우선순위의 가장 오래된 주문이 아직 목표 지연 안이면 올라온 주문보다 먼저 (aging 상한)
+                fresh = bool(heads) and heads[0][0] > now
+                if lower is not None and not fresh and self._queues[lower]:
+                    entry = next(iter(self._queues[lower].values()))
+                    deadline = entry["enqueued_at"] + self.latency_targets[lower]
+                    if deadline <= now:
+                        heads.append((deadline, self._queues[lower]))
+                if not heads:
+                    break
+                source = min(heads, key=lambda head: head[0])[1]
+                key, entry = next(iter(source.items()))
+                del source[key]
+                self._in_flight.add(key)
+                batch.append((key, entry))
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    # 재시도 대기 중이면 모든 디스패처가 함께 기다림
+                    wait = self._retry_at - time.time()
+                    if wait > 0:
+                        self._cond.wait(wait)
+                    elif any(self._queues.values()):
+                        break
+                    else:
+                        self._cond.wait()
+                batch = self._take_batch()
+
+            results = self._send(batch)
+            delivered = [(key, entry) for (key, entry), (success, _) in zip(batch, results) if success]
+            skipped = [(key, entry) for (key, entry), (success, _) in zip(batch, results) if success is None]
+            failed = [
+                (key, entry) for (key, entry), (success, _) in zip(batch, results)
+                if not success and success is not None
+            ]
+            self._mark_done(delivered, failed, skipped)
+            if self.on_delivered:
+                for (key, entry), (success, message) in zip(batch, results):
+                    if success:
+                        self.on_delivered(entry["order"], message)
+            if not failed:
+                with self._cond:
+                    self._consecutive_failures = 0
+                continue
+
+            # 실패: 지수 백오프 (동시에 다시 붙지 않도록 약간의 지터)
+            order_data, message = next(
+                (entry["order"], message) for (key, entry), (success, message) in zip(batch, results)
+                if not success and success is not None
+            )
+            with self._cond:
+                self._consecutive_failures += 1
+                self.failures += 1
+                self.last_error = message
+                delay = min(self.base_delay * 2 ** (self._consecutive_failures - 1), self.max_delay)
+                delay *= random.uniform(0.8, 1.2)
+                self._retry_at = max(self._retry_at, time.time() + delay)
+            if self.on_retry:
+                self.on_retry(order_data, message, delay)
+
+    def _send(self, batch):
+        """
+        대기 주문 전송. 여러 건이면 send_orders 로 한 연결에 파이프라이닝
+
+        Returns:
+            list: 주문 순서대로 (success, message)
+        """
+        orders = [dict(entry["order"], idempotency_key=key) for key, entry in batch]
+        self.attempts += len(orders)
+        try:
+            if hasattr(self.sender, "send_remaining"):
+                return self._send_remaining(batch, orders)
+            if len(orders) > 1:
+                return self.sender.send_orders(orders)
+            return [self.sender.send_order(orders[0])]
+        except Exception as e:
+            traceback.print_exc()
+            return [(False, str(e))] * len(orders)
+
+    def _send_remaining(self, batch, orders):
+        """이미 받은 스테이션은 빼고 전송, 실패한 주문은 새로 받은 스테이션을 기록"""
+        results = self.sender.send_remaining(orders, [entry.get("acked", ()) for _, entry in batch])
+        acks = []
+        for (key, entry), (success, _, stations) in zip(batch, results):
+            if not success and success is not None and stations and set(stations) != set(entry.get("acked", ())):
+                acks.append((key, entry, sorted(stations)))
+        if acks:
+            with self._cond:
+                append_journal(self.outbox_file, [{"op": "ack", "key": key, "stations": stations} for key, _, stations in acks])
+                for _, entry, stations in acks:
+                    entry["acked"] = stations
+        return [(success, message) for success, message, _ in results]
+
+    def _mark_done(self, delivered, failed, skipped=()):
+        """
+        전달 결과 반영 (대기 주문이 없으면 저널을 비움)
+
+        실패한 주문은 다음에 먼저 나가도록 대기열 맨 앞으로 되돌린다.
+        보낼 티켓이 없어 건너뛴 주문(skipped)은 전달된 주문처럼 outbox 에서 빼지만 전달 수에는 넣지 않는다.
+        """
+        now = time.time()
+        with self._cond:
+            for key, entry in reversed(failed):
+                self._in_flight.discard(key)
+                self._enqueue(key, entry, front=True)
+            for key, entry in delivered:
+                self._in_flight.discard(key)
+                self.pending.pop(key, None)
+                priority = order_priority(entry["order"])
+                if now - entry["enqueued_at"] > self.latency_targets[priority]:
+                    self.late[priority] += 1
+            for key, entry in skipped:
+                self._in_flight.discard(key)
+                self.pending.pop(key, None)
+            finished = list(delivered) + list(skipped)
+            if finished:
+                if self.pending:
+                    append_journal(self.outbox_file, [{"op": "done", "key": key} for key, _ in finished])
+                else:
+                    os.truncate(self.outbox_file, 0)
+                self.skipped += len(skipped)
+            if delivered:
+                self.delivered += len(delivered)
+                self.last_delivery_lag = now - delivered[-1][1]["enqueued_at"]
+            self._cond.notify_all()
+
+
+def overdue_check(backlog=50, max_batch=10):
+    """
+    주방 연결이 끊긴 동안 normal 주문이 밀려 모두 목표 지연을 넘긴 뒤 urgent 주문이 들어와도
+    연결이 복구되면 urgent 주문이 가장 먼저, 새 high 주문이 그다음으로 전달되는지 확인
+    """
+    import tempfile
+
+    class FlakySender:
+        def __init__(self):
+            self.down = True
+            self.delivered = []
+
+        def send_orders(self, orders):
+            if self.down:
+                return [(False, "주방 연결 끊김")] * len(orders)
+            self.delivered.extend(order["order_number"] for order in orders)
+            return [(True, "ok")] * len(orders)
+
+        def send_order(self, order_data):
+            return self.send_orders([order_data])[0]
+
+    def order(number, priority):
+        return {
+            "order_number": number,
+            "timestamp": "2025-01-01T12:00:00",
+            "items": [],
+            "kitchen_info": {"priority": priority},
+        }
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        sender = FlakySender()
+        outbox = KitchenOutbox(sender, os.path.join(data_dir, OUTBOX_FILE), base_delay=60, max_batch=max_batch)
+        for number in range(1, backlog + 1):
+            outbox.put(order(number, "normal"))
+
+        # 첫 전송이 실패해 대기열로 돌아올 때까지 기다린 뒤, 2분 동안 끊겨 있었던 것처럼 대기 시간을 늘림
+        with outbox._cond:
+            outbox._cond.wait_for(lambda: outbox.failures and not outbox._in_flight, 5)
+            for entry in outbox.pending.values():
+                entry["enqueued_at"] -= 120
+        outbox.put(order(backlog + 1, "urgent"))
+        outbox.put(order(backlog + 2, "high"))
+
+        sender.down = False
+        outbox.retry_now()
+        assert outbox.wait_empty(5)
+        outbox.close()
+
+    urgent_at = sender.delivered.index(backlog + 1) + 1
+    high_at = sender.delivered.index(backlog + 2) + 1
+    print(f"밀린 normal {backlog}건(목표 지연 초과) 뒤에 들어온 urgent: {urgent_at}번째 전달, high: {high_at}번째 전달")
+    assert urgent_at == 1
+    assert high_at == 2, "목표 지연을 넘긴 normal 주문이 새 high 주문을 앞질렀습니다"
+    assert sorted(sender.delivered) == list(range(1, backlog + 3))
+
+
+if __name__ == "__main__":
+    # 사용법: python kitchen_outbox.py [밀린 주문 수]
+    overdue_check(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,368 @@
+"""주방 전송 프레임 코덱
+
+키오스크(tcp.py)와 주방 서버(kitchen_server.py)가 함께 쓰는 프레임 형식. 헤더는 항상 10바이트.
+- v1 (기존): 10자리 ASCII 길이 헤더(예: b"0000000123") + UTF-8 JSON 본문
+- v2       : b"KWP" + 버전(1) + 코덱(1) + 예약(1) + 본문 길이(4, big-endian) + 본문
+             코덱 0 = 공백 없는 JSON, 1 = zlib 압축 JSON (큰 주문만 압축)
+
+v2 는 연결 직후 hello 로 협상한다. 클라이언트가 v2 hello 프레임을 보내고, 서버가 v2 hello 로
+답하면 v2 를 쓴다. 기존 서버는 숫자가 아닌 헤더를 읽지 못해 연결을 닫거나 v1 으로 답하므로
+그때는 v1 으로 보낸다 (기존 서버와 호환).
+v2 연결에서는 {"type": "ping"} 에 {"type": "pong"} 으로 답해 연결 상태와 왕복 시간을 확인한다 (kitchen_health.py).
+
+한 번의 recv 가 프레임 하나를 다 돌려준다는 보장이 없으므로, 정해진 바이트 수를 다 받을 때까지 읽는다.
+JSON 은 메시지당 한 번만 UTF-8 로 인코딩하고 길이는 인코딩된 바이트로 계산한다.
+
+사용법: python kitchen_protocol.py [fuzz|bench] [반복 횟수]
+  fuzz  → 쪼개지거나 이어 붙은 입력으로 디코더 퍼즈 검사
+  bench → v1(indent=2) / v2 JSON / v2 zlib 의 전송 바이트와 인코딩/디코딩 시간 비교
+"""
+import codecs
+import json
+import struct
+import zlib
+
+HEADER_SIZE = 10
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+MAGIC = b"KWP"
+WIRE_VERSION = 2
+CODEC_JSON = 0
+CODEC_ZLIB = 1
+CODEC_NAMES = {CODEC_JSON: "json", CODEC_ZLIB: "zlib"}
+COMPRESS_THRESHOLD = 1024
+_V2_HEADER = struct.Struct(">3sBBxI")
+
+HELLO_TYPE = "hello"
+PING_TYPE = "ping"
+PONG_TYPE = "pong"
+
+
+class FrameError(ValueError):
+    """헤더가 잘못되었거나 프레임이 너무 큰 경우"""
+
+
+def encode_frame(message, version=1, compress=False, indent=None):
+    """
+    메시지(dict) → 헤더 + 본문 bytes (UTF-8 인코딩 1회)
+
+    Args:
+        version (int): 1 이면 기존 숫자 헤더, 2 이면 v2 헤더
+        compress (bool): v2 에서 본문이 COMPRESS_THRESHOLD 이상이고 압축이 더 작으면 zlib 압축
+        indent (int): JSON 들여쓰기 (None 이면 공백 없는 JSON)
+    """
+    separators = None if indent is not None else (',', ':')
+    payload = json.dumps(message, ensure_ascii=False, indent=indent, separators=separators).encode('utf-8')
+    if version < 2:
+        return f"{len(payload):0{HEADER_SIZE}d}".encode('ascii') + payload
+
+    codec = CODEC_JSON
+    if compress and len(payload) >= COMPRESS_THRESHOLD:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            payload, codec = compressed, CODEC_ZLIB
+    return _V2_HEADER.pack(MAGIC, WIRE_VERSION, codec, len(payload)) + payload
+
+
+def parse_header(header, max_size=MAX_FRAME_SIZE):
+    """
+    10바이트 헤더 해석
+
+    Returns:
+        tuple: (version: 1 또는 2, codec, 본문 길이)
+    """
+    header = bytes(header)
+    if len(header) != HEADER_SIZE:
+        raise FrameError(f"잘못된 프레임 헤더: {header!r}")
+    if header.isdigit():
+        version, codec, size = 1, CODEC_JSON, int(header)
+    elif header.startswith(MAGIC):
+        _, version, codec, size = _V2_HEADER.unpack(header)
+        if version != WIRE_VERSION or codec not in CODEC_NAMES:
+            raise FrameError(f"지원하지 않는 프레임 형식: 버전 {version}, 코덱 {codec}")
+    else:
+        raise FrameError(f"잘못된 프레임 헤더: {header!r}")
+    if size > max_size:
+        raise FrameError(f"프레임이 너무 큽니다: {size} 바이트")
+    return version, codec, size
+
+
+def decode_payload(payload, codec=CODEC_JSON):
+    """
+    본문 bytes/memoryview → 메시지 (memoryview 도 bytes 로 복사하지 않고 바로 디코딩)
+
+    Raises:
+        FrameError: 압축/UTF-8/JSON 이 깨진 본문
+    """
+    try:
+        if codec == CODEC_ZLIB:
+            payload = zlib.decompress(payload)
+        return json.loads(codecs.decode(payload, 'utf-8'))
+    except (zlib.error, ValueError) as e:
+        raise FrameError(f"손상된 프레임 본문: {e}") from e
+
+
+def recv_exact(sock, size):
+    """
+    size 바이트를 모두 받을 때까지 미리 할당한 버퍼로 읽기 (recv_into, 복사 없음)
+
+    Raises:
+        ConnectionError: 다 받기 전에 상대가 연결을 닫은 경우
+    """
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("연결이 종료되었습니다.")
+        received += n
+    return buf
+
+
+def send_frame(sock, message, version=1, compress=False, indent=None):
+    """메시지 1건 전송 (헤더와 본문을 sendall 한 번으로)"""
+    sock.sendall(encode_frame(message, version, compress, indent))
+
+
+def recv_message(sock, max_size=MAX_FRAME_SIZE):
+    """메시지 1건 수신. (메시지, 프레임 버전) 반환"""
+    version, codec, size = parse_header(recv_exact(sock, HEADER_SIZE), max_size)
+    return decode_payload(recv_exact(sock, size), codec), version
+
+
+def recv_frame(sock, max_size=MAX_FRAME_SIZE):
+    """메시지 1건 수신"""
+    return recv_message(sock, max_size)[0]
+
+
+async def read_message(reader, max_size=MAX_FRAME_SIZE):
+    """asyncio StreamReader 에서 메시지 1건 수신 (readexactly 가 쪼개진 입력을 모아 줌). (메시지, 프레임 버전) 반환"""
+    version, codec, size = parse_header(await reader.readexactly(HEADER_SIZE), max_size)
+    return decode_payload(await reader.readexactly(size), codec), version
+
+
+async def read_frame(reader, max_size=MAX_FRAME_SIZE):
+    """asyncio StreamReader 에서 메시지 1건 수신"""
+    return (await read_message(reader, max_size))[0]
+
+
+def hello_message(codecs=("json", "zlib")):
+    """협상용 hello (클라이언트는 지원하는 코덱, 서버는 그중 받아들인 코덱)"""
+    return {"type": HELLO_TYPE, "version": WIRE_VERSION, "codecs": list(codecs)}
+
+
+def is_hello(message):
+    return isinstance(message, dict) and message.get("type") == HELLO_TYPE
+
+
+def ping_message():
+    """연결 확인용 heartbeat (v2 로 협상한 연결에서만 보냄, 기존 서버는 주문으로 받을 수 있으므로)"""
+    return {"type": PING_TYPE}
+
+
+def is_ping(message):
+    return isinstance(message, dict) and message.get("type") == PING_TYPE
+
+
+def is_pong(message):
+    return isinstance(message, dict) and message.get("type") == PONG_TYPE
+
+
+class FrameDecoder:
+    """
+    스트림 디코더: 받은 데이터를 feed 하면 완성된 메시지들을 반환
+
+    한 번에 받은 데이터에 프레임 여러 개가 들어 있거나, 프레임이 여러 번에 나뉘어 와도 된다.
+    v1/v2 프레임이 섞여 있어도 된다.
+    다 받지 못한 나머지는 버퍼에 남겨 두고 다음 feed 때 이어 붙인다.
+
+    본문이 깨진 프레임은 건너뛰고 FrameError 를 낸다 (다음 feed 는 그 다음 프레임부터).
+    헤더가 깨지면 프레임 경계를 알 수 없으므로 받아 둔 데이터를 버린다.
+    오류 전에 완성된 메시지는 다음 feed 에서 함께 반환한다.
+    """
+    def __init__(self, max_size=MAX_FRAME_SIZE):
+        self.max_size = max_size
+        self._buf = bytearray()
+        self._pos = 0
+        self._ready = []
+
+    def feed(self, data):
+        """
+        Args:
+            data (bytes): 받은 데이터 (조각이어도 됨)
+
+        Returns:
+            list: 이번에 완성된 메시지 리스트
+        """
+        self._buf += data
+        messages, self._ready = self._ready, []
+        view = memoryview(self._buf)
+        try:
+            while len(self._buf) - self._pos >= HEADER_SIZE:
+                start = self._pos + HEADER_SIZE
+                try:
+                    _, codec, size = parse_header(view[self._pos:start], self.max_size)
+                except FrameError:
+                    self._pos = len(self._buf)
+                    raise
+                end = start + size
+                if len(self._buf) < end:
+                    break
+                # 본문이 깨져도 다음 프레임부터 읽도록 위치를 먼저 넘김
+                self._pos = end
+                messages.append(decode_payload(view[start:end], codec))
+        except FrameError:
+            # 오류의 traceback 이 본문 view 를 잡고 있어 버퍼 크기를 바꿀 수 없으므로 남은 부분을 새로 만듦
+            self._ready = messages
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+            raise
+        finally:
+            view.release()
+
+        # 처리한 앞부분은 버퍼에서 제거 (남은 조각만 보관)
+        if self._pos:
+            del self._buf[:self._pos]
+            self._pos = 0
+        return messages
+
+    def pending(self):
+        """아직 완성되지 않은 프레임의 바이트 수"""
+        return len(self._buf)
+
+
+def fuzz(rounds=200, seed=0):
+    """
+    프레임들을 임의 크기로 쪼개거나 이어 붙여 FrameDecoder / recv_exact 에 넣고
+    원래 메시지가 그대로 나오는지 확인
+    """
+    import random
+    import socket
+    import threading
+
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        messages = [
+            {
+                "order_number": rng.randint(1, 999),
+                "items": [{"name": "스테이크🥩" * rng.randint(0, 50), "quantity": 1}] * rng.randint(0, 30),
+            }
+            for _ in range(rng.randint(1, 20))
+        ]
+        stream = b"".join(
+            encode_frame(m, version=rng.choice([1, 2]), compress=rng.random() < 0.5, indent=rng.choice([None, 2]))
+            for m in messages
+        )
+
+        # 1) 디코더에 임의 크기 조각으로 입력 (1바이트 조각 ~ 여러 프레임이 한 번에)
+        decoder = FrameDecoder()
+        decoded = []
+        pos = 0
+        while pos < len(stream):
+            step = rng.choice([1, 2, 7, HEADER_SIZE, 100, 4096, len(stream)])
+            decoded.extend(decoder.feed(stream[pos:pos + step]))
+            pos += step
+        assert decoded == messages, "디코더 결과가 다릅니다"
+        assert decoder.pending() == 0
+
+        # 2) 소켓으로 조각내어 보내고 recv_frame 으로 수신
+        a, b = socket.socketpair()
+
+        def writer():
+            pos = 0
+            while pos < len(stream):
+                step = rng.randint(1, 3000)
+                a.sendall(stream[pos:pos + step])
+                pos += step
+            a.close()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        received = [recv_frame(b) for _ in messages]
+        thread.join()
+        try:
+            recv_frame(b)
+            raise AssertionError("연결 종료를 감지하지 못했습니다")
+        except ConnectionError:
+            pass
+        b.close()
+        assert received == messages, "recv_frame 결과가 다릅니다"
+
+    # 잘못된 헤더는 FrameError
+    for bad in (
+        b"00000abc12{}",
+        f"{MAX_FRAME_SIZE + 1:010d}".encode(),
+        _V2_HEADER.pack(MAGIC, 3, CODEC_JSON, 2) + b"{}",
+        _V2_HEADER.pack(MAGIC, WIRE_VERSION, 9, 2) + b"{}",
+    ):
+        try:
+            FrameDecoder().feed(bad)
+            raise AssertionError("잘못된 헤더를 통과시켰습니다")
+        except FrameError:
+            pass
+
+    # 본문이 깨진 프레임은 건너뛰고, 앞뒤 프레임은 그대로 나옴
+    good = [{"order_number": 1}, {"order_number": 2}]
+    corrupt = _V2_HEADER.pack(MAGIC, WIRE_VERSION, CODEC_ZLIB, 3) + b"bad"
+    decoder = FrameDecoder()
+    try:
+        decoder.feed(encode_frame(good[0], version=2) + corrupt + encode_frame(good[1], version=2))
+        raise AssertionError("깨진 본문을 통과시켰습니다")
+    except FrameError:
+        pass
+    assert decoder.feed(b"") == good, "깨진 프레임 뒤에서 멈췄습니다"
+    assert decoder.pending() == 0
+    print(f"퍼즈 검사 통과: {rounds}회")
+
+
+def benchmark(count=2000):
+    """작은 주문(3품목) / 큰 주문(40품목)의 형식별 전송 바이트와 인코딩/디코딩 시간 비교"""
+    import time
+
+    def make_order(item_count):
+        items = [
+            {"name": f"메뉴 {i}", "price": 1000 * (i % 30 + 1), "quantity": i % 3 + 1, "image": "🍽️"}
+            for i in range(item_count)
+        ]
+        return {
+            "order_number": 123,
+            "timestamp": "2025-01-01T12:34:56.789012",
+            "order_type": "매장",
+            "items": items,
+            "total": sum(item["price"] * item["quantity"] for item in items),
+            "kitchen_info": {"special_instructions": "", "priority": "normal"},
+        }
+
+    formats = [
+        ("v1 JSON(indent=2)", dict(version=1, indent=2)),
+        ("v1 JSON(공백 없음)", dict(version=1)),
+        ("v2 JSON", dict(version=2)),
+        ("v2 zlib", dict(version=2, compress=True)),
+    ]
+    for label, order in (("작은 주문(3품목)", make_order(3)), ("큰 주문(40품목)", make_order(40))):
+        print(label)
+        for name, options in formats:
+            started = time.perf_counter()
+            for _ in range(count):
+                frame = encode_frame(order, **options)
+            encode_us = (time.perf_counter() - started) / count * 1e6
+
+            decoder = FrameDecoder()
+            started = time.perf_counter()
+            for _ in range(count):
+                decoded = decoder.feed(frame)
+            decode_us = (time.perf_counter() - started) / count * 1e6
+            assert decoded == [order]
+            print(f"  {name:18s}: {len(frame):6,d} 바이트  인코딩 {encode_us:7.1f}us  디코딩 {decode_us:7.1f}us")
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "fuzz"
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    if command == "bench":
+        benchmark(rounds or 2000)
+    else:
+        fuzz(rounds or 200)
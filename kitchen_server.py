@@ -0,0 +1,353 @@
+"""로컬 주방 서버 (주문 프로토콜 참조 구현, 부하/통합 테스트용)
+
+TCPOrderSender 와 같은 프로토콜을 사용한다 (kitchen_protocol.py).
+- 요청/응답 모두 10자리 길이 헤더(예: b"0000000123") + UTF-8 JSON, hello 로 협상하면 v2 프레임
+- asyncio 로 동작해 수백 개의 키오스크 연결을 스레드 없이 처리
+- 한 연결에서 여러 주문을 차례로 받거나 파이프라이닝으로 한꺼번에 받아도 되고, 응답은 받은 순서대로 보냄
+- v2 연결의 ping 에는 pong 으로 답함 (키오스크의 연결 상태 감시용)
+- idempotency_key 가 같은 주문은 한 번만 접수 (재전송된 주문은 "duplicate": true 로 응답)
+  첫 주문의 티켓 기록이 아직 끝나지 않았으면 재전송된 주문은 그 기록을 기다렸다가 같은 결과로 응답
+- ticket_file 을 주면 접수한 주문을 TicketWriter 로 모아서 기록하고, 기록된 뒤에 응답 (fsync 는 모아서 1회)
+
+사용법:
+  python kitchen_server.py [포트] [응답 지연(초)]          → 주방 서버 실행 (kitchen_tickets.jsonl 에 기록)
+  python kitchen_server.py load [연결 수] [연결당 주문 수] → 로컬 서버에 동시 연결 부하 테스트
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from kitchen_protocol import (
+    CODEC_NAMES, PONG_TYPE, encode_frame, hello_message, is_hello, is_ping, read_frame, read_message,
+)
+from order_store import append_journal
+
+TICKET_FILE = "kitchen_tickets.jsonl"
+
+
+class TicketWriter:
+    """
+    주방 티켓 버퍼 기록기
+
+    add() 로 들어온 티켓을 flush_interval 동안 모아 저널에 한 번에 기록(fsync 1회)하고,
+    기록이 끝나면 기다리던 add() 들이 함께 반환된다. 디스크 쓰기는 실행기 스레드에서 해
+    이벤트 루프를 막지 않는다.
+    """
+    def __init__(self, ticket_file=TICKET_FILE, flush_interval=0.005, max_batch=1000):
+        self.ticket_file = ticket_file
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._buffer = []
+        self._wakeup = None
+        self._task = None
+
+        # 통계
+        self.written = 0
+        self.flushes = 0
+
+    async def add(self, ticket):
+        """티켓을 버퍼에 넣고 파일에 기록될 때까지 대기"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((ticket, future))
+        self._wakeup.set()
+        await future
+
+    async def close(self):
+        """남은 티켓을 기록하고 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while self._buffer:
+            await self._flush()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if len(self._buffer) < self.max_batch:
+                await asyncio.sleep(self.flush_interval)
+            await self._flush()
+            if not self._buffer:
+                self._wakeup.clear()
+
+    async def _flush(self):
+        batch, self._buffer = self._buffer[:self.max_batch], self._buffer[self.max_batch:]
+        if not batch:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, append_journal, self.ticket_file, [ticket for ticket, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.written += len(batch)
+        self.flushes += 1
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+
+class KitchenServer:
+    """
+    asyncio 주방 서버
+
+    Args:
+        host (str): 바인드 주소
+        port (int): 포트 (0 이면 빈 포트 사용)
+        latency (float): 응답 지연(초), 느린 매장 Wi-Fi 처럼 왕복 시간이 긴 링크 흉내
+        ticket_file (str): 접수한 주문을 기록할 파일, None 이면 메모리에만 보관
+        keep_orders (bool): 접수한 주문을 orders 리스트에 보관 (부하 테스트에서는 끔)
+    """
+    def __init__(self, host="localhost", port=9999, latency=0, ticket_file=None, keep_orders=True):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.tickets = TicketWriter(ticket_file) if ticket_file else None
+        self.keep_orders = keep_orders
+
+        # 통계
+        self.orders = []
+        self.received = 0
+        self.connections = 0
+        self.active_connections = 0
+
+        self.server_address = None
+        self._keys = set()
+        # 티켓 기록 중인 idempotency_key → 기록 완료 future (재전송된 주문이 기다림)
+        self._inflight = {}
+        self._handlers = {}
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    def on_order(self, order):
+        """주문 접수. 이미 접수한 idempotency_key 면 다시 쌓지 않고 False"""
+        key = order.get("idempotency_key")
+        if key is not None:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+        self.received += 1
+        if self.keep_orders:
+            self.orders.append(order)
+        return True
+
+    async def serve(self):
+        """서버 소켓 열기 (이벤트 루프 안에서 호출), (host, port) 반환"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.server_address = self._server.sockets[0].getsockname()[:2]
+        return self.server_address
+
+    async def serve_forever(self):
+        await self.serve()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        """서버 닫기 (이벤트 루프 안에서 호출), 버퍼에 남은 티켓 기록"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # 열려 있는 연결을 닫고 처리 중인 주문의 응답까지 끝나기를 기다림
+        handlers = list(self._handlers.items())
+        for _, writer in handlers:
+            writer.close()
+        await asyncio.gather(*(task for task, _ in handlers), return_exceptions=True)
+        if self.tickets:
+            await self.tickets.close()
+
+    def start(self):
+        """백그라운드 스레드의 이벤트 루프에서 서버 실행, (host, port) 반환"""
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.serve())
+        self._thread = threading.Thread(target=self._loop.run_forever, name="kitchen-server", daemon=True)
+        self._thread.start()
+        return self.server_address
+
+    def stop(self):
+        """start() 로 실행한 서버 종료"""
+        asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _handle(self, reader, writer):
+        """
+        연결 하나 처리
+
+        요청을 읽는 쪽과 응답을 보내는 쪽을 나눠, 파이프라이닝된 주문은 티켓 기록을 기다리는 동안에도
+        계속 읽는다. 응답은 요청 순서대로 보낸다.
+        """
+        self.connections += 1
+        self.active_connections += 1
+        self._handlers[asyncio.current_task()] = writer
+        replies = asyncio.Queue()
+        replier = asyncio.ensure_future(self._send_replies(writer, replies))
+        try:
+            while True:
+                try:
+                    message, version = await read_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    break
+                due = time.monotonic() + self.latency
+                await replies.put((due, version, asyncio.ensure_future(self._process(message, version))))
+        finally:
+            await replies.put(None)
+            await replier
+            self.active_connections -= 1
+            self._handlers.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _process(self, message, version):
+        """메시지 1건 처리 후 응답 프레임 반환"""
+        if version >= 2 and is_hello(message):
+            # v2 협상: 클라이언트가 제안한 코덱 중 지원하는 것만 돌려줌
+            codecs = [codec for codec in message.get("codecs", []) if codec in CODEC_NAMES.values()]
+            return encode_frame(hello_message(codecs), version=2)
+        if version >= 2 and is_ping(message):
+            # heartbeat: 주문으로 접수하지 않고 바로 pong
+            return encode_frame({"type": PONG_TYPE, "status": "success"}, version=2)
+
+        key = message.get("idempotency_key")
+        inflight = self._inflight.get(key) if key is not None else None
+        if inflight is not None:
+            # 첫 주문의 기록이 끝나야 접수된 것 (실패하면 같은 오류로 응답해 다시 보내게 함)
+            await asyncio.shield(inflight)
+            accepted = False
+        else:
+            accepted = self.on_order(message)
+        if accepted and self.tickets:
+            done = asyncio.get_running_loop().create_future()
+            if key is not None:
+                self._inflight[key] = done
+            try:
+                await self.tickets.add(message)
+            except Exception as e:
+                # 기록하지 못한 주문은 접수하지 않은 것으로 되돌려 재전송을 받을 수 있게 함
+                self._keys.discard(key)
+                self.received -= 1
+                if self.keep_orders:
+                    self.orders.remove(message)
+                done.set_exception(e)
+                done.exception()  # 기다리는 재전송이 없어도 경고가 나지 않게 확인 처리
+                raise
+            else:
+                done.set_result(None)
+            finally:
+                self._inflight.pop(key, None)
+                if not done.done():
+                    # 기록이 취소된 경우 (서버 종료 등), 기다리던 재전송도 실패로 응답
+                    done.set_exception(ConnectionError("티켓 기록이 취소되었습니다."))
+                    done.exception()
+        return encode_frame({
+            "status": "success",
+            "message": f"주문 #{message.get('order_number')} " + ("접수" if accepted else "이미 접수됨"),
+            "order_number": message.get("order_number"),
+            "duplicate": not accepted,
+        }, version=version)
+
+    async def _send_replies(self, writer, replies):
+        """응답을 요청 순서대로 전송 (latency 가 있으면 받은 시각 + latency 까지 대기)"""
+        broken = False
+        while True:
+            item = await replies.get()
+            if item is None:
+                return
+            due, version, task = item
+            try:
+                reply = await task
+            except Exception as e:
+                reply = encode_frame({"status": "error", "message": f"주문 기록 실패: {e}"}, version=version)
+            if broken:
+                continue
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                writer.write(reply)
+                if replies.empty():
+                    await writer.drain()
+            except ConnectionError:
+                broken = True
+
+
+async def _load_client(host, port, orders, client_id):
+    """부하 테스트용 키오스크 1대: 주문을 하나씩 보내고 응답 지연 기록"""
+    reader, writer = await asyncio.open_connection(host, port)
+    latencies = []
+    try:
+        for number in range(1, orders + 1):
+            order = {
+                "order_number": number,
+                "idempotency_key": f"kiosk{client_id}#{number}",
+                "order_type": "매장",
+                "items": [{"name": "햄버거", "price": 13000, "quantity": 1, "image": "🍔"}],
+                "total": 13000,
+            }
+            started = time.perf_counter()
+            writer.write(encode_frame(order))
+            await writer.drain()
+            response = await read_frame(reader)
+            latencies.append(time.perf_counter() - started)
+            assert response["status"] == "success", response
+    finally:
+        writer.close()
+    return latencies
+
+
+def load_test(connections=300, orders=50):
+    """로컬 주방 서버(티켓 기록 포함)에 키오스크 connections 대가 동시에 연결해 각각 orders 건씩 전송"""
+    import os
+    import tempfile
+
+    async def run(tmp_dir):
+        server = KitchenServer(
+            "localhost", 0, ticket_file=os.path.join(tmp_dir, TICKET_FILE), keep_orders=False
+        )
+        host, port = await server.serve()
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            _load_client(host, port, orders, client_id) for client_id in range(connections)
+        ))
+        elapsed = time.perf_counter() - started
+        await server.aclose()
+
+        latencies = sorted(latency for result in results for latency in result)
+        total = len(latencies)
+        assert server.received == total == server.tickets.written
+        print(f"연결 {connections}개 x {orders}건 = {total:,}건, {elapsed:.2f}초 ({total / elapsed:,.0f}건/초)")
+        print(f"  응답 지연 p50 {latencies[total // 2] * 1000:.1f}ms / p99 {latencies[int(total * 0.99)] * 1000:.1f}ms")
+        print(f"  티켓 기록 {server.tickets.written:,}건, fsync {server.tickets.flushes:,}회")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run(tmp_dir))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        load_test(
+            int(sys.argv[2]) if len(sys.argv) > 2 else 300,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 50,
+        )
+    else:
+        port = int(sys.argv[1]) if len(sys.argv) > 1 else 9999
+        latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+        server = KitchenServer("0.0.0.0", port, latency, ticket_file=TICKET_FILE, keep_orders=False)
+        print(f"주방 서버 실행 중: {port}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
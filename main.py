@@ -1,10 +1,17 @@
 import flet as ft
-import json
-import os
 from datetime import datetime
 from typing import List, Dict
 import hashlib
 
+from order_store import OrderManager
+from order_stats import SalesAggregator
+from order_sequence import OrderNumberAllocator
+from order_writer import WriteBehindWriter
+from menu_view import MenuViewCache
+from cart_view import CartRow, KeyedCartList
+from update_scheduler import UpdateScheduler, batched
+from dialog_pool import DialogPool
+
 # 메뉴 데이터
 MENU_DATA = {
     "메인 메뉴": [
@@ -36,32 +43,6 @@ MENU_DATA = {
     ]
 }
 
-class OrderManager:
-    """주문 데이터 관리 클래스"""
-    def __init__(self):
-        self.orders_file = "orders.json"
-        self.load_orders()
-    
-    def load_orders(self):
-        """저장된 주문 불러오기"""
-        if os.path.exists(self.orders_file):
-            with open(self.orders_file, 'r', encoding='utf-8') as f:
-                self.orders = json.load(f)
-        else:
-            self.orders = []
-    
-    def save_order(self, order_data):
-        """새 주문 저장"""
-        self.orders.append(order_data)
-        with open(self.orders_file, 'w', encoding='utf-8') as f:
-            json.dump(self.orders, f, ensure_ascii=False, indent=2)
-    
-    def get_next_order_number(self):
-        """다음 주문번호 생성"""
-        if not self.orders:
-            return 1
-        return max([order.get('order_number', 0) for order in self.orders]) + 1
-
 class KioskApp:
 
     def __init__(self, page: ft.Page):
@@ -72,8 +53,19 @@ class KioskApp:
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.padding = 0
         
+        # 화면 갱신은 이벤트 핸들러(@batched)가 끝날 때 한 번에 보냄 (핸들러 안의 여러 갱신 요청 → page.update 1번)
+        self.updater = UpdateScheduler(page)
+        # 다이얼로그는 풀에서 재사용하고 닫히면 overlay 에서 뺌 (overlay 가 쌓이지 않음)
+        self.dialogs = DialogPool(page, self.updater)
+        
         # 주문 관리자
-        self.order_manager = OrderManager()
+        self.order_manager = OrderManager(
+            storage="daily",  # 날짜별 세그먼트 (시작 시 오늘 주문만 읽음, 여러 프로세스 공유 가능)
+            aggregator=SalesAggregator(),
+            allocator=OrderNumberAllocator(daily_reset=True),  # 주문번호는 매일 1번부터
+        )
+        # 주문 저장은 백그라운드에서 (클릭 핸들러가 디스크 쓰기를 기다리지 않음)
+        self.order_writer = WriteBehindWriter(self.order_manager, interval_ms=50)
         
         # 장바구니
         self.cart = []
@@ -81,6 +73,8 @@ class KioskApp:
         
         # UI 컴포넌트
         self.cart_list = ft.Column(scroll=ft.ScrollMode.AUTO, height=300)
+        # 장바구니 행은 품목 이름별로 재사용 (수량이 바뀌면 해당 Text 만 고침)
+        self.cart_rows = KeyedCartList(self.cart_list, self.create_cart_row)
         self.total_text = ft.Text("합계: 0원", size=20, weight=ft.FontWeight.BOLD)
         self.cart_badge = ft.Text("0", color=ft.Colors.WHITE)
         
@@ -89,6 +83,8 @@ class KioskApp:
         self.admin_password = hashlib.sha256("admin1234".encode()).hexdigest()
         
         self.setup_ui()
+        # 첫 화면을 띄운 뒤 오늘 주문을 백그라운드에서 미리 읽어 둠 (첫 주문/관리자 조회가 기다리지 않음)
+        self.order_manager.preload()
     
     def setup_ui(self):
         """메인 UI 설정"""
@@ -146,6 +142,8 @@ class KioskApp:
     def create_main_content(self):
         """메인 컨텐츠 영역"""
         self.menu_content = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
+        # 카테고리 화면은 처음 열 때 한 번만 만들고, 이후에는 보이는 화면만 바꿈
+        self.menu_views = MenuViewCache(self.menu_content, self.build_menu_view)
         self.update_menu_display("메인 메뉴")
         
         return ft.Row([
@@ -190,16 +188,14 @@ class KioskApp:
             ),
         ], expand=True, spacing=0)
     
+    @batched
     def update_menu_display(self, category):
-        """선택된 카테고리의 메뉴 표시"""
-        self.menu_content.controls.clear()
-        
-        # 카테고리 제목
-        self.menu_content.controls.append(
-            ft.Text(category, size=24, weight=ft.FontWeight.BOLD)
-        )
-        self.menu_content.controls.append(ft.Divider())
-        
+        """선택된 카테고리의 메뉴 표시 (만들어 둔 화면으로 교체)"""
+        self.menu_views.show(category, MENU_DATA[category])
+        self.updater.request()
+    
+    def build_menu_view(self, category, items):
+        """카테고리 메뉴 화면 생성 (카테고리 제목 + 메뉴 아이템 그리드)"""
         # 메뉴 아이템 그리드
         menu_grid = ft.GridView(
             expand=True,
@@ -210,11 +206,14 @@ class KioskApp:
             run_spacing=20,
         )
         
-        for item in MENU_DATA[category]:
+        for item in items:
             menu_grid.controls.append(self.create_menu_item(item))
         
-        self.menu_content.controls.append(menu_grid)
-        self.page.update()
+        return ft.Column([
+            ft.Text(category, size=24, weight=ft.FontWeight.BOLD),
+            ft.Divider(),
+            menu_grid,
+        ], expand=True)
     
     def create_menu_item(self, item):
         """메뉴 아이템 카드 생성"""
@@ -242,6 +241,7 @@ class KioskApp:
             alignment=ft.alignment.center,
         )
     
+    @batched
     def add_to_cart(self, item):
         """장바구니에 아이템 추가"""
         # 이미 있는 아이템인지 확인
@@ -265,19 +265,20 @@ class KioskApp:
             duration=1000,
         )
         self.page.snack_bar.open = True
-        self.page.update()
+        self.updater.request()
     
     def update_cart_badge(self):
         """장바구니 배지 업데이트"""
         total_items = sum(item["quantity"] for item in self.cart)
         self.cart_badge.value = str(total_items)
-        self.page.update()
+        self.updater.request()
     
+    @batched
     def show_cart(self, e):
         """장바구니 다이얼로그 표시"""
         self.update_cart_display()
         
-        cart_dialog = ft.AlertDialog(
+        cart_dialog = self.dialogs.open(
             title=ft.Text("장바구니", size=24, weight=ft.FontWeight.BOLD),
             content=ft.Container(
                 content=ft.Column([
@@ -301,47 +302,41 @@ class KioskApp:
                 ),
             ],
         )
-        
-        self.page.overlay.append(cart_dialog)
-        cart_dialog.open = True
-        self.page.update()
     
     def update_cart_display(self):
-        """장바구니 내용 업데이트"""
-        self.cart_list.controls.clear()
-        total = 0
-        
-        for item in self.cart:
-            subtotal = item["price"] * item["quantity"]
-            total += subtotal
-            
-            self.cart_list.controls.append(
-                ft.Row([
-                    ft.Text(item["image"], size=30),
-                    ft.Column([
-                        ft.Text(item["name"], weight=ft.FontWeight.BOLD),
-                        ft.Text(f"{item['price']:,}원", size=12, color=ft.Colors.GREY_600),
-                    ], expand=True),
-                    ft.Row([
-                        ft.IconButton(
-                            icon=ft.Icons.REMOVE_CIRCLE_OUTLINE,
-                            on_click=lambda e, i=item: self.update_quantity(i, -1),
-                            icon_size=20,
-                        ),
-                        ft.Text(str(item["quantity"]), size=16),
-                        ft.IconButton(
-                            icon=ft.Icons.ADD_CIRCLE_OUTLINE,
-                            on_click=lambda e, i=item: self.update_quantity(i, 1),
-                            icon_size=20,
-                        ),
-                    ]),
-                    ft.Text(f"{subtotal:,}원", weight=ft.FontWeight.BOLD),
-                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
-            )
-        
+        """장바구니 내용 업데이트 (바뀐 행의 수량/소계와 합계만 고침)"""
+        total = self.cart_rows.sync(self.cart)
         self.total_text.value = f"합계: {total:,}원"
-        self.page.update()
+        self.updater.request()
     
+    def create_cart_row(self, item):
+        """장바구니 한 줄 생성"""
+        quantity_text = ft.Text(str(item["quantity"]), size=16)
+        subtotal_text = ft.Text(f"{item['price'] * item['quantity']:,}원", weight=ft.FontWeight.BOLD)
+        row = ft.Row([
+            ft.Text(item["image"], size=30),
+            ft.Column([
+                ft.Text(item["name"], weight=ft.FontWeight.BOLD),
+                ft.Text(f"{item['price']:,}원", size=12, color=ft.Colors.GREY_600),
+            ], expand=True),
+            ft.Row([
+                ft.IconButton(
+                    icon=ft.Icons.REMOVE_CIRCLE_OUTLINE,
+                    on_click=lambda e, i=item: self.update_quantity(i, -1),
+                    icon_size=20,
+                ),
+                quantity_text,
+                ft.IconButton(
+                    icon=ft.Icons.ADD_CIRCLE_OUTLINE,
+                    on_click=lambda e, i=item: self.update_quantity(i, 1),
+                    icon_size=20,
+                ),
+            ]),
+            subtotal_text,
+        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+        return CartRow(row, item, quantity_text, subtotal_text)
+    
+    @batched
     def update_quantity(self, item, change):
         """아이템 수량 업데이트"""
         item["quantity"] += change
@@ -351,6 +346,7 @@ class KioskApp:
         self.update_cart_display()
         self.update_cart_badge()
     
+    @batched
     def proceed_to_payment(self, dialog):
         """결제 진행"""
         self.close_dialog(dialog)
@@ -360,7 +356,7 @@ class KioskApp:
         """결제 확인 다이얼로그"""
         total = sum(item["price"] * item["quantity"] for item in self.cart)
         
-        payment_dialog = ft.AlertDialog(
+        payment_dialog = self.dialogs.open(
             title=ft.Text("주문 확인", size=24, weight=ft.FontWeight.BOLD),
             content=ft.Container(
                 content=ft.Column([
@@ -395,11 +391,8 @@ class KioskApp:
                 ),
             ],
         )
-        
-        self.page.overlay.append(payment_dialog)
-        payment_dialog.open = True
-        self.page.update()
     
+    @batched
     def complete_order(self, dialog):
         """주문 완료 처리"""
         order_number = self.order_manager.get_next_order_number()
@@ -413,8 +406,8 @@ class KioskApp:
             "total": sum(item["price"] * item["quantity"] for item in self.cart)
         }
         
-        # 주문 저장
-        self.order_manager.save_order(order_data)
+        # 주문 저장 (백그라운드 기록)
+        self.order_writer.save_order(order_data)
         
         # 장바구니 초기화
         self.cart.clear()
@@ -423,7 +416,7 @@ class KioskApp:
         self.close_dialog(dialog)
         
         # 완료 메시지
-        completion_dialog = ft.AlertDialog(
+        completion_dialog = self.dialogs.open(
             title=ft.Text("주문 완료", size=24, weight=ft.FontWeight.BOLD),
             content=ft.Container(
                 content=ft.Column([
@@ -446,15 +439,13 @@ class KioskApp:
                 ),
             ],
         )
-        
-        self.page.overlay.append(completion_dialog)
-        completion_dialog.open = True
-        self.page.update()
     
+    @batched
     def change_order_type(self, e):
         """주문 방식 변경"""
         self.order_type = e.control.value
     
+    @batched
     def show_admin_login(self, e):
         """관리자 로그인 다이얼로그"""
         password_field = ft.TextField(
@@ -463,6 +454,7 @@ class KioskApp:
             autofocus=True,
         )
         
+        @self.updater.wrap
         def verify_password(e):
             entered_password = hashlib.sha256(password_field.value.encode()).hexdigest()
             if entered_password == self.admin_password:
@@ -472,9 +464,9 @@ class KioskApp:
             else:
                 self.page.snack_bar = ft.SnackBar(content=ft.Text("비밀번호가 올바르지 않습니다."))
                 self.page.snack_bar.open = True
-                self.page.update()
+                self.updater.request()
         
-        login_dialog = ft.AlertDialog(
+        login_dialog = self.dialogs.open(
             title=ft.Text("관리자 로그인"),
             content=ft.Container(
                 content=ft.Column([
@@ -490,25 +482,24 @@ class KioskApp:
                 ft.ElevatedButton("로그인", on_click=verify_password),
             ],
         )
-        
-        self.page.overlay.append(login_dialog)
-        login_dialog.open = True
-        self.page.update()
     
     def show_admin_panel(self):
         """관리자 패널 표시"""
         orders_list = ft.Column(scroll=ft.ScrollMode.AUTO, height=400)
         
-        # 주문 내역 로드
-        self.order_manager.load_orders()
+        # 아직 기록 대기 중인 주문까지 반영
+        self.order_writer.flush(timeout=1)
+        
+        # 최근 20개만 저널 끝에서부터 읽음 (전체 주문을 불러오지 않음)
+        recent_orders = self.order_manager.get_recent_orders(20)
         
-        if not self.order_manager.orders:
+        if not recent_orders:
             orders_list.controls.append(
                 ft.Text("주문 내역이 없습니다.", size=16, color=ft.Colors.GREY_600)
             )
         else:
             # 최근 주문부터 표시
-            for order in reversed(self.order_manager.orders[-20:]):  # 최근 20개만 표시
+            for order in recent_orders:
                 order_time = datetime.fromisoformat(order["timestamp"])
                 
                 order_card = ft.Container(
@@ -535,15 +526,13 @@ class KioskApp:
                 orders_list.controls.append(order_card)
         
         # 통계 정보
-        total_orders = len(self.order_manager.orders)
-        total_revenue = sum(order.get("total", 0) for order in self.order_manager.orders)
-        today_orders = [
-            order for order in self.order_manager.orders
-            if datetime.fromisoformat(order["timestamp"]).date() == datetime.now().date()
-        ]
-        today_revenue = sum(order.get("total", 0) for order in today_orders)
+        stats = self.order_manager.get_order_stats()
+        total_orders = stats["total_orders"]
+        total_revenue = stats["total_revenue"]
+        today_orders = stats["today_orders"]
+        today_revenue = stats["today_revenue"]
         
-        admin_dialog = ft.AlertDialog(
+        admin_dialog = self.dialogs.open(
             title=ft.Text("관리자 패널", size=24, weight=ft.FontWeight.BOLD),
             content=ft.Container(
                 content=ft.Column([
@@ -573,7 +562,7 @@ class KioskApp:
                         ft.Container(
                             content=ft.Column([
                                 ft.Text("오늘 주문", size=12, color=ft.Colors.GREY_600),
-                                ft.Text(f"{len(today_orders)}건", size=20, weight=ft.FontWeight.BOLD),
+                                ft.Text(f"{today_orders}건", size=20, weight=ft.FontWeight.BOLD),
                             ]),
                             bgcolor=ft.Colors.ORANGE_50,
                             border_radius=8,
@@ -605,15 +594,11 @@ class KioskApp:
                 ),
             ],
         )
-        
-        self.page.overlay.append(admin_dialog)
-        admin_dialog.open = True
-        self.page.update()
     
+    @batched
     def close_dialog(self, dialog):
-        """다이얼로그 닫기"""
-        dialog.open = False
-        self.page.update()
+        """다이얼로그 닫기 (닫힌 다이얼로그는 overlay 에서 빠지고 풀로 돌아감)"""
+        self.dialogs.close(dialog)
 
 def main(page: ft.Page):
     app = KioskApp(page)
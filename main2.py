@@ -1,5 +1,10 @@
 import flet as ft
 
+from cart_view import CartRow, KeyedCartList
+from dialog_pool import DialogPool
+from update_scheduler import UpdateScheduler
+from menu_view import MenuViewCache
+
 # --- 1. 메뉴 데이터 정의 ---
 # 실제 환경에서는 이 데이터를 외부 파일(JSON)이나 DB에서 관리하는 것이 좋습니다.
 MENU_DATA = {
@@ -34,6 +39,10 @@ def main(page: ft.Page):
         "NanumSquare": "https://webfontworld.github.io/NanumSquare/NanumSquare.css"
     }
     page.theme = ft.Theme(font_family="NanumSquare")
+    # 화면 갱신은 이벤트 핸들러(updater.wrap)가 끝날 때 한 번에 보냅니다. (핸들러 안의 여러 갱신 요청 → page.update 1번)
+    updater = UpdateScheduler(page)
+    # 다이얼로그는 풀에서 재사용하고, 닫히면 page.overlay 에서 뺍니다.
+    dialogs = DialogPool(page, updater)
 
     # --- 3. 애플리케이션 상태 관리 ---
     # 장바구니 데이터를 page.session에 저장하여 앱 전체에서 접근할 수 있도록 합니다.
@@ -41,10 +50,8 @@ def main(page: ft.Page):
         page.session.set("cart", []) # [{'name': str, 'price': int, 'quantity': int}, ...]
 
     # --- 4. UI 컨트롤 정의 ---
-    # 중앙 메뉴 그리드
-    menu_grid = ft.GridView(
-        expand=True, runs_count=4, max_extent=180, child_aspect_ratio=0.9, spacing=10, run_spacing=10
-    )
+    # 중앙 메뉴 영역: 카테고리별 메뉴 그리드를 처음 열 때 한 번만 만들고, 이후에는 보이는 그리드만 바꿉니다.
+    menu_area = ft.Column(expand=True)
     # 하단 장바구니 리스트 (구버전 호환: Column + scroll)
     cart_list = ft.Column(spacing=10, scroll=ft.ScrollMode.ALWAYS)
     # 총 금액 텍스트
@@ -60,21 +67,12 @@ def main(page: ft.Page):
 
     # --- 5. 핵심 함수들 ---
     def update_cart_display():
-        """장바구니 상태(page.session.get('cart'))를 기반으로 UI를 다시 그립니다."""
-        cart_data = page.session.get("cart")
-        cart_list.controls.clear()
-        total_price = 0
-
-        if not cart_data:
-            cart_list.controls.append(ft.Text("장바구니가 비어있습니다.", text_align=ft.TextAlign.CENTER, color="grey"))
-        else:
-            for item in cart_data:
-                total_price += item['price'] * item['quantity']
-                cart_list.controls.append(create_cart_item_row(item))
-        
+        """장바구니 상태(page.session.get('cart'))를 UI에 반영합니다. 이미 있는 행은 수량/소계만 고칩니다."""
+        total_price = cart_rows.sync(page.session.get("cart"))
         total_price_text.value = f"{total_price:,}원"
-        page.update()
+        updater.request()
 
+    @updater.wrap
     def add_to_cart(e):
         """메뉴를 카트에 추가하거나 수량을 늘립니다."""
         menu_item_data = e.control.data
@@ -95,6 +93,7 @@ def main(page: ft.Page):
         page.session.set("cart", cart_data) # 변경된 카트 정보 저장
         update_cart_display()
 
+    @updater.wrap
     def change_quantity(e):
         """장바구니 아이템의 수량을 변경합니다."""
         item_name = e.control.data['name']
@@ -111,35 +110,35 @@ def main(page: ft.Page):
         page.session.set("cart", cart_data)
         update_cart_display()
         
+    @updater.wrap
     def place_order(e):
         """결제 버튼 클릭 시 호출됩니다."""
         if not page.session.get("cart"):
             page.snack_bar = ft.SnackBar(content=ft.Text("장바구니에 메뉴를 담아주세요."), bgcolor="red")
             page.snack_bar.open = True
-            page.update()
+            updater.request()
             return
 
+        @updater.wrap
         def close_dialog(e):
-            dialog.open = False
+            dialogs.close(dialog)
             page.session.set("cart", []) # 장바구니 비우기
             update_cart_display()
-            page.update()
 
-        dialog = ft.AlertDialog(
+        dialog = dialogs.open(
             modal=True,
             title=ft.Text("주문 완료"),
             content=ft.Text("주문이 성공적으로 접수되었습니다.\n감사합니다!"),
             actions=[ft.TextButton("확인", on_click=close_dialog)],
             actions_alignment=ft.MainAxisAlignment.CENTER
         )
-        page.overlay.append(dialog)
-        dialog.open = True
-        page.update()
 
     # --- 6. UI 생성 함수들 ---
     def create_cart_item_row(item_data):
-        """장바구니에 표시될 각 아이템 행(Row)을 생성합니다."""
-        return ft.Row(
+        """장바구니에 표시될 각 아이템 행(Row)을 생성합니다. 수량/소계 Text는 나중에 값만 바꿀 수 있도록 함께 돌려줍니다."""
+        quantity_text = ft.Text(str(item_data['quantity']), size=14)
+        subtotal_text = ft.Text(f"{(item_data['price'] * item_data['quantity']):,}원", size=14, expand=1, text_align=ft.TextAlign.RIGHT)
+        row = ft.Row(
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
             controls=[
                 ft.Text(item_data['name'], size=14, expand=2),
@@ -147,13 +146,21 @@ def main(page: ft.Page):
                     spacing=5,
                     controls=[
                         ft.IconButton(ft.Icons.REMOVE, on_click=change_quantity, data={'name': item_data['name'], 'delta': -1}, icon_size=16),
-                        ft.Text(item_data['quantity'], size=14),
+                        quantity_text,
                         ft.IconButton(ft.Icons.ADD, on_click=change_quantity, data={'name': item_data['name'], 'delta': 1}, icon_size=16),
                     ]
                 ),
-                ft.Text(f"{(item_data['price'] * item_data['quantity']):,}원", size=14, expand=1, text_align=ft.TextAlign.RIGHT),
+                subtotal_text,
             ]
         )
+        return CartRow(row, item_data, quantity_text, subtotal_text)
+
+    # 장바구니 행은 메뉴 이름별로 재사용합니다.
+    cart_rows = KeyedCartList(
+        cart_list,
+        create_cart_item_row,
+        empty_control=ft.Text("장바구니가 비어있습니다.", text_align=ft.TextAlign.CENTER, color="grey"),
+    )
 
     def create_menu_item_card(item_data):
         """중앙 메뉴 영역에 표시될 카드 UI를 생성합니다."""
@@ -182,6 +189,16 @@ def main(page: ft.Page):
             )
         )
 
+    def create_menu_grid(category_name, items):
+        """카테고리의 메뉴 카드 그리드를 생성합니다."""
+        return ft.GridView(
+            expand=True, runs_count=4, max_extent=180, child_aspect_ratio=0.9, spacing=10, run_spacing=10,
+            controls=[create_menu_item_card(item) for item in items],
+        )
+
+    menu_views = MenuViewCache(menu_area, create_menu_grid)
+
+    @updater.wrap
     def select_category(e):
         """좌측 카테고리 선택 시 중앙 메뉴를 업데이트합니다."""
         # 모든 카테고리 버튼 스타일 초기화
@@ -191,10 +208,8 @@ def main(page: ft.Page):
         e.control.style = selected_category_button_style
 
         category_name = e.control.text
-        menu_grid.controls.clear()
-        for item in MENU_DATA[category_name]:
-            menu_grid.controls.append(create_menu_item_card(item))
-        page.update()
+        menu_views.show(category_name, MENU_DATA[category_name])
+        updater.request()
 
     # --- 7. 레이아웃 구성 ---
     # 카테고리 버튼 스타일
@@ -213,8 +228,7 @@ def main(page: ft.Page):
     category_buttons.controls[0].style = selected_category_button_style
     # 첫 번째 카테고리 메뉴를 초기에 로드
     initial_category = list(MENU_DATA.keys())[0]
-    for item in MENU_DATA[initial_category]:
-        menu_grid.controls.append(create_menu_item_card(item))
+    menu_views.show(initial_category, MENU_DATA[initial_category])
 
     # 전체 화면 레이아웃
     page.add(
@@ -234,7 +248,7 @@ def main(page: ft.Page):
                         ),
                         # 중앙 메뉴
                         ft.Container(
-                            menu_grid,
+                            menu_area,
                             expand=True,
                             padding=20,
                         )
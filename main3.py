@@ -1,10 +1,18 @@
 import flet as ft
-import json
-import os
 from datetime import datetime
 from typing import List, Dict
 import hashlib
 
+from order_store import OrderManager
+from order_stats import SalesAggregator
+from order_sequence import OrderNumberAllocator
+from order_writer import WriteBehindWriter
+from menu_view import MenuViewCache
+from cart_view import CartRow, KeyedCartList
+from update_scheduler import UpdateScheduler, batched
+from dialog_pool import DialogPool
+from view_router import ViewRouter
+
 # 메뉴 데이터
 MENU_DATA = {
     "메인 메뉴": [
@@ -36,32 +44,6 @@ MENU_DATA = {
     ]
 }
 
-class OrderManager:
-    """주문 데이터 관리 클래스"""
-    def __init__(self):
-        self.orders_file = "orders.json"
-        self.load_orders()
-    
-    def load_orders(self):
-        """저장된 주문 불러오기"""
-        if os.path.exists(self.orders_file):
-            with open(self.orders_file, 'r', encoding='utf-8') as f:
-                self.orders = json.load(f)
-        else:
-            self.orders = []
-    
-    def save_order(self, order_data):
-        """새 주문 저장"""
-        self.orders.append(order_data)
-        with open(self.orders_file, 'w', encoding='utf-8') as f:
-            json.dump(self.orders, f, ensure_ascii=False, indent=2)
-    
-    def get_next_order_number(self):
-        """다음 주문번호 생성"""
-        if not self.orders:
-            return 1
-        return max([order.get('order_number', 0) for order in self.orders]) + 1
-
 class KioskApp:
     def __init__(self, page: ft.Page):
         self.page = page
@@ -71,8 +53,19 @@ class KioskApp:
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.padding = 0
         
+        # 화면 갱신은 이벤트 핸들러(@batched)가 끝날 때 한 번에 보냄 (핸들러 안의 여러 갱신 요청 → page.update 1번)
+        self.updater = UpdateScheduler(page)
+        # 다이얼로그는 풀에서 재사용하고 닫히면 overlay 에서 뺌 (overlay 가 쌓이지 않음)
+        self.dialogs = DialogPool(page, self.updater)
+        
         # 주문 관리자
-        self.order_manager = OrderManager()
+        self.order_manager = OrderManager(
+            storage="daily",  # 날짜별 세그먼트 (시작 시 오늘 주문만 읽음, 여러 프로세스 공유 가능)
+            aggregator=SalesAggregator(),
+            allocator=OrderNumberAllocator(daily_reset=True),  # 주문번호는 매일 1번부터
+        )
+        # 주문 저장은 백그라운드에서 (클릭 핸들러가 디스크 쓰기를 기다리지 않음)
+        self.order_writer = WriteBehindWriter(self.order_manager, interval_ms=50)
         
         # 장바구니
         self.cart = []
@@ -82,14 +75,44 @@ class KioskApp:
         self.current_page = "menu"  # menu, cart, payment, complete
         
         # UI 컴포넌트
-        self.main_container = ft.Container()
+        # 화면(메뉴/장바구니/결제/완료)은 처음 들어갈 때 한 번만 만들어 screens 에 두고, 이동할 때는 보이는 화면만 바꿈
+        self.screens = ft.Column(expand=True, spacing=0)
+        self.main_container = ft.Container(content=self.screens, expand=True)
+        self.router = ViewRouter(self.screens)
+        self.router.register("menu", self.build_menu_page, self.bind_menu_page)
+        self.router.register("cart", self.build_cart_page, self.update_cart_display)
+        self.router.register("payment", self.build_payment_page, self.bind_payment_page)
+        self.router.register("complete", self.build_completion_page, self.bind_completion_page)
         self.cart_badge = ft.Text("0", color=ft.Colors.WHITE)
         
+        # 메뉴 컨텐츠 영역: 카테고리 화면은 처음 열 때 한 번만 만들고, 이후에는 보이는 화면만 바꿈
+        self.menu_content = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
+        self.menu_views = MenuViewCache(self.menu_content, self.build_menu_view)
+        
+        # 장바구니 아이템 목록: 행은 품목 이름별로 재사용 (수량이 바뀌면 해당 Text 만 고침)
+        self.cart_items = ft.Column(scroll=ft.ScrollMode.AUTO, spacing=10)
+        self.cart_rows = KeyedCartList(
+            self.cart_items,
+            self.create_cart_row,
+            empty_control=ft.Container(
+                content=ft.Column([
+                    ft.Icon(ft.Icons.SHOPPING_CART_OUTLINED, size=80, color=ft.Colors.GREY_400),
+                    ft.Text("장바구니가 비어있습니다", size=20, color=ft.Colors.GREY_600),
+                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                padding=50,
+                alignment=ft.alignment.center,
+            ),
+        )
+        self.cart_total_text = ft.Text("0원", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_700)
+        self.cart_pay_button = None
+        
         # 관리자 모드
         self.is_admin = False
         self.admin_password = hashlib.sha256("admin1234".encode()).hexdigest()
         
         self.setup_ui()
+        # 첫 화면을 띄운 뒤 오늘 주문을 백그라운드에서 미리 읽어 둠 (첫 주문/관리자 조회가 기다리지 않음)
+        self.order_manager.preload()
     
     def setup_ui(self):
         """메인 UI 설정"""
@@ -146,15 +169,28 @@ class KioskApp:
             height=80,
         )
     
+    @batched
     def show_menu_page(self):
         """메뉴 페이지 표시"""
         self.current_page = "menu"
+        self.router.go("menu")
+        self.updater.request()
+    
+    def build_menu_page(self):
+        """메뉴 페이지 생성 (처음 들어갈 때 한 번)"""
+        # 메뉴 컨텐츠 영역 (처음에는 메인 메뉴 화면)
+        self.menu_views.show("메인 메뉴", MENU_DATA["메인 메뉴"])
         
-        # 메뉴 컨텐츠 영역
-        menu_content = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
-        self.update_menu_display(menu_content, "메인 메뉴")
+        self.order_type_radio = ft.RadioGroup(
+            content=ft.Column([
+                ft.Radio(value="매장", label="매장 식사"),
+                ft.Radio(value="포장", label="포장 주문"),
+            ]),
+            value="매장",
+            on_change=self.change_order_type,
+        )
         
-        self.main_container.content = ft.Row([
+        return ft.Row([
             # 카테고리 선택 영역
             ft.Container(
                 content=ft.Column([
@@ -165,7 +201,7 @@ class KioskApp:
                             text=category,
                             width=180,
                             height=60,
-                            on_click=lambda e, c=category: self.update_menu_display(menu_content, c),
+                            on_click=lambda e, c=category: self.update_menu_display(c),
                             style=ft.ButtonStyle(
                                 shape=ft.RoundedRectangleBorder(radius=10),
                             )
@@ -174,14 +210,7 @@ class KioskApp:
                     ],
                     ft.Divider(),
                     ft.Text("주문 방식", size=18, weight=ft.FontWeight.BOLD),
-                    ft.RadioGroup(
-                        content=ft.Column([
-                            ft.Radio(value="매장", label="매장 식사"),
-                            ft.Radio(value="포장", label="포장 주문"),
-                        ]),
-                        value="매장",
-                        on_change=self.change_order_type,
-                    ),
+                    self.order_type_radio,
                 ], spacing=15),
                 width=220,
                 padding=20,
@@ -190,86 +219,37 @@ class KioskApp:
             
             # 메뉴 표시 영역
             ft.Container(
-                content=menu_content,
+                content=self.menu_content,
                 expand=True,
                 padding=20,
             ),
         ], expand=True, spacing=0)
-        
-        self.page.update()
     
+    def bind_menu_page(self):
+        """메뉴 페이지 데이터 반영 (주문 방식)"""
+        self.order_type_radio.value = self.order_type
+    
+    @batched
     def show_cart_page(self):
         """장바구니 페이지 표시"""
         self.current_page = "cart"
-        
-        # 장바구니 아이템 목록
-        cart_items = ft.Column(scroll=ft.ScrollMode.AUTO, spacing=10)
-        total = 0
-        
-        for item in self.cart:
-            subtotal = item["price"] * item["quantity"]
-            total += subtotal
-            
-            cart_items.controls.append(
-                ft.Container(
-                    content=ft.Row([
-                        ft.Container(
-                            content=ft.Text(item["image"], size=40),
-                            width=60,
-                        ),
-                        ft.Column([
-                            ft.Text(item["name"], size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"개당 {item['price']:,}원", size=14, color=ft.Colors.GREY_600),
-                        ], expand=True, spacing=5),
-                        ft.Container(
-                            content=ft.Row([
-                                ft.IconButton(
-                                    icon=ft.Icons.REMOVE_CIRCLE,
-                                    on_click=lambda e, i=item: self.update_quantity(i, -1),
-                                    icon_size=30,
-                                    icon_color=ft.Colors.RED_400,
-                                ),
-                                ft.Container(
-                                    content=ft.Text(str(item["quantity"]), size=18, weight=ft.FontWeight.BOLD),
-                                    width=40,
-                                    alignment=ft.alignment.center,
-                                ),
-                                ft.IconButton(
-                                    icon=ft.Icons.ADD_CIRCLE,
-                                    on_click=lambda e, i=item: self.update_quantity(i, 1),
-                                    icon_size=30,
-                                    icon_color=ft.Colors.GREEN_400,
-                                ),
-                            ], alignment=ft.MainAxisAlignment.CENTER),
-                            width=140,
-                        ),
-                        ft.Container(
-                            content=ft.Text(f"{subtotal:,}원", size=18, weight=ft.FontWeight.BOLD),
-                            width=100,
-                            alignment=ft.alignment.center_right,
-                        ),
-                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                    bgcolor=ft.Colors.WHITE,
-                    border=ft.border.all(1, ft.Colors.GREY_300),
-                    border_radius=10,
-                    padding=20,
-                )
-            )
-        
-        # 빈 장바구니 처리
-        if not self.cart:
-            cart_items.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.Icons.SHOPPING_CART_OUTLINED, size=80, color=ft.Colors.GREY_400),
-                        ft.Text("장바구니가 비어있습니다", size=20, color=ft.Colors.GREY_600),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                    padding=50,
-                    alignment=ft.alignment.center,
-                )
+        self.router.go("cart")
+        self.updater.request()
+    
+    def build_cart_page(self):
+        """장바구니 페이지 생성 (처음 들어갈 때 한 번, 목록/합계는 update_cart_display 가 채움)"""
+        self.cart_pay_button = ft.ElevatedButton(
+            "결제하기",
+            height=50,
+            width=200,
+            on_click=lambda e: self.show_payment_page(),
+            style=ft.ButtonStyle(
+                bgcolor=ft.Colors.GREEN_700,
+                color=ft.Colors.WHITE,
             )
+        )
         
-        self.main_container.content = ft.Column([
+        return ft.Column([
             # 페이지 제목과 뒤로가기
             ft.Container(
                 content=ft.Row([
@@ -285,7 +265,7 @@ class KioskApp:
             
             # 장바구니 내용
             ft.Container(
-                content=cart_items,
+                content=self.cart_items,
                 expand=True,
                 padding=ft.padding.symmetric(horizontal=20),
             ),
@@ -296,7 +276,7 @@ class KioskApp:
                     ft.Divider(thickness=2),
                     ft.Row([
                         ft.Text("총 결제금액", size=20, weight=ft.FontWeight.BOLD),
-                        ft.Text(f"{total:,}원", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_700),
+                        self.cart_total_text,
                     ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                     ft.Row([
                         ft.ElevatedButton(
@@ -309,49 +289,30 @@ class KioskApp:
                                 color=ft.Colors.WHITE,
                             )
                         ),
-                        ft.ElevatedButton(
-                            "결제하기",
-                            height=50,
-                            width=200,
-                            on_click=lambda e: self.show_payment_page(),
-                            disabled=len(self.cart) == 0,
-                            style=ft.ButtonStyle(
-                                bgcolor=ft.Colors.GREEN_700,
-                                color=ft.Colors.WHITE,
-                            )
-                        ),
+                        self.cart_pay_button,
                     ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ], spacing=15),
                 bgcolor=ft.Colors.GREY_50,
                 padding=20,
             ),
         ], expand=True, spacing=0)
-        
-        self.page.update()
     
+    @batched
     def show_payment_page(self):
         """결제 페이지 표시"""
         self.current_page = "payment"
-        
-        total = sum(item["price"] * item["quantity"] for item in self.cart)
-        
+        self.router.go("payment")
+        self.updater.request()
+    
+    def build_payment_page(self):
+        """결제 페이지 생성 (처음 들어갈 때 한 번, 주문 내용은 bind_payment_page 가 채움)"""
         # 주문 요약
-        order_summary = ft.Column([
-            ft.Text(f"주문 방식: {self.order_type}", size=18, weight=ft.FontWeight.BOLD),
-            ft.Divider(),
-        ])
-        
-        for item in self.cart:
-            order_summary.controls.append(
-                ft.Row([
-                    ft.Text(f"{item['image']} {item['name']}", size=16),
-                    ft.Text(f"x {item['quantity']}", size=16),
-                    ft.Text(f"{item['price']*item['quantity']:,}원", size=16, weight=ft.FontWeight.BOLD),
-                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
-            )
+        self.payment_order_type_text = ft.Text("", size=18, weight=ft.FontWeight.BOLD)
+        self.payment_items = ft.Column()
+        self.payment_total_text = ft.Text("", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_700)
         
         # 결제 수단 선택
-        payment_method = ft.RadioGroup(
+        self.payment_method = ft.RadioGroup(
             content=ft.Column([
                 ft.Radio(value="card", label="💳 카드 결제"),
                 ft.Radio(value="cash", label="💵 현금 결제"),
@@ -359,7 +320,7 @@ class KioskApp:
             value="card",
         )
         
-        self.main_container.content = ft.Column([
+        return ft.Column([
             # 페이지 제목과 뒤로가기
             ft.Container(
                 content=ft.Row([
@@ -377,7 +338,11 @@ class KioskApp:
             ft.Container(
                 content=ft.Column([
                     ft.Container(
-                        content=order_summary,
+                        content=ft.Column([
+                            self.payment_order_type_text,
+                            ft.Divider(),
+                            self.payment_items,
+                        ]),
                         bgcolor=ft.Colors.WHITE,
                         border=ft.border.all(1, ft.Colors.GREY_300),
                         border_radius=10,
@@ -387,7 +352,7 @@ class KioskApp:
                     ft.Container(
                         content=ft.Column([
                             ft.Text("결제 수단 선택", size=18, weight=ft.FontWeight.BOLD),
-                            payment_method,
+                            self.payment_method,
                         ]),
                         bgcolor=ft.Colors.WHITE,
                         border=ft.border.all(1, ft.Colors.GREY_300),
@@ -405,7 +370,7 @@ class KioskApp:
                     ft.Divider(thickness=2),
                     ft.Row([
                         ft.Text("총 결제금액", size=20, weight=ft.FontWeight.BOLD),
-                        ft.Text(f"{total:,}원", size=24, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_700),
+                        self.payment_total_text,
                     ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                     ft.Row([
                         ft.ElevatedButton(
@@ -434,14 +399,34 @@ class KioskApp:
                 padding=20,
             ),
         ], expand=True, spacing=0)
-        
-        self.page.update()
+    
+    def bind_payment_page(self):
+        """결제 페이지 데이터 반영 (주문 방식, 주문 요약, 총액)"""
+        self.payment_order_type_text.value = f"주문 방식: {self.order_type}"
+        self.payment_items.controls = [
+            ft.Row([
+                ft.Text(f"{item['image']} {item['name']}", size=16),
+                ft.Text(f"x {item['quantity']}", size=16),
+                ft.Text(f"{item['price']*item['quantity']:,}원", size=16, weight=ft.FontWeight.BOLD),
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+            for item in self.cart
+        ]
+        total = sum(item["price"] * item["quantity"] for item in self.cart)
+        self.payment_total_text.value = f"{total:,}원"
     
     def show_completion_page(self, order_number):
         """주문 완료 페이지 표시"""
         self.current_page = "complete"
+        self.router.go("complete", order_number)
+        self.updater.request()
+    
+    def build_completion_page(self):
+        """주문 완료 페이지 생성 (처음 들어갈 때 한 번, 주문번호/시간은 bind_completion_page 가 채움)"""
+        self.completion_number_text = ft.Text("", size=48, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_700)
+        self.completion_type_text = ft.Text("", size=18, color=ft.Colors.GREY_600)
+        self.completion_time_text = ft.Text("", size=14, color=ft.Colors.GREY_500)
         
-        self.main_container.content = ft.Container(
+        return ft.Container(
             content=ft.Column([
                 ft.Container(height=50),  # 상단 여백
                 ft.Icon(ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN, size=120),
@@ -450,9 +435,9 @@ class KioskApp:
                 ft.Container(
                     content=ft.Column([
                         ft.Text("주문번호", size=16, color=ft.Colors.GREY_600),
-                        ft.Text(f"{order_number}", size=48, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_700),
-                        ft.Text(f"{self.order_type} 주문", size=18, color=ft.Colors.GREY_600),
-                        ft.Text(f"주문 시간: {datetime.now().strftime('%Y-%m-%d %H:%M')}", size=14, color=ft.Colors.GREY_500),
+                        self.completion_number_text,
+                        self.completion_type_text,
+                        self.completion_time_text,
                     ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                     bgcolor=ft.Colors.WHITE,
                     border=ft.border.all(2, ft.Colors.BLUE_700),
@@ -475,19 +460,21 @@ class KioskApp:
             alignment=ft.alignment.center,
             expand=True,
         )
-        
-        self.page.update()
     
-    def update_menu_display(self, menu_content, category):
-        """선택된 카테고리의 메뉴 표시"""
-        menu_content.controls.clear()
-        
-        # 카테고리 제목
-        menu_content.controls.append(
-            ft.Text(category, size=24, weight=ft.FontWeight.BOLD)
-        )
-        menu_content.controls.append(ft.Divider())
-        
+    def bind_completion_page(self, order_number):
+        """주문 완료 페이지 데이터 반영 (주문번호, 주문 방식, 주문 시간)"""
+        self.completion_number_text.value = f"{order_number}"
+        self.completion_type_text.value = f"{self.order_type} 주문"
+        self.completion_time_text.value = f"주문 시간: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    
+    @batched
+    def update_menu_display(self, category):
+        """선택된 카테고리의 메뉴 표시 (만들어 둔 화면으로 교체)"""
+        self.menu_views.show(category, MENU_DATA[category])
+        self.updater.request()
+    
+    def build_menu_view(self, category, items):
+        """카테고리 메뉴 화면 생성 (카테고리 제목 + 메뉴 아이템 그리드)"""
         # 메뉴 아이템 그리드
         menu_grid = ft.GridView(
             expand=True,
@@ -498,11 +485,14 @@ class KioskApp:
             run_spacing=20,
         )
         
-        for item in MENU_DATA[category]:
+        for item in items:
             menu_grid.controls.append(self.create_menu_item(item))
         
-        menu_content.controls.append(menu_grid)
-        self.page.update()
+        return ft.Column([
+            ft.Text(category, size=24, weight=ft.FontWeight.BOLD),
+            ft.Divider(),
+            menu_grid,
+        ], expand=True)
     
     def create_menu_item(self, item):
         """메뉴 아이템 카드 생성"""
@@ -530,6 +520,7 @@ class KioskApp:
             alignment=ft.alignment.center,
         )
     
+    @batched
     def add_to_cart(self, item):
         """장바구니에 아이템 추가"""
         # 이미 있는 아이템인지 확인
@@ -553,27 +544,90 @@ class KioskApp:
             duration=1000,
         )
         self.page.snack_bar.open = True
-        self.page.update()
+        self.updater.request()
     
     def update_cart_badge(self):
         """장바구니 배지 업데이트"""
         total_items = sum(item["quantity"] for item in self.cart)
         self.cart_badge.value = str(total_items)
-        self.page.update()
+        self.updater.request()
     
+    @batched
     def update_quantity(self, item, change):
         """아이템 수량 업데이트"""
         item["quantity"] += change
         if item["quantity"] <= 0:
             self.cart.remove(item)
         
+        self.update_cart_display()
         self.update_cart_badge()
-        self.show_cart_page()  # 페이지 새로고침
     
+    def update_cart_display(self):
+        """
+        장바구니 목록/합계/결제 버튼 갱신 (바뀐 행의 수량/소계와 합계만 고침)
+        
+        호출한 쪽에서 self.updater.request() 로 반영한다.
+        """
+        total = self.cart_rows.sync(self.cart)
+        self.cart_total_text.value = f"{total:,}원"
+        if self.cart_pay_button is not None:
+            self.cart_pay_button.disabled = len(self.cart) == 0
+    
+    def create_cart_row(self, item):
+        """장바구니 한 줄 생성"""
+        quantity_text = ft.Text(str(item["quantity"]), size=18, weight=ft.FontWeight.BOLD)
+        subtotal_text = ft.Text(f"{item['price'] * item['quantity']:,}원", size=18, weight=ft.FontWeight.BOLD)
+        row = ft.Container(
+            content=ft.Row([
+                ft.Container(
+                    content=ft.Text(item["image"], size=40),
+                    width=60,
+                ),
+                ft.Column([
+                    ft.Text(item["name"], size=18, weight=ft.FontWeight.BOLD),
+                    ft.Text(f"개당 {item['price']:,}원", size=14, color=ft.Colors.GREY_600),
+                ], expand=True, spacing=5),
+                ft.Container(
+                    content=ft.Row([
+                        ft.IconButton(
+                            icon=ft.Icons.REMOVE_CIRCLE,
+                            on_click=lambda e, i=item: self.update_quantity(i, -1),
+                            icon_size=30,
+                            icon_color=ft.Colors.RED_400,
+                        ),
+                        ft.Container(
+                            content=quantity_text,
+                            width=40,
+                            alignment=ft.alignment.center,
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.ADD_CIRCLE,
+                            on_click=lambda e, i=item: self.update_quantity(i, 1),
+                            icon_size=30,
+                            icon_color=ft.Colors.GREEN_400,
+                        ),
+                    ], alignment=ft.MainAxisAlignment.CENTER),
+                    width=140,
+                ),
+                ft.Container(
+                    content=subtotal_text,
+                    width=100,
+                    alignment=ft.alignment.center_right,
+                ),
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            bgcolor=ft.Colors.WHITE,
+            border=ft.border.all(1, ft.Colors.GREY_300),
+            border_radius=10,
+            padding=20,
+        )
+        return CartRow(row, item, quantity_text, subtotal_text)
+    
+    @batched
     def go_to_cart(self, e):
         """장바구니 페이지로 이동"""
         self.show_cart_page()
     
+    @batched
     def complete_order(self):
         """주문 완료 처리"""
         order_number = self.order_manager.get_next_order_number()
@@ -587,8 +641,8 @@ class KioskApp:
             "total": sum(item["price"] * item["quantity"] for item in self.cart)
         }
         
-        # 주문 저장
-        self.order_manager.save_order(order_data)
+        # 주문 저장 (백그라운드 기록)
+        self.order_writer.save_order(order_data)
         
         # 장바구니 초기화
         self.cart.clear()
@@ -597,6 +651,7 @@ class KioskApp:
         # 완료 페이지 표시
         self.show_completion_page(order_number)
     
+    @batched
     def start_new_order(self):
         """새 주문 시작"""
         self.cart.clear()
@@ -604,10 +659,12 @@ class KioskApp:
         self.order_type = "매장"
         self.show_menu_page()
     
+    @batched
     def change_order_type(self, e):
         """주문 방식 변경"""
         self.order_type = e.control.value
     
+    @batched
     def show_admin_login(self, e):
         """관리자 로그인 다이얼로그"""
         password_field = ft.TextField(
@@ -616,6 +673,7 @@ class KioskApp:
             autofocus=True,
         )
         
+        @self.updater.wrap
         def verify_password(e):
             entered_password = hashlib.sha256(password_field.value.encode()).hexdigest()
             if entered_password == self.admin_password:
@@ -625,9 +683,9 @@ class KioskApp:
             else:
                 self.page.snack_bar = ft.SnackBar(content=ft.Text("비밀번호가 올바르지 않습니다."))
                 self.page.snack_bar.open = True
-                self.page.update()
+                self.updater.request()
         
-        login_dialog = ft.AlertDialog(
+        login_dialog = self.dialogs.open(
             title=ft.Text("관리자 로그인"),
             content=ft.Container(
                 content=ft.Column([
@@ -643,25 +701,24 @@ class KioskApp:
                 ft.ElevatedButton("로그인", on_click=verify_password),
             ],
         )
-        
-        self.page.overlay.append(login_dialog)
-        login_dialog.open = True
-        self.page.update()
     
     def show_admin_panel(self):
         """관리자 패널 표시"""
         orders_list = ft.Column(scroll=ft.ScrollMode.AUTO, height=400)
         
-        # 주문 내역 로드
-        self.order_manager.load_orders()
+        # 아직 기록 대기 중인 주문까지 반영
+        self.order_writer.flush(timeout=1)
         
-        if not self.order_manager.orders:
+        # 최근 20개만 저널 끝에서부터 읽음 (전체 주문을 불러오지 않음)
+        recent_orders = self.order_manager.get_recent_orders(20)
+        
+        if not recent_orders:
             orders_list.controls.append(
                 ft.Text("주문 내역이 없습니다.", size=16, color=ft.Colors.GREY_600)
             )
         else:
             # 최근 주문부터 표시
-            for order in reversed(self.order_manager.orders[-20:]):  # 최근 20개만 표시
+            for order in recent_orders:
                 order_time = datetime.fromisoformat(order["timestamp"])
                 
                 order_card = ft.Container(
@@ -688,15 +745,13 @@ class KioskApp:
                 orders_list.controls.append(order_card)
         
         # 통계 정보
-        total_orders = len(self.order_manager.orders)
-        total_revenue = sum(order.get("total", 0) for order in self.order_manager.orders)
-        today_orders = [
-            order for order in self.order_manager.orders
-            if datetime.fromisoformat(order["timestamp"]).date() == datetime.now().date()
-        ]
-        today_revenue = sum(order.get("total", 0) for order in today_orders)
+        stats = self.order_manager.get_order_stats()
+        total_orders = stats["total_orders"]
+        total_revenue = stats["total_revenue"]
+        today_orders = stats["today_orders"]
+        today_revenue = stats["today_revenue"]
         
-        admin_dialog = ft.AlertDialog(
+        admin_dialog = self.dialogs.open(
             title=ft.Text("관리자 패널", size=24, weight=ft.FontWeight.BOLD),
             content=ft.Container(
                 content=ft.Column([
@@ -726,7 +781,7 @@ class KioskApp:
                         ft.Container(
                             content=ft.Column([
                                 ft.Text("오늘 주문", size=12, color=ft.Colors.GREY_600),
-                                ft.Text(f"{len(today_orders)}건", size=20, weight=ft.FontWeight.BOLD),
+                                ft.Text(f"{today_orders}건", size=20, weight=ft.FontWeight.BOLD),
                             ]),
                             bgcolor=ft.Colors.ORANGE_50,
                             border_radius=8,
@@ -758,15 +813,11 @@ class KioskApp:
                 ),
             ],
         )
-        
-        self.page.overlay.append(admin_dialog)
-        admin_dialog.open = True
-        self.page.update()
     
+    @batched
     def close_dialog(self, dialog):
-        """다이얼로그 닫기"""
-        dialog.open = False
-        self.page.update()
+        """다이얼로그 닫기 (닫힌 다이얼로그는 overlay 에서 빠지고 풀로 돌아감)"""
+        self.dialogs.close(dialog)
 
 def main(page: ft.Page):
     app = KioskApp(page)
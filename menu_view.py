@@ -0,0 +1,72 @@
+"""카테고리별 메뉴 화면 캐시
+
+카테고리 버튼을 누를 때마다 GridView 와 메뉴 카드를 새로 만들면 Flet 은 그 컨트롤 트리 전체를
+클라이언트로 다시 보낸다. MenuViewCache 는 카테고리마다 화면을 처음 열 때 한 번만 만들어
+container 안에 넣어 두고, 이후에는 보이는 화면만 바꾼다 (visible 속성 2개만 전송).
+
+메뉴 목록이 바뀌면(이름/가격/이미지 추가·삭제·수정) 다음에 그 카테고리를 열 때 다시 만든다.
+invalidate() 로 직접 무효화할 수도 있다.
+"""
+
+
+def menu_fingerprint(items):
+    """메뉴 목록 비교용 값 (품목 dict 의 키/값을 순서대로)"""
+    return tuple(tuple(item.items()) for item in items)
+
+
+class MenuViewCache:
+    """
+    카테고리 → 만들어 둔 메뉴 화면
+
+    Args:
+        container: 화면들을 담을 컨트롤 (controls 리스트를 가진 ft.Column 등)
+        build_view: (category, items) -> 컨트롤, 카테고리 화면을 만드는 함수
+    """
+    def __init__(self, container, build_view):
+        self.container = container
+        self.build_view = build_view
+        self.current = None
+
+        # 카테고리 -> (메뉴 fingerprint, 화면 컨트롤)
+        self._views = {}
+
+        # 통계
+        self.builds = 0
+        self.hits = 0
+
+    def show(self, category, items):
+        """
+        category 화면을 보이게 하고 나머지는 숨김 (처음이거나 메뉴가 바뀌었으면 새로 만듦)
+
+        호출한 쪽에서 page.update() 로 반영한다.
+        """
+        fingerprint = menu_fingerprint(items)
+        cached = self._views.get(category)
+        if cached is not None and cached[0] == fingerprint:
+            view = cached[1]
+            self.hits += 1
+        else:
+            view = self.build_view(category, items)
+            self.builds += 1
+            if cached is not None:
+                self.container.controls[self.container.controls.index(cached[1])] = view
+            else:
+                self.container.controls.append(view)
+            self._views[category] = (fingerprint, view)
+
+        if self.current is not None and self.current is not view:
+            self.current.visible = False
+        view.visible = True
+        self.current = view
+        return view
+
+    def invalidate(self, category=None):
+        """만들어 둔 화면 버리기 (category 가 None 이면 전부)"""
+        categories = list(self._views) if category is None else [category]
+        for name in categories:
+            cached = self._views.pop(name, None)
+            if cached is None:
+                continue
+            self.container.controls.remove(cached[1])
+            if self.current is cached[1]:
+                self.current = None
@@ -0,0 +1,291 @@
+"""SQLite 기반 주문 저장소
+
+orders 테이블(order_number, timestamp 인덱스)과 정규화된 order_items 테이블을 사용한다.
+관리자 패널의 "최근 20건", "오늘", "전체" 조회가 전체 스캔 대신 인덱스 조회로 처리된다.
+
+연결 하나를 UI 스레드와 백그라운드 저장 스레드(order_writer.py)가 함께 쓰므로 모든 접근을 잠금 안에서 한다.
+원래 주문에 없던 표준 키는 extra 의 "_missing" 에 기록해 두고, 읽을 때 빼서 저장 전과 같은 dict 로 돌려준다
+(품목의 "image": None 은 extra 에 그대로 보관).
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from order_store import JSON_FILE, JOURNAL_FILE, read_journal
+
+DB_FILE = "orders.db"
+
+# orders 테이블 컬럼으로 분리하는 필드 (나머지는 extra 에 JSON 으로 보관)
+ORDER_COLUMNS = ("order_number", "timestamp", "order_type", "total")
+ITEM_COLUMNS = ("name", "price", "quantity", "image")
+
+# 원래 주문/품목에 없던 표준 키 목록을 extra 에 기록할 때의 키
+MISSING_KEY = "_missing"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_number INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    order_type TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_order_number ON orders(order_number);
+CREATE INDEX IF NOT EXISTS idx_orders_timestamp ON orders(timestamp);
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    image TEXT,
+    extra TEXT,
+    PRIMARY KEY (order_id, position)
+);
+"""
+
+
+class SQLiteOrderManager:
+    """SQLite 주문 데이터 관리 클래스 (OrderManager 와 같은 API)"""
+    def __init__(self, db_file=DB_FILE, import_legacy=True, aggregator=None, allocator=None):
+        self.orders_file = db_file
+        is_new = not os.path.exists(db_file)
+
+        # sqlite3 연결은 여러 스레드가 동시에 쓰면 안전하지 않음 (읽기/쓰기 모두 이 잠금 안에서)
+        self._db_lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+        # 처음 만들 때 기존 저널/JSON 주문을 옮겨 온다
+        if is_new and import_legacy:
+            data_dir = os.path.dirname(db_file)
+            journal_file = os.path.join(data_dir, JOURNAL_FILE)
+            json_file = os.path.join(data_dir, JSON_FILE)
+            if os.path.exists(journal_file):
+                self.import_orders(read_journal(journal_file))
+            elif os.path.exists(json_file):
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    self.import_orders(json.load(f))
+
+        self._orders = None
+
+        # 매출 집계 (save_order 마다 갱신, 저장된 집계가 없으면 기존 주문으로 1회 계산)
+        self.aggregator = aggregator
+        if aggregator is not None:
+            if aggregator.is_new:
+                aggregator.rebuild(self.read_since)
+            else:
+                aggregator.sync(self.read_since)
+
+        # 주문번호 발급기 (저장된 번호가 없으면 기존 주문으로 1회 설정)
+        self.allocator = allocator
+        if allocator is not None and allocator.is_new:
+            allocator.seed(self.orders)
+
+    @property
+    def orders(self):
+        """전체 주문 리스트 (처음 접근할 때만 DB 에서 읽음)"""
+        with self._db_lock:
+            if self._orders is None:
+                rows = self.conn.execute("SELECT * FROM orders ORDER BY id").fetchall()
+                self._orders = self._to_orders(rows)
+            return self._orders
+
+    def load_orders(self):
+        """저장된 주문 불러오기 (다음 orders 접근 시 DB 에서 다시 읽음)"""
+        self._orders = None
+
+    def save_order(self, order_data):
+        """새 주문 저장"""
+        self.save_orders([order_data])
+
+    def save_orders(self, orders):
+        """주문 여러 건을 한 트랜잭션(커밋 1회)으로 저장 후 집계 반영"""
+        self.append_orders(orders)
+        self.sync_stats()
+
+    def append_orders(self, orders, retry=False):
+        """
+        주문 기록 (집계는 sync_stats)
+
+        트랜잭션이 실패하면 모두 롤백되므로 retry 여부와 관계없이 배치 전체를 다시 기록한다.
+        """
+        with self._db_lock, self.conn:
+            for order in orders:
+                self._insert(order)
+            if self._orders is not None:
+                self._orders.extend(orders)
+
+    def sync_stats(self):
+        """기록된 주문 중 아직 집계에 반영되지 않은 주문 반영"""
+        if self.aggregator is not None:
+            self.aggregator.sync(self.read_since)
+
+    def read_since(self, mark=None):
+        """
+        mark(행 id) 뒤에 저장된 주문 (SalesAggregator.sync 용)
+
+        Returns:
+            tuple: (end_mark: 마지막 행 id, [(주문, 행 id) ...])
+        """
+        with self._db_lock:
+            rows = self.conn.execute(
+                "SELECT * FROM orders WHERE id > ? ORDER BY id", (mark or 0,)
+            ).fetchall()
+            if not rows:
+                return mark, []
+            return rows[-1]["id"], list(zip(self._to_orders(rows), (row["id"] for row in rows)))
+
+    def import_orders(self, orders):
+        """주문 여러 건을 한 트랜잭션으로 저장"""
+        with self._db_lock, self.conn:
+            for order in orders:
+                self._insert(order)
+            self._orders = None
+        return len(orders)
+
+    def get_next_order_number(self):
+        """다음 주문번호 생성 (order_number 인덱스로 최대값 조회)"""
+        if self.allocator is not None:
+            return self.allocator.allocate()
+        with self._db_lock:
+            row = self.conn.execute("SELECT MAX(order_number) FROM orders").fetchone()
+        return (row[0] or 0) + 1
+
+    def get_recent_orders(self, limit=20):
+        """최근 주문 limit 건 (최신 순)"""
+        return self.get_orders_page(limit)[0]
+
+    def get_orders_page(self, limit=20, cursor=None):
+        """
+        최근 주문부터 limit 건씩 거꾸로 페이지 조회 (cursor 는 마지막으로 받은 행 id)
+
+        Returns:
+            tuple: (orders: 최신 순 주문 리스트, cursor: 다음(더 오래된) 페이지 cursor, 없으면 None)
+        """
+        with self._db_lock:
+            if cursor is None:
+                rows = self.conn.execute(
+                    "SELECT * FROM orders ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT * FROM orders WHERE id < ? ORDER BY id DESC LIMIT ?", (cursor, limit)
+                ).fetchall()
+            next_cursor = rows[-1]["id"] if len(rows) == limit else None
+            return self._to_orders(rows), next_cursor
+
+    def get_order_stats(self, day=None):
+        """전체/오늘 주문 수와 매출"""
+        if self.aggregator is not None:
+            return self.aggregator.get_order_stats(day)
+        day = day or datetime.now().date()
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+
+        with self._db_lock:
+            total_orders, total_revenue = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(total), 0) FROM orders"
+            ).fetchone()
+            today_orders, today_revenue = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(total), 0) FROM orders WHERE timestamp >= ? AND timestamp < ?",
+                (start.isoformat(), end.isoformat()),
+            ).fetchone()
+        return {
+            "total_orders": total_orders,
+            "total_revenue": total_revenue,
+            "today_orders": today_orders,
+            "today_revenue": today_revenue,
+        }
+
+    def close(self):
+        """DB 연결 종료"""
+        with self._db_lock:
+            self.conn.close()
+
+    def _insert(self, order_data):
+        """주문 1건 INSERT (잠금 안에서 호출)"""
+        cur = self.conn.execute(
+            "INSERT INTO orders (order_number, timestamp, order_type, total, extra) VALUES (?, ?, ?, ?, ?)",
+            (
+                order_data.get("order_number", 0),
+                order_data.get("timestamp", ""),
+                order_data.get("order_type"),
+                order_data.get("total", 0),
+                self._dump_extra(order_data, ORDER_COLUMNS + ("items",)),
+            ),
+        )
+        order_id = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO order_items (order_id, position, name, price, quantity, image, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    order_id,
+                    position,
+                    item["name"],
+                    item["price"],
+                    item["quantity"],
+                    item.get("image"),
+                    # "image": None 은 image 가 없는 품목과 구분되도록 extra 에 보관
+                    self._dump_extra(item, ITEM_COLUMNS if item.get("image") is not None else ITEM_COLUMNS[:3]),
+                )
+                for position, item in enumerate(order_data.get("items", []))
+            ],
+        )
+
+    def _to_orders(self, rows):
+        """orders 행을 기존 JSON 구조(dict + items 리스트)로 변환 (잠금 안에서 호출)"""
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        items_by_order = {order_id: [] for order_id in ids}
+        if len(ids) <= 500:
+            placeholders = ",".join("?" * len(ids))
+            item_rows = self.conn.execute(
+                f"SELECT * FROM order_items WHERE order_id IN ({placeholders}) ORDER BY order_id, position", ids
+            )
+        else:
+            # 전체 로드처럼 행이 많으면 id 범위로 한 번에 읽는다 (SQL 변수 개수 제한 회피)
+            item_rows = self.conn.execute(
+                "SELECT * FROM order_items WHERE order_id BETWEEN ? AND ? ORDER BY order_id, position",
+                (min(ids), max(ids)),
+            )
+        for item in item_rows:
+            if item["order_id"] not in items_by_order:
+                continue
+            item_data = {"name": item["name"], "price": item["price"], "quantity": item["quantity"]}
+            if item["image"] is not None:
+                item_data["image"] = item["image"]
+            if item["extra"]:
+                item_data.update(json.loads(item["extra"]))
+            items_by_order[item["order_id"]].append(item_data)
+
+        orders = []
+        for row in rows:
+            order = {
+                "order_number": row["order_number"],
+                "timestamp": row["timestamp"],
+                "order_type": row["order_type"],
+                "items": items_by_order[row["id"]],
+                "total": row["total"],
+            }
+            extra = json.loads(row["extra"]) if row["extra"] else {}
+            for key in extra.pop(MISSING_KEY, ()):
+                order.pop(key, None)
+            order.update(extra)
+            orders.append(order)
+        return orders
+
+    @staticmethod
+    def _dump_extra(data, columns):
+        extra = {k: v for k, v in data.items() if k not in columns}
+        missing = [k for k in columns if k not in data]
+        if missing:
+            extra[MISSING_KEY] = missing
+        return json.dumps(extra, ensure_ascii=False) if extra else None
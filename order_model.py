@@ -0,0 +1,274 @@
+"""메모리를 적게 쓰는 주문 표현
+
+주문 dict 하나는 품목 dict 리스트를 들고 있고, 품목마다 name/price/image 문자열을 중복해서 가진다.
+여기서는 주문을 __slots__ 레코드로 바꿔 보관한다.
+- 품목은 (메뉴 ID, 수량) 정수 쌍의 튜플로 보관. 메뉴 ID 는 MenuCatalog 가 (name, price, image) 로 발급
+  (가격 타입(1 / 1.0)과 "image" 키 유무("image": None / 없음)도 구분)
+- timestamp 는 epoch 마이크로초 정수
+- order_type 은 intern 된 문자열
+- 그 밖의 필드(kitchen_info 등)는 extra dict 에 그대로 보관
+- 원래 주문에 없던 표준 키는 MISSING 으로 표시해 to_dict() 에서도 빼낸다
+
+to_dict() 는 기존 JSON 구조와 같은 dict 를 돌려준다 (손실 없음).
+
+사용법: python order_model.py [주문 수]  → 합성 주문 기록으로 메모리 사용량 비교
+"""
+import sys
+from collections.abc import MutableSequence
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+ITEM_KEYS = ("name", "price", "quantity", "image")
+ORDER_KEYS = ("order_number", "timestamp", "order_type", "items", "total")
+
+# 원래 주문에 없던 표준 키 표시 (None 값과 구분)
+MISSING = object()
+
+
+def to_epoch_us(timestamp):
+    """ISO 문자열 → epoch 마이크로초 정수 (되돌렸을 때 같은 문자열이 아니면 None)"""
+    try:
+        value = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if value.tzinfo is not None:
+        return None
+    epoch_us = (value - EPOCH) // timedelta(microseconds=1)
+    return epoch_us if from_epoch_us(epoch_us) == timestamp else None
+
+
+def from_epoch_us(epoch_us):
+    """epoch 마이크로초 정수 → ISO 문자열"""
+    return (EPOCH + timedelta(microseconds=epoch_us)).isoformat()
+
+
+class MenuCatalog:
+    """(name, price, image) 조합에 메뉴 ID 를 발급하는 클래스 (가격 타입, image 키 유무까지 구분)"""
+    def __init__(self, menu_data=None):
+        self.entries = []
+        self.ids = {}
+        if menu_data:
+            for items in menu_data.values():
+                for item in items:
+                    self.get_id(item)
+
+    def get_id(self, item):
+        """품목의 메뉴 ID (처음 보는 조합이면 새로 발급)"""
+        # 1 == 1.0 이고 "image": None 과 image 없음은 get 으로 구분되지 않으므로 키에 함께 넣음
+        key = (item["name"], item["price"], type(item["price"]), "image" in item, item.get("image"))
+        menu_id = self.ids.get(key)
+        if menu_id is None:
+            menu_id = len(self.entries)
+            self.entries.append(key)
+            self.ids[key] = menu_id
+        return menu_id
+
+    def get_item(self, menu_id, quantity):
+        """메뉴 ID + 수량 → 장바구니 품목 dict"""
+        name, price, _, has_image, image = self.entries[menu_id]
+        item = {"name": name, "price": price, "quantity": quantity}
+        if has_image:
+            item["image"] = image
+        return item
+
+
+class CompactOrder:
+    """주문 1건 레코드 (__slots__)"""
+    __slots__ = ("order_number", "timestamp", "order_type", "items", "total", "extra")
+
+    def __init__(self, order_number, timestamp, order_type, items, total, extra=None):
+        self.order_number = order_number
+        self.timestamp = timestamp
+        self.order_type = order_type
+        self.items = items
+        self.total = total
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, order_data, catalog):
+        """
+        주문 dict → CompactOrder
+
+        표준 구조에서 벗어난 값(다른 형식의 timestamp, 추가 키가 있는 품목 등)은
+        손실이 없도록 extra 에 원래 값 그대로 보관한다.
+        """
+        extra = {k: v for k, v in order_data.items() if k not in ORDER_KEYS}
+
+        if "timestamp" not in order_data:
+            timestamp = MISSING
+        else:
+            timestamp = to_epoch_us(order_data["timestamp"])
+            if timestamp is None:
+                extra["timestamp"] = order_data["timestamp"]
+
+        items = order_data.get("items", MISSING)
+        if items is MISSING:
+            pass
+        elif all(item.keys() <= set(ITEM_KEYS) and item.keys() >= set(ITEM_KEYS[:3]) for item in items):
+            packed = []
+            for item in items:
+                packed.append(catalog.get_id(item))
+                packed.append(item["quantity"])
+            items = tuple(packed)
+        else:
+            extra["items"] = items
+            items = None
+
+        order_type = order_data.get("order_type", MISSING)
+        if isinstance(order_type, str):
+            order_type = sys.intern(order_type)
+
+        return cls(
+            order_data.get("order_number", MISSING),
+            timestamp,
+            order_type,
+            items,
+            order_data.get("total", MISSING),
+            extra or None,
+        )
+
+    def to_dict(self, catalog):
+        """CompactOrder → 기존 JSON 구조의 주문 dict"""
+        extra = self.extra or {}
+        if self.items is None:
+            items = extra["items"]
+        elif self.items is MISSING:
+            items = MISSING
+        else:
+            items = [
+                catalog.get_item(self.items[i], self.items[i + 1])
+                for i in range(0, len(self.items), 2)
+            ]
+        if self.timestamp is None:
+            timestamp = extra["timestamp"]
+        elif self.timestamp is MISSING:
+            timestamp = MISSING
+        else:
+            timestamp = from_epoch_us(self.timestamp)
+        values = (self.order_number, timestamp, self.order_type, items, self.total)
+        order = {key: value for key, value in zip(ORDER_KEYS, values) if value is not MISSING}
+        order.update((k, v) for k, v in extra.items() if k not in ORDER_KEYS)
+        return order
+
+
+class CompactOrderList(MutableSequence):
+    """
+    CompactOrder 로 보관하지만 dict 리스트처럼 쓰는 주문 목록
+
+    꺼낼 때마다 dict 로 변환하므로, 반환된 dict 를 고쳐도 저장된 주문은 바뀌지 않는다.
+    """
+    def __init__(self, orders=(), catalog=None):
+        self.catalog = catalog if catalog is not None else MenuCatalog()
+        self._records = [CompactOrder.from_dict(order, self.catalog) for order in orders]
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [record.to_dict(self.catalog) for record in self._records[index]]
+        return self._records[index].to_dict(self.catalog)
+
+    def __setitem__(self, index, order_data):
+        if isinstance(index, slice):
+            self._records[index] = [CompactOrder.from_dict(order, self.catalog) for order in order_data]
+        else:
+            self._records[index] = CompactOrder.from_dict(order_data, self.catalog)
+
+    def __delitem__(self, index):
+        del self._records[index]
+
+    def insert(self, index, order_data):
+        self._records.insert(index, CompactOrder.from_dict(order_data, self.catalog))
+
+    def records(self):
+        """dict 로 바꾸지 않은 CompactOrder 레코드 목록"""
+        return self._records
+
+
+def _synthetic_orders(count):
+    """벤치마크용 합성 주문 (JSON 에서 읽은 것처럼 주문마다 별도의 문자열 객체를 가짐)"""
+    import json
+    import random
+
+    menu = [
+        ("스테이크", 32000, "🥩"), ("파스타 까르보나라", 15000, "🍝"), ("피자 페퍼로니", 20000, "🍕"),
+        ("햄버거", 13000, "🍔"), ("감자튀김", 5000, "🍟"), ("샐러드", 8000, "🥗"),
+        ("콜라", 3000, "🥤"), ("커피", 3500, "☕"), ("맥주", 5000, "🍺"),
+    ]
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1, 11, 0)
+    for number in range(1, count + 1):
+        items = [
+            {"name": name, "price": price, "quantity": rng.randint(1, 3), "image": image}
+            for name, price, image in rng.sample(menu, rng.randint(1, 4))
+        ]
+        order = {
+            "order_number": number,
+            "timestamp": (start + timedelta(seconds=number * 37, microseconds=rng.randrange(1000000))).isoformat(),
+            "order_type": rng.choice(["매장", "포장"]),
+            "items": items,
+            "total": sum(item["price"] * item["quantity"] for item in items),
+        }
+        yield json.loads(json.dumps(order, ensure_ascii=False))
+
+
+def deep_sizeof(root):
+    """객체가 참조하는 모든 객체의 크기 합 (같은 객체는 한 번만 셈)"""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            slots = getattr(type(obj), "__slots__", ())
+            stack.extend(getattr(obj, name) for name in slots if hasattr(obj, name))
+    return total
+
+
+def benchmark(count=1000000):
+    """합성 주문 count 건을 dict 리스트 / CompactOrderList 로 보관할 때 메모리 비교"""
+    import time
+
+    started = time.perf_counter()
+    orders = list(_synthetic_orders(count))
+    dict_size = deep_sizeof(orders)
+    del orders
+
+    compact = CompactOrderList(_synthetic_orders(count))
+    compact_size = deep_sizeof(compact)
+
+    # 손실 없는 변환 확인 (앞부분 일부 + 표준 키가 빠진 주문)
+    samples = list(_synthetic_orders(min(count, 1000)))
+    assert compact[:len(samples)] == samples
+    partial = [
+        {"order_number": 1, "timestamp": "2025-01-01T11:00:00", "items": []},
+        {"order_number": 2, "order_type": None, "total": None},
+        {"timestamp": "오늘", "items": [{"name": "콜라", "price": 3000, "quantity": 1, "memo": "얼음 없이"}]},
+        {"order_number": 3, "items": [{"name": "콜라", "price": 3000, "quantity": 1, "image": None},
+                                      {"name": "콜라", "price": 3000, "quantity": 1}]},
+        {"order_number": 4, "items": [{"name": "쿠키", "price": 1, "quantity": 1},
+                                      {"name": "쿠키", "price": 1.0, "quantity": 1}]},
+    ]
+    # 1 == 1.0 이므로 repr 로 가격 타입까지 비교
+    assert repr(list(CompactOrderList(partial))) == repr(partial)
+
+    print(f"주문 {count:,}건 ({time.perf_counter() - started:.0f}초)")
+    print(f"  dict 리스트       : {dict_size / 1024 / 1024:8.1f} MB ({dict_size / count:6.0f} B/주문)")
+    print(f"  CompactOrderList  : {compact_size / 1024 / 1024:8.1f} MB ({compact_size / count:6.0f} B/주문)")
+    print(f"  절감              : {(1 - compact_size / dict_size) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
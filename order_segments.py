@@ -0,0 +1,281 @@
+"""일별 주문 세그먼트
+
+주문 저널을 날짜별 파일로 나누어 저장한다 (data_dir 아래)
+- YYYY-MM-DD.jsonl     : 해당 날짜에 저장된 주문 저널
+- YYYY-MM-DD.jsonl.gz  : compress_after_days 일이 지난 세그먼트 (gzip 압축)
+- manifest.json        : 세그먼트 목록과 마감된 세그먼트의 주문 수/매출/주문번호 범위
+
+시작할 때는 오늘 세그먼트만 읽고, 지난 세그먼트는 보고서가 요청할 때만 읽는다.
+"""
+import gzip
+import json
+import os
+import shutil
+from datetime import date, datetime, timedelta
+
+from file_lock import FileLock
+from order_store import append_journal, iter_journal_from, journal_end, read_journal, tail_journal
+
+SEGMENTS_DIR = "orders"
+MANIFEST_FILE = "manifest.json"
+
+
+class SegmentStore:
+    """
+    날짜별 세그먼트 파일 관리 클래스
+
+    Args:
+        data_dir (str): 세그먼트 디렉터리
+        compress_after_days (int): 이 일수보다 오래된 세그먼트는 gzip 압축 (None 이면 압축 안 함)
+    """
+    def __init__(self, data_dir=SEGMENTS_DIR, compress_after_days=7):
+        self.data_dir = data_dir
+        self.compress_after_days = compress_after_days
+        os.makedirs(data_dir, exist_ok=True)
+        self.manifest_file = os.path.join(data_dir, MANIFEST_FILE)
+        self.lock = FileLock(os.path.join(data_dir, "segments.lock"))
+        self.is_new = not os.path.exists(self.manifest_file)
+        self.manifest = self._read_manifest()
+        self._registered_day = None
+
+    def today(self):
+        return datetime.now().date()
+
+    @property
+    def registered_day(self):
+        """이 프로세스가 마지막으로 rotate 해서 manifest 에 등록한 날짜 (rotate 전이면 None)"""
+        return self._registered_day
+
+    def dates(self):
+        """세그먼트 날짜 목록 (오래된 순)"""
+        return sorted(date.fromisoformat(day) for day in self.manifest["segments"])
+
+    def append(self, orders):
+        """오늘 세그먼트에 주문 추가 (날짜가 바뀌었으면 먼저 rotate)"""
+        today = self.today()
+        if self._registered_day != today:
+            self.rotate()
+        append_journal(self._plain_path(today), orders, self.lock)
+
+    def rotate(self):
+        """
+        오늘 세그먼트를 manifest 에 등록하고, 지난 세그먼트를 마감/압축
+
+        마감된 세그먼트는 주문 수/매출/주문번호 범위를 manifest 에 기록해 두어
+        통계를 낼 때 파일을 다시 읽지 않게 한다.
+        """
+        today = self.today()
+        with self.lock:
+            self.manifest = self._read_manifest()
+            segments = self.manifest["segments"]
+            segments.setdefault(today.isoformat(), {"closed": False, "compressed": False})
+
+            for day, info in segments.items():
+                seg_date = date.fromisoformat(day)
+                if seg_date >= today:
+                    continue
+                if not info["closed"]:
+                    orders = read_journal(self._plain_path(seg_date))
+                    numbers = [order.get("order_number", 0) for order in orders]
+                    info.update({
+                        "closed": True,
+                        "orders": len(orders),
+                        "revenue": sum(order.get("total", 0) for order in orders),
+                        "first_order_number": min(numbers, default=None),
+                        "last_order_number": max(numbers, default=None),
+                    })
+                if (
+                    self.compress_after_days is not None
+                    and not info["compressed"]
+                    and seg_date <= today - timedelta(days=self.compress_after_days)
+                ):
+                    self._compress(seg_date)
+                    info["compressed"] = True
+
+            self._write_manifest()
+        self._registered_day = today
+
+    def refresh(self):
+        """manifest 다시 읽기 (다른 프로세스가 rotate 했을 수 있음)"""
+        self.manifest = self._read_manifest()
+
+    def read_segment(self, day):
+        """해당 날짜 세그먼트의 주문 리스트 (압축된 세그먼트도 읽음)"""
+        if os.path.exists(self._gz_path(day)):
+            with gzip.open(self._gz_path(day), 'rt', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        with self.lock:
+            return read_journal(self._plain_path(day))
+
+    def iter_orders(self, start=None, end=None):
+        """start ~ end 날짜(포함) 세그먼트의 주문을 오래된 순으로 하나씩 반환 (세그먼트 단위로 읽음)"""
+        self.refresh()
+        for day in self.dates():
+            if (start and day < start) or (end and day > end):
+                continue
+            yield from self.read_segment(day)
+
+    def tail(self, limit, cursor=None):
+        """
+        최근 주문부터 limit 건 (세그먼트를 거슬러 올라가며 필요한 만큼만 읽음)
+
+        Args:
+            cursor (tuple): (세그먼트 날짜 문자열, 세그먼트 안의 바이트 위치), None 이면 가장 최근부터
+                            압축 여부와 관계없이 압축 전 파일의 바이트 위치라서, 페이지를 넘기는 사이에
+                            세그먼트가 압축되어도 같은 위치를 가리킨다.
+
+        Returns:
+            tuple: (orders: 최신 순 주문 리스트, cursor: 다음 페이지 cursor, 없으면 None)
+        """
+        self.refresh()
+        days = [day.isoformat() for day in reversed(self.dates())]
+        if cursor is not None:
+            days = days[days.index(cursor[0]):]
+            inner = cursor[1]
+        else:
+            inner = None
+
+        orders = []
+        for i, day in enumerate(days):
+            need = limit - len(orders)
+            if os.path.exists(self._gz_path(date.fromisoformat(day))):
+                page, inner = self._tail_gz(date.fromisoformat(day), need, inner)
+            else:
+                page, inner = tail_journal(self._plain_path(date.fromisoformat(day)), need, inner)
+            orders.extend(page)
+
+            if len(orders) >= limit:
+                if inner is not None:
+                    return orders, (day, inner)
+                if i + 1 < len(days):
+                    return orders, (days[i + 1], None)
+                return orders, None
+        return orders, None
+
+    def read_since(self, mark=None):
+        """
+        mark 뒤에 저장된 주문 (SalesAggregator.sync 용)
+
+        Args:
+            mark (list): [세그먼트 날짜 문자열, 세그먼트 안의 바이트 위치], None 이면 처음부터
+
+        Returns:
+            tuple: (end_mark, [(주문, 그 주문까지의 mark) ...] 를 하나씩 반환하는 iterator)
+        """
+        self.refresh()
+        days = [day for day in self.dates() if mark is None or day.isoformat() >= mark[0]]
+        if not days:
+            return mark, iter(())
+        last = days[-1]
+        if os.path.exists(self._gz_path(last)):
+            end_mark = [last.isoformat(), sum(len(line) for line in self._iter_gz_lines(last))]
+        else:
+            end_mark = [last.isoformat(), journal_end(self._plain_path(last))]
+        if mark is not None and end_mark <= mark:
+            return mark, iter(())
+
+        def orders():
+            for day in days:
+                start = mark[1] if mark is not None and day.isoformat() == mark[0] else 0
+                end = end_mark[1] if day == last else None
+                if os.path.exists(self._gz_path(day)):
+                    pos = 0
+                    for line in self._iter_gz_lines(day):
+                        pos += len(line)
+                        if pos <= start or line.strip() == b"":
+                            continue
+                        if end is not None and pos > end:
+                            break
+                        yield json.loads(line), [day.isoformat(), pos]
+                else:
+                    for order, pos in iter_journal_from(self._plain_path(day), start, end):
+                        yield order, [day.isoformat(), pos]
+
+        return end_mark, orders()
+
+    def get_closed_stats(self):
+        """마감된 세그먼트의 주문 수/매출 합계 (manifest 만 읽음)"""
+        self.refresh()
+        closed = [info for info in self.manifest["segments"].values() if info["closed"]]
+        return {
+            "orders": sum(info["orders"] for info in closed),
+            "revenue": sum(info["revenue"] for info in closed),
+        }
+
+    def migrate_journal(self, journal_file):
+        """
+        기존 단일 저널(orders.jsonl)을 날짜별 세그먼트로 1회 분할
+
+        주문 timestamp 의 날짜를 기준으로 나눈다. 원본 저널은 그대로 둔다.
+
+        Returns:
+            int: 옮긴 주문 수
+        """
+        orders = read_journal(journal_file)
+        by_day = {}
+        for order in orders:
+            day = datetime.fromisoformat(order["timestamp"]).date()
+            by_day.setdefault(day, []).append(order)
+
+        with self.lock:
+            # 다른 프로세스가 먼저 옮겼으면 건너뜀
+            if os.path.exists(self.manifest_file):
+                self.refresh()
+                self.is_new = False
+                return 0
+            for day, day_orders in by_day.items():
+                append_journal(self._plain_path(day), day_orders)
+                self.manifest["segments"].setdefault(
+                    day.isoformat(), {"closed": False, "compressed": False}
+                )
+            self._write_manifest()
+        self.is_new = False
+        return len(orders)
+
+    def _plain_path(self, day):
+        return os.path.join(self.data_dir, f"{day.isoformat()}.jsonl")
+
+    def _gz_path(self, day):
+        return self._plain_path(day) + ".gz"
+
+    def _iter_gz_lines(self, day):
+        with gzip.open(self._gz_path(day), 'rb') as f:
+            yield from f
+
+    def _tail_gz(self, day, limit, cursor=None):
+        """압축된 세그먼트용 tail_journal (하루치만 풀어 읽고, 위치는 압축 전 바이트 위치)"""
+        lines = []
+        pos = 0
+        for line in self._iter_gz_lines(day):
+            if cursor is not None and pos + len(line) > cursor:
+                break
+            if line.strip():
+                lines.append((pos, line))
+            pos += len(line)
+        page = lines[-limit:] if limit > 0 else []
+        orders = [json.loads(line) for _, line in reversed(page)]
+        start = page[0][0] if page else (cursor or 0)
+        return orders, (start if start > 0 else None)
+
+    def _compress(self, day):
+        """세그먼트를 gzip 으로 압축하고 원본 삭제 (압축 파일을 다 쓴 뒤에 교체)"""
+        plain_path = self._plain_path(day)
+        if not os.path.exists(plain_path):
+            return
+        tmp_path = self._gz_path(day) + ".tmp"
+        with open(plain_path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, self._gz_path(day))
+        os.remove(plain_path)
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_file):
+            return {"segments": {}}
+        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp_file = self.manifest_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
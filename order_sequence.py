@@ -0,0 +1,80 @@
+"""주문번호 발급기
+
+마지막으로 발급한 번호를 작은 파일(order_sequence.json)에 따로 저장해 두고
+발급할 때마다 1 증가시킨다. 주문 목록 크기와 무관하게 일정한 시간이 걸린다.
+
+- 번호는 파일에 fsync 로 기록된 뒤에 반환되므로, 발급 후 주문 저장 전에 종료되어도
+  같은 번호가 다시 발급되지 않는다 (그 번호는 비어 있는 번호로 남는다).
+- 파일 잠금으로 같은 디렉터리를 쓰는 여러 키오스크 프로세스가 겹치지 않는 번호를 받는다.
+- daily_reset=True 이면 날짜가 바뀐 뒤 첫 발급 때 1번부터 다시 시작한다 (픽업 번호).
+"""
+import json
+import os
+from datetime import datetime
+
+from file_lock import FileLock
+
+SEQUENCE_FILE = "order_sequence.json"
+
+
+class OrderNumberAllocator:
+    """주문번호 발급 클래스"""
+    def __init__(self, sequence_file=SEQUENCE_FILE, daily_reset=False):
+        self.sequence_file = sequence_file
+        self.daily_reset = daily_reset
+        self.lock = FileLock(sequence_file + ".lock")
+
+        # 저장된 번호가 없으면 OrderManager 가 기존 주문으로 seed 한다
+        self.is_new = not os.path.exists(sequence_file)
+
+    def allocate(self):
+        """다음 주문번호 발급"""
+        with self.lock:
+            state = self._read()
+            today = datetime.now().date().isoformat()
+            if self.daily_reset and state["date"] != today:
+                state["last"] = 0
+            state["last"] += 1
+            state["date"] = today
+            self._write(state)
+        return state["last"]
+
+    def peek(self):
+        """다음에 발급될 번호 (발급하지 않음)"""
+        state = self._read()
+        if self.daily_reset and state["date"] != datetime.now().date().isoformat():
+            return 1
+        return state["last"] + 1
+
+    def seed(self, orders):
+        """
+        기존 주문 기준으로 마지막 번호 설정 (최초 1회)
+
+        daily_reset 이면 오늘 주문만, 아니면 전체 주문의 최대 번호를 사용한다.
+        """
+        today = datetime.now().date()
+        numbers = [
+            order.get('order_number', 0) for order in orders
+            if not self.daily_reset
+            or datetime.fromisoformat(order["timestamp"]).date() == today
+        ]
+        with self.lock:
+            state = self._read()
+            state["last"] = max([state["last"], *numbers])
+            state["date"] = today.isoformat()
+            self._write(state)
+        self.is_new = False
+
+    def _read(self):
+        if not os.path.exists(self.sequence_file):
+            return {"date": None, "last": 0}
+        with open(self.sequence_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, state):
+        tmp_file = self.sequence_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.sequence_file)
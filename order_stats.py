@@ -0,0 +1,153 @@
+"""매출 집계
+
+save_order 때마다 전체/일별/시간대별 합계를 바로 갱신하고 파일로 저장한다.
+관리자 패널은 주문 목록을 다시 훑지 않고 이 집계만 읽는다.
+
+저장 구조 (stats_dir 아래)
+- totals.json      : 전체 주문 수/매출
+- YYYY-MM-DD.json  : 해당 날짜 주문 수/매출 + 24시간 시간대별 주문 수/매출
+
+주문 1건마다 크기가 일정한 파일 두 개만 다시 쓰므로 운영 기간과 무관하게 비용이 같다.
+여러 키오스크 프로세스가 같은 stats_dir 을 쓸 수 있도록 갱신은 파일 잠금 안에서
+파일의 최신 값을 다시 읽어 더한다.
+
+집계는 저장된 주문을 뒤따라 읽는다. totals.json 에 어디까지 반영했는지(mark: 저널 위치 등)를 함께
+기록하고, sync() 때 저장소의 read_since(mark) 로 그 뒤의 주문만 더한다. 주문 저장과 집계 사이에
+종료되어도 다음 sync()(시작 시 포함)가 빠진 주문을 채운다. 날짜 파일에도 mark 를 남겨,
+날짜 파일만 쓰고 totals.json 을 쓰기 전에 종료된 경우 같은 주문을 두 번 더하지 않는다.
+파일은 fsync 후 교체한다.
+"""
+import json
+import os
+from datetime import datetime
+
+from file_lock import FileLock
+
+STATS_DIR = "order_stats"
+
+
+def _write_json(path, data):
+    """임시 파일에 쓴 뒤 교체 (쓰는 도중 종료되어도 이전 내용이 남음)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _empty_day():
+    return {
+        "orders": 0,
+        "revenue": 0,
+        "hourly_orders": [0] * 24,
+        "hourly_revenue": [0] * 24,
+    }
+
+
+class SalesAggregator:
+    """전체/일별/시간대별 매출 누적 집계 클래스"""
+    def __init__(self, stats_dir=STATS_DIR):
+        self.stats_dir = stats_dir
+        self.totals_file = os.path.join(stats_dir, "totals.json")
+        os.makedirs(stats_dir, exist_ok=True)
+        self.lock = FileLock(os.path.join(stats_dir, "stats.lock"))
+        self.totals = self._read_totals()
+
+        # 저장된 집계가 없거나 mark 가 없는 이전 형식이면 OrderManager 가 기존 주문으로 rebuild 한다
+        self.is_new = not os.path.exists(self.totals_file) or "mark" not in self.totals
+
+        # 지난 날짜 집계 캐시 (오늘 집계는 다른 프로세스가 바꿀 수 있어 매번 파일에서 읽음)
+        self._days = {}
+
+    def sync(self, read_since):
+        """
+        저장소에서 아직 반영하지 않은 주문을 읽어 집계에 더함 (잠금 1회, 날짜별 파일 1회씩 기록)
+
+        Args:
+            read_since: mark -> (end_mark, [(order, position) ...]) 를 반환하는 저장소 함수
+                        (OrderManager.read_since). position 은 그 주문까지 읽었을 때의 mark
+
+        Returns:
+            int: 새로 반영한 주문 수
+        """
+        with self.lock:
+            self.totals = self._read_totals()
+            mark = self.totals.get("mark")
+            end_mark, orders = read_since(mark)
+            added = 0
+            days = {}
+            for order, position in orders:
+                order_time = datetime.fromisoformat(order["timestamp"])
+                total = order.get("total", 0)
+                date = order_time.date()
+                if date not in days:
+                    days[date] = self._read_day(date)
+                day = days[date]
+                # 이전 sync 가 날짜 파일까지만 쓰고 종료된 경우 날짜 파일에는 이미 반영됨
+                if day.get("mark") is None or position > day["mark"]:
+                    day["orders"] += 1
+                    day["revenue"] += total
+                    day["hourly_orders"][order_time.hour] += 1
+                    day["hourly_revenue"][order_time.hour] += total
+                self.totals["orders"] += 1
+                self.totals["revenue"] += total
+                added += 1
+            if end_mark == mark:
+                return added
+
+            # 날짜 파일을 먼저, totals.json(mark)을 마지막에 기록
+            for date, day in days.items():
+                day["mark"] = end_mark
+                _write_json(self._day_file(date), day)
+            self.totals["mark"] = end_mark
+            _write_json(self.totals_file, self.totals)
+        for date in days:
+            self._days.pop(date, None)
+        return added
+
+    def rebuild(self, read_since):
+        """저장된 집계를 지우고 전체 주문으로 처음부터 다시 계산 (최초 1회 또는 복구용)"""
+        with self.lock:
+            for name in os.listdir(self.stats_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.stats_dir, name))
+        self._days = {}
+        self.sync(read_since)
+        self.is_new = False
+
+    def get_day(self, date):
+        """해당 날짜 집계 (주문 수, 매출, 시간대별 주문 수/매출)"""
+        if date in self._days:
+            return self._days[date]
+        day = self._read_day(date)
+        if date < datetime.now().date():
+            self._days[date] = day
+        return day
+
+    def get_order_stats(self, day=None):
+        """전체/오늘 주문 수와 매출 (OrderManager.get_order_stats 와 같은 형식)"""
+        today = self.get_day(day or datetime.now().date())
+        self.totals = self._read_totals()
+        return {
+            "total_orders": self.totals["orders"],
+            "total_revenue": self.totals["revenue"],
+            "today_orders": today["orders"],
+            "today_revenue": today["revenue"],
+        }
+
+    def _day_file(self, date):
+        return os.path.join(self.stats_dir, f"{date.isoformat()}.json")
+
+    def _read_totals(self):
+        if not os.path.exists(self.totals_file):
+            return {"orders": 0, "revenue": 0, "mark": None}
+        with open(self.totals_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_day(self, date):
+        day_file = self._day_file(date)
+        if not os.path.exists(day_file):
+            return _empty_day()
+        with open(day_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
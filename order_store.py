@@ -0,0 +1,579 @@
+"""주문 데이터 저장소
+
+- "json"    : orders.json 에 주문 배열 전체를 다시 저장 (기존 방식)
+- "journal" : orders.jsonl 에 주문 1건을 한 줄로 이어 붙이는 append-only 저널
+- "shared"  : journal + 파일 잠금. 같은 디렉터리를 여러 키오스크 프로세스가 함께 사용
+- "daily"   : 날짜별 세그먼트 저널 (order_segments.py). 시작 시 오늘 주문만 읽고
+              지난 날짜는 보고서가 요청할 때 읽음, 오래된 세그먼트는 gzip 압축
+"""
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+from file_lock import FileLock
+from order_sequence import SEQUENCE_FILE, OrderNumberAllocator
+
+JSON_FILE = "orders.json"
+JOURNAL_FILE = "orders.jsonl"
+STORAGE_TYPES = ("json", "journal", "shared", "daily")
+
+# 저장을 다시 시도할 때 이미 기록된 주문인지 확인하려고 더 읽는 최근 주문 수
+RETRY_SCAN = 1000
+
+
+def read_journal(journal_file):
+    """
+    저널 파일을 읽어 주문 리스트로 반환
+
+    저장 도중 프로그램이 종료되어 마지막 줄이 잘린 경우, 잘린 부분은 버리고
+    파일도 마지막 정상 줄까지 잘라 다음 추가가 이어 붙지 않도록 한다.
+    줄바꿈으로 끝났지만 JSON 이 아닌 줄은 건너뛴다.
+
+    Args:
+        journal_file (str): 저널 파일 경로
+
+    Returns:
+        list: 주문 리스트
+    """
+    orders = []
+    if not os.path.exists(journal_file):
+        return orders
+
+    valid_size = 0
+    with open(journal_file, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid_size += len(line)
+            if line.strip():
+                try:
+                    orders.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    if valid_size < os.path.getsize(journal_file):
+        with open(journal_file, 'r+b') as f:
+            f.truncate(valid_size)
+    return orders
+
+
+def iter_journal(journal_file):
+    """
+    저널의 주문을 앞에서부터 한 줄씩 읽어 반환 (전체를 메모리에 올리지 않음)
+
+    read_journal 과 달리 파일을 고치지 않으며, 줄바꿈이 없는 마지막 줄과 JSON 이 아닌 줄은 건너뛴다.
+    """
+    if not os.path.exists(journal_file):
+        return
+    with open(journal_file, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n") or not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def journal_end(journal_file, block_size=65536):
+    """저널에서 마지막 완전한 줄(줄바꿈으로 끝나는 줄)이 끝나는 위치, 쓰는 중인 마지막 줄은 제외"""
+    if not os.path.exists(journal_file):
+        return 0
+    with open(journal_file, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            size = min(block_size, pos)
+            f.seek(pos - size)
+            idx = f.read(size).rfind(b"\n")
+            if idx != -1:
+                return pos - size + idx + 1
+            pos -= size
+    return 0
+
+
+def iter_journal_from(journal_file, start=0, end=None):
+    """
+    저널의 start ~ end 바이트 구간 주문을 (주문, 그 줄이 끝나는 위치) 로 하나씩 반환
+
+    iter_journal 처럼 파일을 고치지 않으며 줄바꿈이 없는 줄과 JSON 이 아닌 줄은 건너뛴다.
+    end 가 None 이면 파일 끝까지.
+    """
+    if not os.path.exists(journal_file):
+        return
+    with open(journal_file, 'rb') as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if end is not None and pos + len(line) > end:
+                return
+            pos += len(line)
+            if not line.endswith(b"\n") or not line.strip():
+                continue
+            try:
+                yield json.loads(line), pos
+            except json.JSONDecodeError:
+                continue
+
+
+def tail_journal(journal_file, limit, cursor=None, block_size=65536):
+    """
+    저널 끝에서부터 거꾸로 읽어 최근 주문 limit 건 반환
+
+    파일 전체가 아니라 필요한 만큼의 블록만 끝에서부터 읽으므로
+    메모리/시간이 전체 주문 수가 아니라 limit 에 비례한다.
+    아직 쓰는 중인(줄바꿈이 없는) 마지막 줄은 건너뛴다.
+
+    Args:
+        journal_file (str): 저널 파일 경로
+        limit (int): 가져올 주문 수
+        cursor (int): 이전 호출이 돌려준 위치 (이 위치 이전의 주문을 가져옴), None 이면 파일 끝
+        block_size (int): 한 번에 읽는 바이트 수
+
+    Returns:
+        tuple: (orders: 최신 순 주문 리스트, cursor: 다음 페이지 위치, 더 없으면 None)
+    """
+    if not os.path.exists(journal_file):
+        return [], None
+
+    orders = []
+    with open(journal_file, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END) if cursor is None else cursor
+        buf = b""
+
+        def read_block():
+            nonlocal pos, buf
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            buf = f.read(size) + buf
+
+        # 파일 끝에 줄바꿈 없이 남은 부분(쓰는 중인 줄)은 제외
+        if cursor is None:
+            while b"\n" not in buf and pos > 0:
+                read_block()
+            buf = buf[:buf.rfind(b"\n") + 1]
+        end = pos + len(buf)
+
+        while len(orders) < limit and end > 0:
+            # buf 의 마지막 줄 시작 위치 찾기 (없으면 블록을 더 읽음)
+            idx = buf.rfind(b"\n", 0, len(buf) - 1)
+            if idx == -1 and pos > 0:
+                read_block()
+                continue
+            line = buf[idx + 1:]
+            buf = buf[:idx + 1]
+            end -= len(line)
+            if line.strip():
+                try:
+                    orders.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    return orders, (end if end > 0 else None)
+
+
+def append_journal(journal_file, orders, lock=None):
+    """
+    주문들을 저널 끝에 추가 (파일 크기와 무관하게 주문 수만큼의 줄만 기록, fsync 1회)
+
+    Args:
+        journal_file (str): 저널 파일 경로
+        orders (list): 주문 정보 리스트
+        lock (FileLock): 여러 프로세스가 같은 저널을 쓸 때의 잠금 (없으면 잠그지 않음)
+    """
+    data = "".join(json.dumps(order, ensure_ascii=False) + "\n" for order in orders).encode('utf-8')
+    with open(journal_file, 'a+b') as f:
+        if lock is None:
+            f.write(data)
+            f.flush()
+        else:
+            # 잠금 구간은 쓰기만 (fsync 는 잠금 해제 후)
+            with lock:
+                # 다른 프로세스가 쓰다가 종료되어 줄바꿈 없이 끝났으면 새 줄에서 시작
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+        os.fsync(f.fileno())
+
+
+def migrate_json_to_journal(json_file=JSON_FILE, journal_file=JOURNAL_FILE):
+    """
+    기존 orders.json(배열) 을 저널 형식으로 1회 변환
+
+    저널이 이미 있으면 아무 것도 하지 않는다. 원본 orders.json 은 그대로 둔다.
+
+    Returns:
+        int: 변환된 주문 수
+    """
+    if os.path.exists(journal_file) or not os.path.exists(json_file):
+        return 0
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        orders = json.load(f)
+
+    # 임시 파일에 모두 쓴 뒤 교체 (변환 도중 종료되어도 반쪽짜리 저널이 남지 않음)
+    tmp_file = journal_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        for order in orders:
+            f.write(json.dumps(order, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, journal_file)
+    return len(orders)
+
+
+class OrderManager:
+    """주문 데이터 관리 클래스"""
+    def __init__(self, storage="json", orders_file=None, aggregator=None, allocator=None,
+                 compress_after_days=7, compact=False, catalog=None):
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"지원하지 않는 저장 방식입니다: {storage}")
+        self.storage = storage
+        self.lock = None
+        self.segments = None
+
+        # compact=True 면 orders 를 CompactOrderList(__slots__ 레코드)로 보관 (order_model.py)
+        self.compact = compact
+        self.catalog = catalog
+
+        # 전체 주문은 처음 필요할 때 불러옴 (orders 프로퍼티, preload)
+        self._orders = None
+        self._load_lock = threading.RLock()
+
+        if storage == "json":
+            self.orders_file = orders_file or JSON_FILE
+        elif storage == "daily":
+            from order_segments import SEGMENTS_DIR, SegmentStore
+
+            # orders_file 은 세그먼트 디렉터리
+            self.orders_file = orders_file or SEGMENTS_DIR
+            self.segments = SegmentStore(self.orders_file, compress_after_days)
+            data_dir = os.path.dirname(os.path.abspath(self.orders_file))
+            if self.segments.is_new:
+                legacy_file = os.path.join(data_dir, JOURNAL_FILE)
+                json_file = os.path.join(data_dir, JSON_FILE)
+                with self.segments.lock:
+                    # orders.json 만 있으면 orders.jsonl 을 거쳐 옮김 (다른 프로세스가 이미 옮겼으면 건너뜀)
+                    intermediate = (
+                        not os.path.exists(self.segments.manifest_file)
+                        and not os.path.exists(legacy_file)
+                        and os.path.exists(json_file)
+                    )
+                    if intermediate:
+                        migrate_json_to_journal(json_file, legacy_file)
+                self.segments.migrate_journal(legacy_file)
+                # 옮기려고 만든 orders.jsonl 은 세그먼트로 옮긴 뒤 삭제 (원래 있던 저널은 그대로 둠)
+                if intermediate:
+                    os.remove(legacy_file)
+            self.segments.rotate()
+            if allocator is None:
+                allocator = OrderNumberAllocator(os.path.join(data_dir, SEQUENCE_FILE))
+        else:
+            self.orders_file = orders_file or JOURNAL_FILE
+            data_dir = os.path.dirname(self.orders_file)
+            legacy_file = os.path.join(data_dir, JSON_FILE)
+            if storage == "journal":
+                migrate_json_to_journal(legacy_file, self.orders_file)
+            else:
+                self.lock = FileLock(self.orders_file + ".lock")
+                with self.lock:
+                    migrate_json_to_journal(legacy_file, self.orders_file)
+                # 여러 프로세스가 max(order_number) 로 번호를 만들면 중복되므로 발급기는 필수
+                if allocator is None:
+                    allocator = OrderNumberAllocator(os.path.join(data_dir, SEQUENCE_FILE))
+
+        # 매출 집계 (save_order 마다 갱신, 저장된 집계가 없으면 기존 주문으로 1회 계산)
+        # 집계 뒤에 저장된 주문이 있으면(저장 후 집계 전에 종료된 경우) 시작할 때 채움
+        self.aggregator = aggregator
+        if aggregator is not None:
+            if aggregator.is_new:
+                aggregator.rebuild(self.read_since)
+            else:
+                aggregator.sync(self.read_since)
+
+        # 주문번호 발급기 (저장된 번호가 없으면 기존 주문으로 1회 설정)
+        self.allocator = allocator
+        if allocator is not None and allocator.is_new:
+            allocator.seed(self.iter_orders())
+
+    @property
+    def orders(self):
+        """전체 주문 리스트 (daily 는 오늘 주문만). 처음 접근할 때 불러온다"""
+        if self._orders is None:
+            with self._load_lock:
+                if self._orders is None:
+                    self.load_orders()
+        return self._orders
+
+    @orders.setter
+    def orders(self, orders):
+        self._orders = orders
+
+    def preload(self):
+        """전체 주문을 백그라운드 스레드에서 미리 불러오기"""
+        thread = threading.Thread(target=lambda: self.orders, name="order-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def load_orders(self):
+        """저장된 주문 불러오기 (daily 는 오늘 세그먼트만)"""
+        if self.storage == "daily":
+            orders = self.segments.read_segment(self.segments.today())
+        elif self.storage == "shared":
+            with self.lock:
+                orders = read_journal(self.orders_file)
+        elif self.storage == "journal":
+            orders = read_journal(self.orders_file)
+        elif os.path.exists(self.orders_file):
+            with open(self.orders_file, 'r', encoding='utf-8') as f:
+                orders = json.load(f)
+        else:
+            orders = []
+        with self._load_lock:
+            self.orders = self._wrap(orders)
+
+    def save_order(self, order_data):
+        """새 주문 저장"""
+        self.save_orders([order_data])
+
+    def save_orders(self, orders):
+        """주문 여러 건을 한 번에 저장 (저널은 fsync 1회로 함께 기록) 후 집계 반영"""
+        self.append_orders(orders)
+        self.sync_stats()
+
+    def append_orders(self, orders, retry=False):
+        """
+        주문 기록 (집계는 sync_stats)
+
+        Args:
+            orders (list): 주문 정보 리스트
+            retry (bool): 이전 시도가 실패한 같은 배치를 다시 기록. 저널에 쓴 뒤 fsync 에서 실패한 경우처럼
+                          이미 기록된 주문은 다시 쓰지 않는다 (최근 주문의 주문번호+시각으로 비교)
+        """
+        pending = self._unsaved(orders) if retry else orders
+        if self.storage == "daily":
+            with self._load_lock:
+                # 날짜가 바뀌었으면 메모리에는 새 날짜 주문만 남김
+                if self.segments.today() != self.segments.registered_day:
+                    self.segments.rotate()
+                    if self._orders is not None:
+                        self._orders = self._wrap([])
+                if pending:
+                    self.segments.append(pending)
+                # 아직 불러오지 않았으면 나중에 파일에서 함께 읽힘
+                if self._orders is not None:
+                    self._orders.extend(orders)
+        elif self.storage in ("journal", "shared"):
+            with self._load_lock:
+                if pending:
+                    append_journal(self.orders_file, pending, self.lock)
+                if self._orders is not None:
+                    self._orders.extend(orders)
+        else:
+            # 파일에 쓴 뒤에 메모리에 추가 (실패 후 다시 시도해도 두 번 들어가지 않음)
+            with open(self.orders_file, 'w', encoding='utf-8') as f:
+                json.dump([*self.orders, *orders], f, ensure_ascii=False, indent=2)
+            self.orders.extend(orders)
+
+    def sync_stats(self):
+        """기록된 주문 중 아직 집계에 반영되지 않은 주문 반영 (여러 번 호출해도 한 번만 더해짐)"""
+        if self.aggregator is not None:
+            self.aggregator.sync(self.read_since)
+
+    def _unsaved(self, orders):
+        """orders 중 아직 저장되지 않은 주문 (최근 주문만 확인, 다른 프로세스가 그 사이 저장한 몫도 고려)"""
+        if self.storage not in ("journal", "shared", "daily"):
+            return orders
+        saved = {
+            (order.get("order_number"), order.get("timestamp"))
+            for order in self.get_recent_orders(len(orders) + RETRY_SCAN)
+        }
+        return [order for order in orders if (order.get("order_number"), order.get("timestamp")) not in saved]
+
+    def read_since(self, mark=None):
+        """
+        mark 뒤에 저장된 주문 (SalesAggregator.sync 용)
+
+        mark 는 journal/shared 는 저널 바이트 위치, daily 는 [날짜, 세그먼트 안 위치], json 은 주문 수.
+
+        Returns:
+            tuple: (end_mark: 지금까지 저장된 끝 위치, [(주문, 그 주문까지의 mark) ...] 를 하나씩 반환하는 iterator)
+        """
+        if self.storage == "daily":
+            return self.segments.read_since(mark)
+        if self.storage in ("journal", "shared"):
+            end = journal_end(self.orders_file)
+            return end, iter_journal_from(self.orders_file, mark or 0, end)
+        orders = self.orders
+        start = mark or 0
+        return len(orders), ((order, i + 1) for i, order in enumerate(orders[start:], start))
+
+    def _wrap(self, orders):
+        if not self.compact:
+            return orders
+        from order_model import CompactOrderList, MenuCatalog
+
+        if self.catalog is None:
+            self.catalog = MenuCatalog()
+        return CompactOrderList(orders, self.catalog)
+
+    def get_next_order_number(self):
+        """다음 주문번호 생성"""
+        if self.allocator is not None:
+            return self.allocator.allocate()
+        if self._orders is None and self.storage in ("journal", "shared"):
+            # 전체를 불러오지 않고 저널 마지막 주문 번호로 계산
+            last_orders = tail_journal(self.orders_file, 1)[0]
+            return last_orders[0].get('order_number', 0) + 1 if last_orders else 1
+        if not self.orders:
+            return 1
+        return max([order.get('order_number', 0) for order in self.orders]) + 1
+
+    def iter_orders(self, start=None, end=None):
+        """
+        주문을 오래된 순으로 하나씩 반환 (daily 는 start ~ end 날짜 세그먼트만 필요할 때 읽음)
+
+        Args:
+            start (date): 시작 날짜 (포함), None 이면 처음부터
+            end (date): 끝 날짜 (포함), None 이면 끝까지
+        """
+        if self.storage == "daily":
+            yield from self.segments.iter_orders(start, end)
+            return
+        if self._orders is None and self.storage in ("journal", "shared"):
+            # 아직 불러오지 않았으면 메모리에 올리지 않고 파일에서 한 줄씩 읽음
+            orders = iter_journal(self.orders_file)
+        else:
+            orders = self.orders
+        for order in orders:
+            if start or end:
+                order_date = datetime.fromisoformat(order["timestamp"]).date()
+                if (start and order_date < start) or (end and order_date > end):
+                    continue
+            yield order
+
+    def get_orders_by_date(self, day):
+        """해당 날짜 주문 리스트"""
+        return list(self.iter_orders(day, day))
+
+    def get_recent_orders(self, limit=20):
+        """최근 주문 limit 건 (최신 순)"""
+        return self.get_orders_page(limit)[0]
+
+    def get_orders_page(self, limit=20, cursor=None):
+        """
+        최근 주문부터 limit 건씩 거꾸로 페이지 조회
+
+        저널 모드는 파일 끝에서부터 필요한 만큼만 읽는다 (다른 프로세스가 저장한 주문 포함).
+
+        Args:
+            limit (int): 한 페이지 주문 수
+            cursor: 이전 페이지가 돌려준 cursor, None 이면 가장 최근부터
+
+        Returns:
+            tuple: (orders: 최신 순 주문 리스트, cursor: 다음(더 오래된) 페이지 cursor, 없으면 None)
+        """
+        if self.storage == "daily":
+            return self.segments.tail(limit, cursor)
+        if self.storage in ("journal", "shared"):
+            return tail_journal(self.orders_file, limit, cursor)
+        end = len(self.orders) if cursor is None else cursor
+        start = max(end - limit, 0)
+        return list(reversed(self.orders[start:end])), (start if start > 0 else None)
+
+    def get_order_stats(self, day=None):
+        """전체/오늘 주문 수와 매출"""
+        if self.aggregator is not None:
+            return self.aggregator.get_order_stats(day)
+        day = day or datetime.now().date()
+        if self.storage == "daily":
+            # 지난 날짜는 manifest 합계, 해당 날짜는 그 날 세그먼트만 읽음
+            closed = self.segments.get_closed_stats()
+            current = self.segments.read_segment(self.segments.today())
+            today_orders = current if day == self.segments.today() else self.get_orders_by_date(day)
+            return {
+                "total_orders": closed["orders"] + len(current),
+                "total_revenue": closed["revenue"] + sum(order.get("total", 0) for order in current),
+                "today_orders": len(today_orders),
+                "today_revenue": sum(order.get("total", 0) for order in today_orders),
+            }
+        # 주문을 한 번 훑으며 계산 (저널을 아직 불러오지 않았으면 한 줄씩 읽음)
+        stats = {"total_orders": 0, "total_revenue": 0, "today_orders": 0, "today_revenue": 0}
+        for order in self.iter_orders():
+            stats["total_orders"] += 1
+            stats["total_revenue"] += order.get("total", 0)
+            if datetime.fromisoformat(order["timestamp"]).date() == day:
+                stats["today_orders"] += 1
+                stats["today_revenue"] += order.get("total", 0)
+        return stats
+
+
+def _stress_worker(data_dir, worker_id, count):
+    """스트레스 테스트용: 한 프로세스에서 주문 count 건 저장"""
+    from order_stats import SalesAggregator
+
+    manager = OrderManager(
+        storage="shared",
+        orders_file=os.path.join(data_dir, JOURNAL_FILE),
+        aggregator=SalesAggregator(os.path.join(data_dir, "order_stats")),
+    )
+    for i in range(count):
+        manager.save_order({
+            "order_number": manager.get_next_order_number(),
+            "timestamp": datetime.now().isoformat(),
+            "order_type": "매장",
+            "items": [{"name": "콜라", "price": 3000, "quantity": 1, "image": "🥤"}],
+            "total": 3000,
+            "kiosk": worker_id,
+            "seq": i,
+        })
+
+
+def stress_test(processes=4, orders_per_process=200):
+    """
+    여러 프로세스가 shared 저장소에 동시에 주문을 저장한 뒤 유실/중복이 없는지 확인
+
+    Returns:
+        bool: 모든 주문이 한 번씩 저장되고 주문번호가 겹치지 않으면 True
+    """
+    import multiprocessing
+    import tempfile
+    import time
+    from order_stats import SalesAggregator
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # 발급기/집계를 미리 만들어 두어 각 프로세스가 초기화를 겹쳐 하지 않게 함
+        _stress_worker(data_dir, -1, 0)
+
+        started = time.perf_counter()
+        workers = [
+            multiprocessing.Process(target=_stress_worker, args=(data_dir, worker_id, orders_per_process))
+            for worker_id in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        orders = read_journal(os.path.join(data_dir, JOURNAL_FILE))
+        expected = processes * orders_per_process
+        keys = {(order["kiosk"], order["seq"]) for order in orders}
+        numbers = {order["order_number"] for order in orders}
+        stats = SalesAggregator(os.path.join(data_dir, "order_stats")).get_order_stats()
+
+        print(f"프로세스 {processes}개 x 주문 {orders_per_process}건: {elapsed:.2f}초 ({expected / elapsed:.0f}건/초)")
+        print(f"저장된 주문 {len(orders)} / 고유 주문 {len(keys)} / 고유 주문번호 {len(numbers)} / 집계 {stats['total_orders']} (기대값 {expected})")
+        return len(orders) == len(keys) == len(numbers) == stats["total_orders"] == expected
+
+
+if __name__ == "__main__":
+    # 사용법: python order_store.py [프로세스 수] [프로세스당 주문 수]
+    ok = stress_test(*[int(arg) for arg in sys.argv[1:3]])
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
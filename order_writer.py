@@ -0,0 +1,193 @@
+"""주문 저장 write-behind
+
+Flet 클릭 핸들러에서 디스크 쓰기를 기다리지 않도록, 주문을 제한된 크기의 큐에 넣고
+백그라운드 스레드가 모아서 저장한다 (group commit: 여러 주문을 fsync 1회로 기록).
+
+저장 정책
+- interval_ms=0 : 주문이 들어오는 대로 저장 (그 사이 쌓인 주문은 함께 기록)
+- interval_ms=N : 첫 주문 후 N ms 동안 들어온 주문을 모아 한 번에 기록
+
+프로그램 종료 시(atexit) close() 가 호출되어 큐에 남은 주문을 기록한다. 저장이 계속 실패하면
+CLOSE_TIMEOUT 초까지만 기다리고 기록하지 못한 주문 수를 알린 뒤 종료한다 (키오스크 종료가 막히지 않음).
+
+저장에 실패하면 실패한 단계만 다시 시도한다: 주문 기록(append_orders)이 실패했으면 이미 기록된 주문을
+빼고 다시 쓰고, 기록 후 집계(sync_stats)만 실패했으면 집계만 다시 한다. 같은 주문이 두 번 기록되지 않는다.
+재시도는 지수 백오프로 max_retries 번까지. 그래도 기록하지 못한 배치는 failed 에 남기고 다음 주문을 저장한다
+(디스크가 가득 찬 경우 등). 집계만 실패한 경우는 주문이 이미 기록되어 있어 다음 저장 때 집계가 따라잡는다.
+
+order_manager 에는 주문번호 발급기(allocator)가 있어야 한다. 없으면 get_next_order_number() 가
+저널 끝이나 메모리의 주문으로 번호를 만드는데, 큐에서 아직 기록되지 않은 주문은 보이지 않아
+같은 번호가 다시 발급된다.
+"""
+import atexit
+import queue
+import sys
+import threading
+import time
+import traceback
+
+# 프로그램 종료 시 남은 주문 기록을 기다리는 최대 시간(초)
+CLOSE_TIMEOUT = 5
+
+
+class WriteBehindWriter:
+    """
+    OrderManager.save_orders 를 백그라운드에서 호출하는 클래스
+
+    Args:
+        order_manager: append_orders(list, retry) / sync_stats() 를 가진 주문 저장소 (allocator 필수)
+        interval_ms (int): 모아서 저장할 시간(ms), 0 이면 주문마다 저장
+        max_batch (int): 한 번에 저장할 최대 주문 수
+        max_queue (int): 큐 최대 크기 (가득 차면 save_order 가 자리가 날 때까지 대기)
+        max_retries (int): 단계별 최대 재시도 횟수
+        base_delay (float): 첫 재시도 대기 시간(초), 이후 2배씩
+        max_delay (float): 최대 재시도 대기 시간(초)
+    """
+    def __init__(self, order_manager, interval_ms=0, max_batch=100, max_queue=1000,
+                 max_retries=5, base_delay=0.5, max_delay=10):
+        self.order_manager = order_manager
+        self.interval = interval_ms / 1000
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # 통계 (group commit 효과 확인용)
+        self.saved_orders = 0
+        self.commits = 0
+
+        # 재시도해도 기록하지 못한 주문, 마지막 오류
+        self.failed = []
+        self.last_error = None
+
+        # 큐에 들어왔지만 아직 기록되지도 포기되지도 않은 주문 수
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        # close(timeout) 이 기다리다 포기하면 설정 (재시도 대기를 끝내고 스레드 종료)
+        self._abandon = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close, CLOSE_TIMEOUT)
+
+    @property
+    def unsaved(self):
+        """기록되지 않은 주문 수 (대기 중 + 포기한 주문)"""
+        with self._pending_lock:
+            return self._pending + len(self.failed)
+
+    def save_order(self, order_data):
+        """주문을 저장 큐에 넣고 바로 반환"""
+        if self._closed:
+            raise RuntimeError("이미 종료된 저장기입니다.")
+        with self._pending_lock:
+            self._pending += 1
+        self.queue.put(order_data)
+
+    def flush(self, timeout=None):
+        """
+        큐에 들어온 주문이 모두 기록될 때까지 대기
+
+        Returns:
+            bool: timeout 안에 모두 기록되었으면 True
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """
+        남은 주문을 기록하고 스레드 종료
+
+        Args:
+            timeout (float): 기다릴 최대 시간(초), None 이면 모두 기록(또는 포기)될 때까지
+
+        Returns:
+            int: 기록하지 못한 주문 수
+        """
+        if not self._closed:
+            self._closed = True
+            atexit.unregister(self.close)
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._abandon.set()
+        unsaved = self.unsaved
+        if unsaved:
+            print(f"주문 {unsaved}건을 저장하지 못했습니다: {self.last_error}", file=sys.stderr)
+        return unsaved
+
+    def _run(self):
+        while not self._abandon.is_set():
+            first = self.queue.get()
+            if first is None:
+                self.queue.task_done()
+                return
+            batch = [first]
+            stop = self._collect(batch)
+            self._commit(batch)
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                self.queue.task_done()
+                return
+
+    def _collect(self, batch):
+        """배치에 주문을 더 모음. 종료 신호를 받으면 True"""
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    order_data = self.queue.get(timeout=remaining)
+                else:
+                    order_data = self.queue.get_nowait()
+            except queue.Empty:
+                return False
+            if order_data is None:
+                return True
+            batch.append(order_data)
+        return False
+
+    def _commit(self, batch):
+        """배치 저장. 실패하면 실패한 단계만 백오프하며 max_retries 번까지 다시 시도"""
+        written = self._retry(lambda retry: self.order_manager.append_orders(batch, retry=retry))
+        with self._pending_lock:
+            self._pending -= len(batch)
+            if not written:
+                self.failed.extend(batch)
+                return
+        self.saved_orders += len(batch)
+        self.commits += 1
+        # 집계는 주문 저널을 뒤따라 읽으므로 여기서 포기해도 다음 저장 때 따라잡음
+        self._retry(lambda retry: self.order_manager.sync_stats())
+
+    def _retry(self, step):
+        """
+        step(retry) 를 성공할 때까지 다시 시도 (첫 실패와 포기할 때만 오류 출력)
+
+        Returns:
+            bool: 성공하면 True, max_retries 를 넘기거나 close 가 포기하면 False
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                step(attempt > 0)
+                return True
+            except Exception as e:
+                self.last_error = e
+                if attempt == 0:
+                    traceback.print_exc()
+            delay = min(self.base_delay * 2 ** attempt, self.max_delay)
+            if attempt == self.max_retries or self._abandon.wait(delay):
+                break
+        print(f"주문 저장을 {attempt + 1}번 시도했지만 실패했습니다: {self.last_error}", file=sys.stderr)
+        return False
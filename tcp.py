@@ -1,17 +1,63 @@
 #tcp 통신 샘플
+import asyncio
 import socket
-import json
-import threading
+import queue
+import select
+import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
 import flet as ft
 
+from kitchen_health import HealthMonitor
+from kitchen_outbox import KitchenOutbox
+from kitchen_protocol import (
+    FrameError, encode_frame, hello_message, is_hello, is_pong, ping_message, read_message, read_frame,
+    recv_frame, recv_message, send_frame,
+)
+from update_scheduler import batched
+
+UNAVAILABLE_MESSAGE = "주방 연결이 끊겨 있어 전송을 미뤘습니다. 연결이 복구되면 다시 보냅니다."
+
+
 class TCPOrderSender:
-    """TCP 통신으로 주문 데이터를 전송하는 클래스"""
+    """TCP 통신으로 주문 데이터를 전송하는 클래스
+
+    keep_alive=True 면 연결을 끊지 않고 풀(pool)에 보관해 다음 주문에 재사용한다.
+    재사용 전에 서버가 끊은 연결(stale)인지 확인하고, 재사용한 연결이 실패하면
+    새 연결로 한 번 더 보낸다.
     
-    def __init__(self, server_host="localhost", server_port=9999, timeout=5):
+    wire_version=2 면 연결할 때 hello 로 v2 프레임(공백 없는 JSON, 큰 주문은 zlib 압축)을 협상한다.
+    서버가 v2 를 모르면 기존 숫자 헤더 프레임으로 보내고, 이후 연결은 협상하지 않는다.
+    
+    health 에 HealthMonitor 를 연결하면(kitchen_health.py) 주방이 끊긴 것으로 확인된 동안(open)
+    send_order / send_orders 가 timeout 을 기다리지 않고 바로 실패한다.
+    """
+    
+    def __init__(self, server_host="localhost", server_port=9999, timeout=5,
+                 keep_alive=False, pool_size=4, idle_timeout=60, wire_version=2):
         self.server_host = server_host
         self.server_port = server_port
         self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+        self.wire_version = wire_version
+        
+        # 협상 결과: 서버 프레임 버전(None 이면 아직 모름), zlib 압축 사용 여부
+        self.server_version = None
+        self.compress = False
+        
+        # 연결 상태 감시 (HealthMonitor 가 설정)
+        self.health = None
+        
+        # 유휴 연결 풀: (socket, 마지막 사용 시각)
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        
+        # 통계
+        self.connects = 0
+        self.reconnects = 0
     
     def send_order(self, order_data):
         """
@@ -23,52 +69,646 @@ class TCPOrderSender:
         Returns:
             tuple: (success: bool, message: str)
         """
+        if self.health is not None and not self.health.allow():
+            return False, UNAVAILABLE_MESSAGE
         try:
-            # 소켓 생성
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(self.timeout)
-                
-                # 서버 연결
-                sock.connect((self.server_host, self.server_port))
-                
-                # 주문 데이터를 JSON으로 변환
-                order_json = json.dumps(order_data, ensure_ascii=False, indent=2)
-                
-                # 데이터 길이를 먼저 전송 (헤더)
-                data_length = len(order_json.encode('utf-8'))
-                length_header = f"{data_length:010d}".encode('utf-8')
+            sock, reused = self._acquire()
+            try:
+                response = self._request(sock, order_data)
+            except (ConnectionError, socket.timeout, OSError):
+                self._discard(sock)
+                if not reused:
+                    raise
+                # 재사용한 연결이 그 사이 끊겼던 경우 새 연결로 한 번 더 전송
+                self.reconnects += 1
+                sock, _ = self._connect(), False
+                try:
+                    response = self._request(sock, order_data)
+                except BaseException:
+                    self._discard(sock)
+                    raise
+            self._release(sock)
+            self._link_ok()
+            return self._result(response)
                 
-                # 헤더 + 데이터 전송
-                sock.sendall(length_header)
-                sock.sendall(order_json.encode('utf-8'))
-                
-                # 서버 응답 받기
-                response_length = int(sock.recv(10).decode('utf-8'))
-                response_data = sock.recv(response_length).decode('utf-8')
-                response = json.loads(response_data)
-                
-                if response.get('status') == 'success':
-                    return True, response.get('message', '주문이 성공적으로 전송되었습니다.')
-                else:
-                    return False, response.get('message', '서버에서 오류가 발생했습니다.')
-                    
-        except socket.timeout:
+        except Exception as e:
+            self._link_failed(e)
+            return self._error_result(e)
+    
+    def send_orders(self, orders, window=32):
+        """
+        여러 주문을 한 연결로 파이프라이닝 전송 (응답을 기다리지 않고 window 건까지 먼저 보냄)
+        
+        응답은 order_number 로 주문과 짝지으며, order_number 가 없는 응답(기존 서버)은 보낸 순서대로 짝짓는다.
+        도중에 연결이 끊기면 응답을 받지 못한 주문만 실패로 반환한다.
+        
+        Args:
+            orders (list): 주문 정보 리스트
+            window (int): 응답을 기다리지 않고 보낼 수 있는 최대 주문 수
+        
+        Returns:
+            list: 주문 순서대로 (success: bool, message: str)
+        """
+        results = [None] * len(orders)
+        if not orders:
+            return results
+        if self.health is not None and not self.health.allow():
+            return [(False, UNAVAILABLE_MESSAGE)] * len(orders)
+        try:
+            sock, reused = self._acquire()
+            try:
+                self._pipeline(sock, orders, results, window)
+            except (ConnectionError, socket.timeout, OSError):
+                self._discard(sock)
+                if not reused or any(results):
+                    raise
+                # 재사용한 연결이 그 사이 끊겼던 경우 새 연결로 한 번 더 전송
+                self.reconnects += 1
+                sock = self._connect()
+                try:
+                    self._pipeline(sock, orders, results, window)
+                except BaseException:
+                    self._discard(sock)
+                    raise
+            self._release(sock)
+            self._link_ok()
+        except Exception as e:
+            if any(results):
+                self._link_ok()
+            else:
+                self._link_failed(e)
+            failed = self._error_result(e)
+            results = [result or failed for result in results]
+        return results
+    
+    def ping(self, timeout=1):
+        """
+        연결 상태 확인 (heartbeat, HealthMonitor 가 백그라운드에서 호출)
+        
+        v2 서버에는 풀의 연결로 ping 을 보내 pong 까지의 왕복 시간을 재고,
+        기존(v1) 서버는 ping 을 주문으로 받을 수 있으므로 새 연결이 맺어지는지만 확인한다.
+        
+        Args:
+            timeout (float): 확인 1회의 timeout(초), 전송 timeout 보다 짧게
+        
+        Returns:
+            float: 왕복 시간(초), 실패하면 예외
+        """
+        started = time.perf_counter()
+        if self.server_version == 1:
+            socket.create_connection((self.server_host, self.server_port), timeout=timeout).close()
+            return time.perf_counter() - started
+        
+        sock, _ = self._acquire(timeout)
+        try:
+            if self.server_version == 2:
+                started = time.perf_counter()
+                sock.settimeout(timeout)
+                send_frame(sock, ping_message(), version=2)
+                if not is_pong(recv_frame(sock)):
+                    raise FrameError("ping 응답이 pong 이 아닙니다.")
+                sock.settimeout(self.timeout)
+        except BaseException:
+            self._discard(sock)
+            raise
+        self._release(sock)
+        return time.perf_counter() - started
+    
+    def close(self):
+        """연결 상태 감시를 멈추고 풀에 있는 연결 모두 닫기"""
+        if self.health is not None:
+            self.health.stop()
+        while True:
+            try:
+                sock, _ = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            sock.close()
+    
+    def _request(self, sock, order_data):
+        """주문 1건 전송 후 응답 수신 (길이 헤더 + JSON, kitchen_protocol.py)"""
+        send_frame(sock, order_data, version=self.server_version or 1, compress=self.compress)
+        return recv_frame(sock)
+    
+    def _pipeline(self, sock, orders, results, window):
+        """주문들을 window 건씩 앞서 보내며 응답을 받아 results 에 채움"""
+        waiting = {}          # order_number -> 응답을 기다리는 주문 인덱스들 (보낸 순서)
+        in_flight = deque()   # 응답을 기다리는 주문 인덱스 (보낸 순서)
+        sent = 0
+        while sent < len(orders) or in_flight:
+            if sent < len(orders) and len(in_flight) < window:
+                end = min(sent + window - len(in_flight), len(orders))
+                sock.sendall(b"".join(
+                    encode_frame(order, version=self.server_version or 1, compress=self.compress)
+                    for order in orders[sent:end]
+                ))
+                for index in range(sent, end):
+                    waiting.setdefault(orders[index].get("order_number"), deque()).append(index)
+                    in_flight.append(index)
+                sent = end
+            
+            response = recv_frame(sock)
+            number = response.get("order_number")
+            if waiting.get(number):
+                index = waiting[number].popleft()
+            else:
+                # order_number 가 없는 응답은 가장 먼저 보낸 주문의 응답으로 봄
+                while results[in_flight[0]] is not None:
+                    in_flight.popleft()
+                index = in_flight[0]
+                waiting[orders[index].get("order_number")].remove(index)
+            results[index] = self._result(response)
+            while in_flight and results[in_flight[0]] is not None:
+                in_flight.popleft()
+    
+    @staticmethod
+    def _result(response):
+        if response.get('status') == 'success':
+            return True, response.get('message', '주문이 성공적으로 전송되었습니다.')
+        else:
+            return False, response.get('message', '서버에서 오류가 발생했습니다.')
+    
+    def _link_ok(self):
+        if self.health is not None:
+            self.health.record_success()
+    
+    def _link_failed(self, error):
+        """연결/응답 오류만 연결 실패로 기록 (주문 데이터 오류 등은 제외)"""
+        if self.health is not None and isinstance(error, (OSError, FrameError)):
+            self.health.record_failure(error)
+    
+    @staticmethod
+    def _error_result(error):
+        if isinstance(error, socket.timeout):
+            return False, "서버 응답 시간이 초과되었습니다."
+        if isinstance(error, ConnectionRefusedError):
+            return False, "서버에 연결할 수 없습니다. 서버가 실행 중인지 확인해주세요."
+        return False, f"전송 중 오류가 발생했습니다: {str(error)}"
+    
+    def _connect(self, negotiate=True, timeout=None):
+        sock = socket.create_connection((self.server_host, self.server_port), timeout=timeout or self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keep_alive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self.connects += 1
+        if negotiate and self.wire_version >= 2 and self.server_version != 1:
+            sock = self._negotiate(sock, timeout)
+        sock.settimeout(self.timeout)
+        return sock
+    
+    def _negotiate(self, sock, timeout=None):
+        """v2 hello 교환. 서버가 v2 를 모르면 기존 프레임용 연결을 돌려줌"""
+        try:
+            send_frame(sock, hello_message(), version=2)
+            reply, version = recv_message(sock)
+        except (ConnectionError, FrameError):
+            # 기존 서버는 숫자가 아닌 헤더를 읽지 못하고 연결을 닫음 → 새 연결로 기존 프레임 사용
+            self._discard(sock)
+            self.server_version = 1
+            return self._connect(negotiate=False, timeout=timeout)
+        except BaseException:
+            self._discard(sock)
+            raise
+        
+        if version >= 2 and is_hello(reply):
+            self.server_version = 2
+            self.compress = "zlib" in reply.get("codecs", [])
+        else:
+            self.server_version = 1
+        return sock
+    
+    def _acquire(self, timeout=None):
+        """풀에서 쓸 수 있는 연결을 꺼내고, 없으면 새로 연결(timeout: 연결 timeout). (socket, 재사용 여부) 반환"""
+        if self.keep_alive:
+            while True:
+                try:
+                    sock, last_used = self._pool.get_nowait()
+                except queue.Empty:
+                    break
+                if time.monotonic() - last_used > self.idle_timeout or self._is_stale(sock):
+                    sock.close()
+                    continue
+                return sock, True
+        return self._connect(timeout=timeout), False
+    
+    def _release(self, sock):
+        """사용이 끝난 연결을 풀에 반납 (keep_alive 가 아니거나 풀이 가득 차면 닫음)"""
+        if not self.keep_alive:
+            sock.close()
+            return
+        try:
+            self._pool.put_nowait((sock, time.monotonic()))
+        except queue.Full:
+            sock.close()
+    
+    @staticmethod
+    def _discard(sock):
+        try:
+            sock.close()
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _is_stale(sock):
+        """유휴 연결이 읽기 가능하면 서버가 닫았거나(EOF) 예상치 못한 데이터가 온 것"""
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+
+class AsyncTCPOrderSender:
+    """TCPOrderSender 의 asyncio 버전
+
+    Flet 이벤트 루프(page.run_task)에서 실행하며 주문마다 스레드를 만들지 않는다.
+    연결은 풀에 보관해 재사용하고, 동시에 열 수 있는 연결 수는 max_connections 로 제한한다.
+    전송 중 취소(CancelledError)되면 그 연결은 응답이 섞이지 않도록 닫고 버린다.
+    프레임 버전 협상(wire_version)은 TCPOrderSender 와 같다.
+    """
+    
+    def __init__(self, server_host="localhost", server_port=9999, timeout=5,
+                 max_connections=4, idle_timeout=60, wire_version=2):
+        self.server_host = server_host
+        self.server_port = server_port
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.wire_version = wire_version
+        
+        # 협상 결과: 서버 프레임 버전(None 이면 아직 모름), zlib 압축 사용 여부
+        self.server_version = None
+        self.compress = False
+        
+        # 유휴 연결: [(reader, writer, 마지막 사용 시각)], 세마포어는 루프 안에서 생성
+        self._idle = []
+        self._semaphore = None
+        
+        # 통계
+        self.connects = 0
+        self.reconnects = 0
+    
+    async def send_order(self, order_data):
+        """
+        주문 데이터를 TCP로 전송 (TCPOrderSender.send_order 와 같은 결과)
+        
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        try:
+            async with self._semaphore:
+                response = await asyncio.wait_for(self._send(order_data), self.timeout)
+            
+            if response.get('status') == 'success':
+                return True, response.get('message', '주문이 성공적으로 전송되었습니다.')
+            else:
+                return False, response.get('message', '서버에서 오류가 발생했습니다.')
+        
+        except asyncio.TimeoutError:
             return False, "서버 응답 시간이 초과되었습니다."
         except ConnectionRefusedError:
             return False, "서버에 연결할 수 없습니다. 서버가 실행 중인지 확인해주세요."
         except Exception as e:
             return False, f"전송 중 오류가 발생했습니다: {str(e)}"
+    
+    async def close(self):
+        """풀에 있는 연결 모두 닫기"""
+        idle, self._idle = self._idle, []
+        for _, writer, _ in idle:
+            writer.close()
+        for _, writer, _ in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+    
+    async def _send(self, order_data):
+        conn, reused = self._acquire()
+        if conn is None:
+            conn = await self._connect()
+        try:
+            response = await self._request(conn, order_data)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            conn[1].close()
+            if not reused:
+                raise
+            # 재사용한 연결이 그 사이 끊겼던 경우 새 연결로 한 번 더 전송
+            self.reconnects += 1
+            conn = await self._connect()
+            try:
+                response = await self._request(conn, order_data)
+            except BaseException:
+                conn[1].close()
+                raise
+        except BaseException:
+            # 취소/타임아웃: 응답을 다 읽지 못한 연결은 재사용하지 않음
+            conn[1].close()
+            raise
+        self._idle.append((conn[0], conn[1], time.monotonic()))
+        return response
+    
+    async def _request(self, conn, order_data):
+        """주문 1건 전송 후 응답 수신"""
+        reader, writer = conn
+        writer.write(encode_frame(order_data, version=self.server_version or 1, compress=self.compress))
+        await writer.drain()
+        return await read_frame(reader)
+    
+    async def _connect(self, negotiate=True):
+        reader, writer = await asyncio.open_connection(self.server_host, self.server_port)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connects += 1
+        if negotiate and self.wire_version >= 2 and self.server_version != 1:
+            return await self._negotiate(reader, writer)
+        return reader, writer
+    
+    async def _negotiate(self, reader, writer):
+        """v2 hello 교환. 서버가 v2 를 모르면 기존 프레임용 연결을 돌려줌"""
+        try:
+            writer.write(encode_frame(hello_message(), version=2))
+            await writer.drain()
+            reply, version = await read_message(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, FrameError):
+            writer.close()
+            self.server_version = 1
+            return await self._connect(negotiate=False)
+        except BaseException:
+            writer.close()
+            raise
+        
+        if version >= 2 and is_hello(reply):
+            self.server_version = 2
+            self.compress = "zlib" in reply.get("codecs", [])
+        else:
+            self.server_version = 1
+        return reader, writer
+    
+    def _acquire(self):
+        """풀에서 쓸 수 있는 연결 꺼내기 ((reader, writer), 재사용 여부), 없으면 (None, False)"""
+        while self._idle:
+            reader, writer, last_used = self._idle.pop()
+            # 서버가 닫았거나(EOF) 오래된 연결은 버림
+            if (
+                time.monotonic() - last_used > self.idle_timeout
+                or reader.at_eof()
+                or writer.is_closing()
+            ):
+                writer.close()
+                continue
+            return (reader, writer), True
+        return None, False
+
+
+
+class StationRouter:
+    """주문을 스테이션(그릴, 바 ...)별 티켓으로 나눠 병렬 전송하는 라우터
+
+    메뉴 카테고리별 규칙(routes)으로 품목을 스테이션에 배정하고, 스테이션마다 따로 둔
+    전송기(각자 연결 풀을 가짐)로 동시에 보낸다. 모든 스테이션이 응답해야 주문이 전달된 것으로 본다.
+    TCPOrderSender 와 같은 send_order / send_orders / close 를 제공하므로 KitchenOutbox 에 그대로 넘길 수 있다.
+    끊긴 스테이션(circuit open)의 티켓은 바로 실패해 outbox 에 남고, 나머지 스테이션은 그대로 받는다.
+    KitchenOutbox 는 send_remaining 으로 받은 스테이션을 기록해 두고, 재전송 때는 실패한 스테이션 티켓만 보낸다.
+    
+    Args:
+        stations (dict): 스테이션 이름 -> 전송기 (TCPOrderSender)
+        routes (dict): 메뉴 카테고리 -> 스테이션 이름 (없는 카테고리는 default_station)
+        default_station (str): 규칙에 없는 품목을 보낼 스테이션
+        menu_data (dict): 카테고리 -> 메뉴 리스트 (장바구니 품목에는 카테고리가 없어 이름으로 찾음)
+    """
+    
+    def __init__(self, stations, routes=None, default_station=None, menu_data=None):
+        self.stations = stations
+        self.routes = routes or {}
+        self.default_station = default_station or next(iter(stations))
+        self.categories = {
+            item["name"]: category
+            for category, items in (menu_data or {}).items()
+            for item in items
+        }
+        self._executor = ThreadPoolExecutor(max_workers=len(stations), thread_name_prefix="kitchen-station")
+    
+    def station_of(self, item):
+        """품목을 준비할 스테이션 이름"""
+        category = item.get("category") or self.categories.get(item.get("name"))
+        return self.routes.get(category, self.default_station)
+    
+    def split(self, order_data):
+        """
+        주문 → 스테이션별 티켓 (품목이 없는 스테이션은 제외)
+        
+        티켓은 주문 정보에 해당 스테이션 품목만 담고 "station" 을 붙인다.
+        idempotency_key 가 있으면 스테이션 이름을 붙여, 재전송 때 이미 받은 스테이션은 중복 접수하지 않게 한다.
+        """
+        items_by_station = {}
+        for item in order_data.get("items", []):
+            items_by_station.setdefault(self.station_of(item), []).append(item)
+        
+        tickets = {}
+        for station, items in items_by_station.items():
+            ticket = dict(order_data, items=items, station=station)
+            if "idempotency_key" in order_data:
+                ticket["idempotency_key"] = f"{order_data['idempotency_key']}@{station}"
+            tickets[station] = ticket
+        return tickets
+    
+    def send_order(self, order_data):
+        """
+        주문 1건을 스테이션별로 나눠 병렬 전송
+        
+        Returns:
+            tuple: (success: 모든 스테이션이 받았으면 True, 보낼 티켓이 없으면 None, message: str)
+        """
+        return self.send_orders([order_data])[0]
+    
+    def send_orders(self, orders):
+        """
+        여러 주문을 스테이션별로 모아, 스테이션마다 send_orders 로 병렬 전송
+        
+        Returns:
+            list: 주문 순서대로 (success, message)
+        """
+        return [(success, message) for success, message, _ in self.send_remaining(orders)]
+    
+    def send_remaining(self, orders, acked=None):
+        """
+        send_orders 와 같지만 이미 받은 스테이션에는 다시 보내지 않음 (KitchenOutbox 재전송용)
+        
+        한 스테이션만 실패해도 주문은 실패로 남아 다시 보내지는데, 기존 프로토콜 주방 시스템은
+        idempotency_key 로 중복을 거르지 않으므로 이미 받은 스테이션에 다시 보내면 티켓이 또 출력된다.
+        
+        Args:
+            orders (list): 주문 리스트
+            acked (list): 주문 순서대로 이미 받은 스테이션 이름 목록 (None 이면 모두 처음 전송)
+        
+        Returns:
+            list: 주문 순서대로 (success, message, 지금까지 받은 스테이션 이름 목록)
+                  보낼 티켓이 없는 주문(품목 없음, 모든 스테이션이 이미 받음)은 전달이 아니므로 success=None
+        """
+        acked = acked or [()] * len(orders)
+        # 스테이션 -> [(주문 인덱스, 티켓)]
+        tickets_by_station = {}
+        skipped = {}
+        for index, order_data in enumerate(orders):
+            tickets = self.split(order_data)
+            if not tickets:
+                skipped[index] = "보낼 품목이 없습니다."
+            elif tickets.keys() <= set(acked[index]):
+                skipped[index] = "모든 스테이션이 이미 받은 주문입니다."
+            for station, ticket in tickets.items():
+                if station not in acked[index]:
+                    tickets_by_station.setdefault(station, []).append((index, ticket))
+        
+        futures = {
+            station: self._executor.submit(self._send_station, station, [ticket for _, ticket in tickets])
+            for station, tickets in tickets_by_station.items()
+        }
+        
+        failures = [[] for _ in orders]
+        received = [list(stations) for stations in acked]
+        for station, future in futures.items():
+            for (index, _), (success, message) in zip(tickets_by_station[station], future.result()):
+                if success:
+                    received[index].append(station)
+                else:
+                    failures[index].append(f"{station}: {message}")
+        
+        return [
+            (None, skipped[index], stations) if index in skipped
+            else (False, ", ".join(failed), stations) if failed
+            else (True, "모든 스테이션에 주문이 전달되었습니다.", stations)
+            for index, (failed, stations) in enumerate(zip(failures, received))
+        ]
+    
+    def link_status(self):
+        """스테이션별 연결 상태 (HealthMonitor.snapshot, 감시하지 않는 스테이션은 제외)"""
+        return {
+            station: sender.health.snapshot()
+            for station, sender in self.stations.items()
+            if getattr(sender, "health", None) is not None
+        }
+    
+    def close(self):
+        for sender in self.stations.values():
+            sender.close()
+        self._executor.shutdown(wait=False)
+    
+    def _send_station(self, station, tickets):
+        sender = self.stations.get(station)
+        if sender is None:
+            return [(False, "등록되지 않은 스테이션입니다.")] * len(tickets)
+        if len(tickets) == 1:
+            return [sender.send_order(tickets[0])]
+        return sender.send_orders(tickets)
 
 # KioskApp 클래스에 추가할 메서드들
-def init_tcp_sender(self):
-    """TCP 전송기 초기화 (KioskApp.__init__에 추가)"""
-    # TCP 서버 설정 (필요에 따라 변경)
-    self.tcp_sender = TCPOrderSender(
-        server_host="192.168.1.100",  # 주방 시스템 IP
-        server_port=9999,             # 포트 번호
-        timeout=10                    # 타임아웃 (초)
+def init_tcp_sender(self, menu_data=None):
+    """TCP 전송기 초기화 (KioskApp.__init__에 추가, menu_data 에는 MENU_DATA 전달)"""
+    # 스테이션별 TCP 서버 설정 (필요에 따라 변경), 스테이션마다 연결 풀을 따로 가짐
+    self.tcp_sender = StationRouter(
+        stations={
+            "grill": TCPOrderSender(
+                server_host="192.168.1.100",  # 주방(그릴) 시스템 IP
+                server_port=9999,             # 포트 번호
+                timeout=10,                   # 타임아웃 (초)
+                keep_alive=True,              # 연결 재사용
+            ),
+            "bar": TCPOrderSender(
+                server_host="192.168.1.101",  # 음료 바 시스템 IP
+                server_port=9999,
+                timeout=10,
+                keep_alive=True,
+            ),
+        },
+        routes={"음료": "bar"},      # 음료는 바, 나머지(메인/사이드)는 그릴
+        default_station="grill",
+        menu_data=menu_data,
+    )
+    
+    # 주문은 outbox 에 먼저 기록하고 백그라운드에서 전달 (실패 시 재시도, 재시작 후에도 이어서 전송)
+    # kitchen_info.priority 별 대기열에서 urgent > high > normal 순으로 꺼내고, 디스패처는 2개까지
+    self.kitchen_outbox = KitchenOutbox(
+        self.tcp_sender,
+        workers=2,
+        on_delivered=lambda order_data, message: self.page.run_thread(
+            show_kitchen_status, self, f"✅ 주방에 주문 #{order_data['order_number']}이 전달되었습니다!", ft.Colors.GREEN_600
+        ),
+        on_retry=lambda order_data, message, delay: self.page.run_thread(
+            show_kitchen_status, self,
+            f"⚠️ 주방 전송 실패: {message} ({delay:.0f}초 후 재시도, 대기 {self.kitchen_outbox.depth()}건)",
+            ft.Colors.ORANGE_600,
+        ),
     )
+    
+    # 스테이션마다 백그라운드 heartbeat (2초 간격, 1초 timeout). 연속 2회 실패하면 끊긴 것으로 보고
+    # 그동안의 주문은 10초 timeout 을 기다리지 않고 바로 outbox 에 남김. 복구되면 outbox 가 바로 다시 보냄
+    def on_link_change(station, old_state, new_state):
+        if new_state == "closed":
+            self.kitchen_outbox.retry_now()
+    
+    self.kitchen_health = {
+        station: HealthMonitor(sender, station, interval=2, probe_timeout=1, on_change=on_link_change).start()
+        for station, sender in self.tcp_sender.stations.items()
+    }
+
+async def send_to_kitchen_async(self, order_data):
+    """
+    asyncio 전송기로 주방에 바로 전송 (스레드 없이 Flet 이벤트 루프에서 실행)
 
+    사용 예: self.async_tcp_sender = AsyncTCPOrderSender("192.168.1.100", 9999, timeout=10)
+             self.page.run_task(send_to_kitchen_async, self, order_data)
+    키오스크 종료 시 실행 중인 전송 태스크는 취소되며, 취소된 연결은 닫힌다.
+    """
+    success, message = await self.async_tcp_sender.send_order(order_data)
+    if success:
+        show_kitchen_status(self, "✅ 주방에 주문이 전달되었습니다!", ft.Colors.GREEN_600)
+    else:
+        show_kitchen_status(self, f"⚠️ 주방 전송 실패: {message}", ft.Colors.ORANGE_600)
+
+def create_kitchen_link_row(self):
+    """
+    관리자 패널용 주방 연결 상태 카드 (show_admin_panel 의 통계 Row 아래에 추가)
+    
+    heartbeat 가 기록해 둔 값만 읽으므로 UI 스레드에서 주방에 연결하지 않는다.
+    """
+    colors = {"closed": ft.Colors.GREEN_50, "half_open": ft.Colors.ORANGE_50, "open": ft.Colors.RED_50}
+    cards = []
+    for station, status in self.tcp_sender.link_status().items():
+        rtt = "-" if status["rtt_ms"] is None else f"{status['rtt_ms']:.1f}ms"
+        cards.append(ft.Container(
+            content=ft.Column([
+                ft.Text(f"주방 {station}", size=12, color=ft.Colors.GREY_600),
+                ft.Text(status["label"], size=20, weight=ft.FontWeight.BOLD),
+                ft.Text(f"RTT {rtt}", size=12, color=ft.Colors.GREY_700),
+            ]),
+            bgcolor=colors[status["state"]],
+            border_radius=8,
+            padding=15,
+            expand=True,
+        ))
+    cards.append(ft.Container(
+        content=ft.Column([
+            ft.Text("전송 대기", size=12, color=ft.Colors.GREY_600),
+            ft.Text(f"{self.kitchen_outbox.depth()}건", size=20, weight=ft.FontWeight.BOLD),
+            ft.Text(f"지연 {self.kitchen_outbox.lag():.0f}초", size=12, color=ft.Colors.GREY_700),
+        ]),
+        bgcolor=ft.Colors.BLUE_50,
+        border_radius=8,
+        padding=15,
+        expand=True,
+    ))
+    return ft.Row(cards)
+
+def show_kitchen_status(self, text, color):
+    """주방 전송 결과 스낵바 (UI 스레드에서 실행)"""
+    self.page.snack_bar = ft.SnackBar(content=ft.Text(text), bgcolor=color)
+    self.page.snack_bar.open = True
+    self.updater.request()
+
+@batched
 def complete_order(self):
     """주문 완료 처리 (기존 메서드 대체)"""
     order_number = self.order_manager.get_next_order_number()
@@ -76,7 +716,7 @@ def complete_order(self):
     # 주문 데이터 생성
     order_data = {
         "order_number": order_number,
-        "timestamp": time.datetime.now().isoformat(),
+        "timestamp": datetime.now().isoformat(),
         "order_type": self.order_type,
         "items": self.cart.copy(),
         "total": sum(item["price"] * item["quantity"] for item in self.cart),
@@ -86,39 +726,75 @@ def complete_order(self):
         }
     }
     
-    # 로컬 저장
-    self.order_manager.save_order(order_data)
-    
-    # TCP로 주방 시스템에 전송
-    def send_to_kitchen():
-        success, message = self.tcp_sender.send_order(order_data)
-        
-        # UI 스레드에서 결과 처리
-        def update_ui():
-            if success:
-                # 성공 시 스낵바 표시
-                self.page.snack_bar = ft.SnackBar(
-                    content=ft.Text("✅ 주방에 주문이 전달되었습니다!"),
-                    bgcolor=ft.Colors.GREEN_600,
-                )
-            else:
-                # 실패 시 경고 스낵바 표시
-                self.page.snack_bar = ft.SnackBar(
-                    content=ft.Text(f"⚠️ 주방 전송 실패: {message}"),
-                    bgcolor=ft.Colors.ORANGE_600,
-                )
-            self.page.snack_bar.open = True
-            self.page.update()
-        
-        # UI 업데이트는 메인 스레드에서 실행
-        self.page.run_thread(update_ui)
+    # 주문 저장 (백그라운드 기록)
+    self.order_writer.save_order(order_data)
     
-    # 백그라운드에서 TCP 전송 (UI 블로킹 방지)
-    threading.Thread(target=send_to_kitchen, daemon=True).start()
+    # 주방 전송은 outbox 에 기록만 하고 바로 반환 (전송/재시도는 백그라운드 디스패처가 담당)
+    self.kitchen_outbox.put(order_data)
     
     # 장바구니 초기화
     self.cart.clear()
     self.update_cart_badge()
     
     # 완료 페이지 표시
-    self.show_completion_page(order_number)
\ No newline at end of file
+    self.show_completion_page(order_number)
+
+
+def benchmark(count=500, latency_ms=0):
+    """
+    로컬 주방 서버로 주문을 보내 매번 연결 / 연결 재사용 / 배치 파이프라인 / asyncio 동시 전송의 지연 시간 비교
+    
+    latency_ms 를 주면 주방 서버가 응답을 그만큼 늦게 보내 왕복 시간이 긴 링크를 흉내 낸다.
+    """
+    from kitchen_server import KitchenServer
+
+    server = KitchenServer("localhost", 0, latency=latency_ms / 1000)
+    host, port = server.start()
+    order = {
+        "order_number": 1,
+        "order_type": "매장",
+        "items": [{"name": "스테이크", "price": 32000, "quantity": 1, "image": "🥩"}],
+        "total": 32000,
+    }
+    
+    for keep_alive in (False, True):
+        sender = TCPOrderSender(host, port, keep_alive=keep_alive)
+        started = time.perf_counter()
+        for i in range(count):
+            order["order_number"] = i + 1
+            success, message = sender.send_order(order)
+            assert success, message
+        elapsed = time.perf_counter() - started
+        sender.close()
+        label = "연결 재사용" if keep_alive else "매번 연결"
+        print(f"{label:8s}: {count}건 {elapsed:.3f}초 (건당 {elapsed / count * 1000:.3f}ms, 연결 {sender.connects}회)")
+    
+    sender = TCPOrderSender(host, port, keep_alive=True)
+    started = time.perf_counter()
+    results = sender.send_orders([dict(order, order_number=i + 1) for i in range(count)])
+    elapsed = time.perf_counter() - started
+    sender.close()
+    assert all(success for success, _ in results), results
+    print(f"{'배치 파이프라인':8s}: {count}건 {elapsed:.3f}초 (건당 {elapsed / count * 1000:.3f}ms, 연결 {sender.connects}회)")
+    
+    async def send_all(sender):
+        orders = [dict(order, order_number=i + 1) for i in range(count)]
+        results = await asyncio.gather(*(sender.send_order(o) for o in orders))
+        await sender.close()
+        assert all(success for success, _ in results), results
+    
+    sender = AsyncTCPOrderSender(host, port)
+    started = time.perf_counter()
+    asyncio.run(send_all(sender))
+    elapsed = time.perf_counter() - started
+    print(f"{'asyncio 동시 전송':8s}: {count}건 {elapsed:.3f}초 (건당 {elapsed / count * 1000:.3f}ms, 연결 {sender.connects}회)")
+    
+    server.stop()
+
+
+if __name__ == "__main__":
+    # 사용법: python tcp.py [주문 수] [응답 지연(ms)]
+    benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0,
+    )
@@ -0,0 +1,131 @@
+"""화면 갱신(page.update) 모아서 보내기
+
+page.update() 는 호출할 때마다 바뀐 컨트롤을 모아 Flet 클라이언트로 보낸다. 클릭 한 번에
+update_cart_badge() 와 SnackBar 표시가 각각 page.update() 를 부르면 같은 화면을 두 번 보내게 된다.
+
+이벤트 핸들러를 UpdateScheduler.batch() 안에서 실행하면(메서드는 @batched, 함수는 updater.wrap),
+그동안의 request() 는 기록만 하고 핸들러가 끝날 때 그 핸들러를 실행한 스레드에서 page.update() 를 한 번 부른다.
+핸들러가 오래 걸려도(관리자 패널의 저장 대기 등) 중간에 다른 스레드가 반쯤 바뀐 화면을 보내지 않고,
+스레드를 따로 만들지 않는다. 핸들러 밖(백그라운드 스레드 등)의 request() 는 바로 page.update().
+핸들러 중간에 먼저 보여줘야 하면 flush(). requests / flushes / saved 로 합쳐서 아낀 갱신 수를 확인할 수 있다.
+
+사용법: python update_scheduler.py [클릭 수]  → 가짜 page 로 클릭마다 갱신 요청 3번일 때 실제 갱신 수 확인
+"""
+import functools
+import sys
+import threading
+from contextlib import contextmanager
+
+
+class UpdateScheduler:
+    """
+    이벤트 핸들러 단위로 page.update() 를 합치는 스케줄러
+
+    Args:
+        page: 갱신할 ft.Page
+    """
+    def __init__(self, page):
+        self.page = page
+        self._lock = threading.Lock()
+        # 스레드별 핸들러 중첩 깊이와 기다리는 갱신 여부 (Flet 은 핸들러를 여러 스레드에서 실행)
+        self._local = threading.local()
+
+        # 통계
+        self.requests = 0
+        self.flushes = 0
+
+    @property
+    def saved(self):
+        """합쳐져서 보내지 않은 갱신 수"""
+        return self.requests - self.flushes
+
+    def request(self):
+        """화면 갱신 요청 (핸들러 안이면 핸들러가 끝날 때 한 번에 page.update)"""
+        with self._lock:
+            self.requests += 1
+        if getattr(self._local, "depth", 0):
+            self._local.dirty = True
+            return
+        self._update()
+
+    @contextmanager
+    def batch(self):
+        """이 안의 request() 를 모아 끝날 때 한 번만 page.update (중첩되면 가장 바깥에서)"""
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+        try:
+            yield
+        finally:
+            local.depth = depth
+            if depth == 0:
+                self.flush()
+
+    def wrap(self, handler):
+        """이벤트 핸들러 함수를 batch() 안에서 실행하도록 감쌈"""
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            with self.batch():
+                return handler(*args, **kwargs)
+        return wrapper
+
+    def flush(self):
+        """이 스레드에서 기다리는 갱신이 있으면 바로 page.update"""
+        if not getattr(self._local, "dirty", False):
+            return
+        self._local.dirty = False
+        self._update()
+
+    def get_stats(self):
+        return {"requests": self.requests, "flushes": self.flushes, "saved": self.saved}
+
+    def _update(self):
+        with self._lock:
+            self.flushes += 1
+        self.page.update()
+
+
+def batched(method):
+    """KioskApp 이벤트 핸들러 메서드를 self.updater.batch() 안에서 실행"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.updater.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def benchmark(clicks=200):
+    """
+    클릭마다 갱신 요청 3번(배지, SnackBar, 목록)을 보내는 핸들러를 여러 스레드에서 흉내 내 실제 page.update 횟수 비교
+
+    핸들러가 1프레임(16ms)보다 오래 걸려도 핸들러마다 끝날 때 한 번만 갱신하는지 확인한다.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    class FakePage:
+        updates = 0
+        lock = threading.Lock()
+
+        def update(self):
+            with self.lock:
+                self.updates += 1
+
+    page = FakePage()
+    scheduler = UpdateScheduler(page)
+
+    def handler(i):
+        scheduler.request()
+        time.sleep(0.02 if i % 10 == 0 else 0)
+        scheduler.request()
+        scheduler.request()
+
+    handler = scheduler.wrap(handler)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(handler, range(clicks)))
+    assert page.updates == scheduler.flushes == clicks
+    print(f"클릭 {clicks}번: 갱신 요청 {scheduler.requests}번 → page.update {page.updates}번 (아낀 갱신 {scheduler.saved}번)")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,74 @@
+"""화면 전환 라우터
+
+화면(메뉴/장바구니/결제/완료)을 이동할 때마다 컨트롤 트리를 새로 만들어 main_container.content 에 넣으면
+Flet 은 화면 전체를 다시 보내고 클라이언트도 위젯을 처음부터 다시 그린다.
+
+ViewRouter 는 화면마다 처음 들어갈 때 한 번만 만들어 container 안에 넣어 두고, 이후에는 보이는 화면만 바꾼다
+(visible 속성 2개만 전송). 다시 들어올 때는 bind 함수로 장바구니 내용/주문번호 같은 데이터만 다시 채운다.
+"""
+
+
+class ViewRouter:
+    """
+    화면 이름 → 한 번 만든 화면
+
+    Args:
+        container: 화면들을 담을 컨트롤 (controls 리스트를 가진 ft.Column 등)
+    """
+    def __init__(self, container):
+        self.container = container
+        self.current = None
+
+        # 화면 이름 -> (build, bind), 만든 화면
+        self._routes = {}
+        self._views = {}
+
+        # 통계
+        self.builds = 0
+        self.hits = 0
+
+    def register(self, name, build, bind=None):
+        """
+        화면 등록
+
+        Args:
+            name (str): 화면 이름
+            build: () -> 컨트롤, 처음 들어갈 때 한 번 호출
+            bind: 들어갈 때마다 go() 의 인자로 호출해 데이터를 다시 채움 (없으면 그대로 보여줌)
+        """
+        self._routes[name] = (build, bind)
+
+    def go(self, name, *args, **kwargs):
+        """
+        name 화면으로 이동 (처음이면 만들고, bind 로 데이터를 채운 뒤 보이게 함)
+
+        호출한 쪽에서 page.update() 로 반영한다.
+        """
+        build, bind = self._routes[name]
+        view = self._views.get(name)
+        if view is None:
+            view = build()
+            self.builds += 1
+            self._views[name] = view
+            self.container.controls.append(view)
+        else:
+            self.hits += 1
+        if bind is not None:
+            bind(*args, **kwargs)
+
+        if self.current is not None and self.current != name:
+            self._views[self.current].visible = False
+        view.visible = True
+        self.current = name
+        return view
+
+    def invalidate(self, name=None):
+        """만들어 둔 화면 버리기 (name 이 None 이면 전부), 다음 go() 때 다시 만듦"""
+        names = list(self._views) if name is None else [name]
+        for view_name in names:
+            view = self._views.pop(view_name, None)
+            if view is None:
+                continue
+            self.container.controls.remove(view)
+            if self.current == view_name:
+                self.current = None